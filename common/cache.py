@@ -0,0 +1,99 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+MISSING = object()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution; the
+    other callers wait for, and share, the leader's result.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+single_flight = SingleFlight()
+
+
+def get_or_fetch(key, fetch, lock_timeout=10, poll_interval=0.05):
+    """
+    Return the cached value for ``key``, calling ``fetch`` on a miss.
+
+    ``fetch`` returns ``(value, timeout)``; a ``timeout`` of ``None`` means the
+    value is returned but not cached. Misses are coalesced within the process
+    by ``single_flight`` and across processes by a short-lived lock key in the
+    cache, so a burst of requests for the same key makes one upstream call.
+    Callers waiting on another process's lock fetch themselves once it is
+    released without a cached value, as after an uncached error.
+    """
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value
+
+    def load():
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        lock_key = f"{key}:lock"
+        locked = cache.add(lock_key, 1, lock_timeout)
+        if not locked:
+            # Another process is fetching; wait for it to fill the cache or
+            # release its lock, then fetch anyway, leaving its lock alone.
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(poll_interval)
+                value = cache.get(key, MISSING)
+                if value is not MISSING:
+                    return value
+                if cache.get(lock_key) is None:
+                    value = cache.get(key, MISSING)  # Filled as it was released
+                    if value is not MISSING:
+                        return value
+                    break
+
+        try:
+            value, timeout = fetch()
+            if timeout is not None:
+                cache.set(key, value, timeout)
+            return value
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+    return single_flight.do(key, load)
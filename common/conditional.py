@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Subquery
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.text import compress_string
+
+from common.cache import get_or_fetch
+from common.models import ResponseScope
+
+
+def bump_scope_version(scope):
+    ResponseScope.objects.bulk_create(
+        [ResponseScope(scope=scope, version=timezone.now())],
+        update_conflicts=True,
+        unique_fields=["scope"],
+        update_fields=["version"],
+    )
+
+
+def invalidate_responses(scope):
+    """
+    Retire the cached responses of ``scope`` in every process once the
+    current transaction commits. Bumping earlier would let a concurrent
+    request cache the old rows under the new version.
+    """
+    transaction.on_commit(lambda: bump_scope_version(scope))
+
+
+def queryset_validators(queryset, scope, request):
+    """
+    Return ``(digest, last_modified)`` for a list response over ``queryset``;
+    the digest is the ETag's opaque value.
+
+    Both come from one aggregate query: row count, newest ``updated_at`` and
+    the scope's version from ``ResponseScope``. They change when a row is
+    added, removed or saved, and on any write the scope's signals or bulk
+    writers record, whichever process made it.
+    """
+    stats = queryset.order_by().aggregate(
+        count=Count("pk"),
+        newest=Max("updated_at"),
+        version=Max(
+            Subquery(ResponseScope.objects.filter(scope=scope).values("version"))
+        ),
+    )
+    newest = stats["newest"].timestamp() if stats["newest"] else 0
+    version = stats["version"].timestamp() if stats["version"] else 0
+    digest = hashlib.sha1(
+        "|".join(
+            [
+                request.get_full_path(),
+                request.accepted_media_type,
+                str(stats["count"]),
+                str(newest),
+                str(version),
+            ]
+        ).encode()
+    ).hexdigest()
+    return digest, int(max(newest, version))
+
+
+class ConditionalListMixin:
+    """
+    Answer list actions with ``ETag``/``Last-Modified`` validators and a
+    shared cache of their rendered, gzipped bodies.
+
+    Clients whose validators still match get a 304 before anything is
+    serialized. Views call ``conditional_response`` with the queryset the
+    response is built from and a callable producing the DRF response.
+    Cached bodies are keyed by the digest, so a write to the scope or a change
+    to the queryset's rows moves readers to a new entry. The gzipped and
+    identity bodies get distinct ETags. Only JSON responses are cached; the
+    browsable API is rendered as usual.
+    """
+
+    response_cache_scope = None
+
+    def conditional_response(self, request, queryset, build_response):
+        if request.accepted_renderer.format != "json":
+            return build_response()
+
+        digest, last_modified = queryset_validators(
+            queryset, self.response_cache_scope, request
+        )
+        compress = "gzip" in request.headers.get("Accept-Encoding", "")
+        validators = {
+            "ETag": f'"{digest}-gzip"' if compress else f'"{digest}"',
+            "Last-Modified": http_date(last_modified),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        response = get_conditional_response(
+            request, etag=validators["ETag"], last_modified=last_modified
+        )
+        if response is None:  # Not a 304 or 412
+            response = self.cached_body_response(
+                request, digest, compress, build_response
+            )
+        if response.status_code in (200, 304):
+            for header, value in validators.items():
+                response[header] = value
+        return response
+
+    def cached_body_response(self, request, digest, compress, build_response):
+        """
+        Serve the rendered body for ``digest`` from the cache, gzipped if
+        ``compress``, rendering and storing it on a miss. Error responses are
+        passed through uncached.
+        """
+
+        def render():
+            response = build_response()
+            if response.status_code != 200:
+                return response, None
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            body = (response["Content-Type"], compress_string(response.content))
+            return body, settings.RESPONSE_CACHE_TTL
+
+        key = f"responses:{self.response_cache_scope}:body:{digest}"
+        body = get_or_fetch(key, render)
+        if not isinstance(body, tuple):
+            return body  # An error response, not cached
+
+        content_type, compressed = body
+        if compress:
+            response = HttpResponse(compressed, content_type=content_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                gzip.decompress(compressed), content_type=content_type
+            )
+        return response
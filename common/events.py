@@ -0,0 +1,240 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _ResolvedFuture:
+    def add_callback(self, callback, *args, **kwargs):
+        callback(None, *args, **kwargs)
+        return self
+
+    def add_errback(self, errback, *args, **kwargs):
+        return self
+
+
+class InMemoryBroker:
+    """
+    Stand-in for ``KafkaProducer`` that keeps sent messages in memory.
+    Select it with ``KAFKA_BACKEND=memory`` or pass it as an ``EventProducer``
+    factory in tests.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, topic, value):
+        self.messages.append((topic, value))
+        return _ResolvedFuture()
+
+    def flush(self, timeout=None):
+        pass
+
+    def close(self, timeout=None):
+        pass
+
+
+def kafka_producer():
+    """
+    Build a ``KafkaProducer`` from settings. Imported lazily so processes that
+    never publish do not touch the brokers.
+    """
+    from kafka import KafkaProducer
+
+    return KafkaProducer(
+        bootstrap_servers=settings.KAFKA_SERVERS,
+        value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        linger_ms=settings.KAFKA_LINGER_MS,
+        batch_size=settings.KAFKA_BATCH_SIZE,
+        compression_type=settings.KAFKA_COMPRESSION_TYPE,
+        max_block_ms=settings.KAFKA_MAX_BLOCK_MS,
+    )
+
+
+class EventProducer:
+    """
+    Non-blocking event publisher.
+
+    ``send`` only appends to a bounded in-memory buffer; a background thread
+    creates the real producer on first use and hands events to it, so callers
+    never wait on broker connections. When the buffer is full the overflow
+    policy applies: ``drop_newest``, ``drop_oldest`` or ``spill`` (append the
+    event as a JSON line to ``spill_path``). Pending events are flushed at
+    interpreter exit.
+    """
+
+    def __init__(
+        self,
+        factory=kafka_producer,
+        buffer_size=10000,
+        overflow="drop_newest",
+        spill_path=None,
+        reconnect_backoff=5.0,
+    ):
+        self._factory = factory
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._overflow = overflow
+        self._spill_path = spill_path
+        self._reconnect_backoff = reconnect_backoff
+        self._producer = None
+        self._producer_failed_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.counters = {"sent": 0, "failed": 0, "dropped": 0, "spilled": 0}
+
+    @property
+    def producer(self):
+        return self._producer
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "buffered": self._queue.qsize()}
+
+    def send(self, topic, value):
+        self._start()
+        try:
+            self._queue.put_nowait((topic, value))
+        except queue.Full:
+            self._handle_overflow(topic, value)
+
+    def flush(self, timeout=None):
+        """
+        Wait until buffered events are handed to the producer, then flush it.
+        """
+        self._queue.join()
+        if self._producer is not None:
+            self._producer.flush(timeout=timeout)
+
+    def close(self, timeout=10):
+        """
+        Flush pending events and stop the background thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self._producer is not None:
+            self._producer.flush(timeout=timeout)
+            self._producer.close(timeout=timeout)
+            self._producer = None
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="event-producer", daemon=True
+                )
+                self._thread.start()
+
+    def _handle_overflow(self, topic, value):
+        if self._overflow == "spill" and self._spill_path:
+            self._spill(topic, value)
+            return
+        if self._overflow == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._count("dropped")
+                self._queue.put_nowait((topic, value))
+                return
+            except (queue.Empty, queue.Full):
+                pass
+        self._count("dropped")
+
+    def _spill(self, topic, value):
+        with self._lock:
+            with open(self._spill_path, "a") as spill:
+                spill.write(json.dumps({"topic": topic, "value": value}) + "\n")
+            self.counters["spilled"] += 1
+
+    def _get_producer(self):
+        if self._producer is None:
+            if (
+                self._producer_failed_at is not None
+                and time.monotonic() - self._producer_failed_at
+                < self._reconnect_backoff
+            ):
+                raise ConnectionError("Event producer unavailable, backing off.")
+            try:
+                self._producer = self._factory()
+            except Exception:
+                self._producer_failed_at = time.monotonic()
+                raise
+            self._producer_failed_at = None
+        return self._producer
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._deliver(*item)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, topic, value):
+        try:
+            future = self._get_producer().send(topic, value)
+        except Exception as e:
+            logger.warning("Failed to publish event to %s: %s", topic, e)
+            if self._overflow == "spill" and self._spill_path:
+                self._spill(topic, value)
+            else:
+                self._count("failed")
+            return
+        future.add_callback(lambda _: self._count("sent"))
+        future.add_errback(lambda _: self._count("failed"))
+
+
+_event_producer = None
+_event_producer_lock = threading.Lock()
+
+
+def get_event_producer():
+    """
+    Return the process-wide ``EventProducer``, creating it on first use.
+    """
+    global _event_producer
+    if _event_producer is None:
+        with _event_producer_lock:
+            if _event_producer is None:
+                factory = (
+                    InMemoryBroker
+                    if settings.KAFKA_BACKEND == "memory"
+                    else kafka_producer
+                )
+                _event_producer = EventProducer(
+                    factory=factory,
+                    buffer_size=settings.KAFKA_BUFFER_SIZE,
+                    overflow=settings.KAFKA_OVERFLOW_POLICY,
+                    spill_path=settings.KAFKA_SPILL_PATH,
+                )
+                atexit.register(_event_producer.close)
+    return _event_producer
+
+
+def set_event_producer(producer):
+    """
+    Replace the process-wide ``EventProducer`` (e.g. with an in-memory one in
+    tests) and return the previous one.
+    """
+    global _event_producer
+    with _event_producer_lock:
+        previous, _event_producer = _event_producer, producer
+    return previous
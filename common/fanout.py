@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FanOutResult:
+    """
+    Ordered results of a fan-out. ``results[i]`` belongs to ``items[i]`` and is
+    ``None`` when the call failed or did not finish before the deadline.
+    """
+
+    results: list = field(default_factory=list)
+    failed: int = 0
+    timed_out: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def complete(self):
+        return not (self.failed or self.timed_out)
+
+
+def fan_out(func, items, max_workers, deadline):
+    """
+    Call ``func(item)`` for every item on a bounded thread pool.
+
+    Waits at most ``deadline`` seconds overall; calls still queued at that point
+    are cancelled and calls still running are abandoned (they are expected to
+    enforce their own per-call timeout). Results come back in input order.
+    Each call runs in a copy of the caller's context, so request-scoped state
+    such as timings follows it.
+    """
+    items = list(items)
+    outcome = FanOutResult(results=[None] * len(items))
+    if not items:
+        return outcome
+
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    try:
+        futures = [
+            executor.submit(contextvars.copy_context().run, func, item)
+            for item in items
+        ]
+        wait(futures, timeout=deadline)
+        for index, future in enumerate(futures):
+            if not future.done():
+                future.cancel()
+                outcome.timed_out += 1
+            elif future.exception() is not None:
+                logger.warning("Fan-out call failed", exc_info=future.exception())
+                outcome.failed += 1
+            else:
+                outcome.results[index] = future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    outcome.elapsed = time.monotonic() - started
+    return outcome
+
+
+async def afan_out(func, items, deadline):
+    """
+    asyncio version of ``fan_out``: await ``func(item)`` for every item
+    concurrently and wait at most ``deadline`` seconds. Calls still pending at
+    the deadline are cancelled. Results come back in input order.
+    """
+    items = list(items)
+    outcome = FanOutResult(results=[None] * len(items))
+    if not items:
+        return outcome
+
+    started = time.monotonic()
+    tasks = [asyncio.ensure_future(func(item)) for item in items]
+    _, pending = await asyncio.wait(tasks, timeout=deadline)
+    for index, task in enumerate(tasks):
+        if task in pending:
+            task.cancel()
+            outcome.timed_out += 1
+        elif task.exception() is not None:
+            logger.warning("Fan-out call failed", exc_info=task.exception())
+            outcome.failed += 1
+        else:
+            outcome.results[index] = task.result()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    outcome.elapsed = time.monotonic() - started
+    return outcome
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ResponseScope",
+            fields=[
+                (
+                    "scope",
+                    models.CharField(
+                        help_text="Name of the response scope.",
+                        max_length=40,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "version",
+                    models.DateTimeField(
+                        help_text="When a write to the scope last committed."
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ResponseScope",
+            },
+        ),
+    ]
@@ -26,3 +26,23 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
         ordering = ["-created_at"]
+
+
+class ResponseScope(models.Model):
+    """
+    Time of the last write to a scope of cached list responses, shared by
+    every process through the database.
+    """
+
+    scope = models.CharField(
+        primary_key=True, max_length=40, help_text="Name of the response scope."
+    )
+    version = models.DateTimeField(
+        help_text="When a write to the scope last committed."
+    )
+
+    class Meta:
+        db_table = "ResponseScope"
+
+    def __str__(self):
+        return self.scope
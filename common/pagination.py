@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+import uuid
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Cursor pagination keyed on ``(key_field, id)``, by default
+    ``(created_at, id)`` newest first.
+
+    Pages are fetched with a seek predicate on the composite key rather than an
+    OFFSET, so a deep page costs the same as the first one. The cursor is an
+    opaque url-safe token holding the key of the boundary row and the direction.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    key_field = "created_at"
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self):
+        self.page_size = settings.PAGINATION_PAGE_SIZE
+        self.max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size, capped at ``max_page_size``.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of ``paginate_queryset`` for async views.
+        """
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([obj async for obj in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Apply the cursor's seek predicate and ordering, and slice one row past
+        the page size to know whether another page follows.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.reverse, self.position = self.decode_cursor(request)
+
+        key = self.key_field
+        if self.reverse:
+            queryset = queryset.order_by(key, "id")
+        else:
+            queryset = queryset.order_by(f"-{key}", "-id")
+
+        if self.position is not None:
+            value, pk = self.position
+            op = "gt" if self.reverse else "lt"
+            queryset = queryset.filter(
+                Q(**{f"{key}__{op}": value}) | Q(**{key: value, f"id__{op}": pk})
+            )
+
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results per page (max {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        """
+        Build a page URL whose cursor points just past ``instance``.
+        """
+        payload = json.dumps(
+            [
+                self.encode_key(getattr(instance, self.key_field)),
+                str(instance.pk),
+                int(reverse),
+            ],
+            separators=(",", ":"),
+        )
+        token = base64.urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """
+        Return ``(reverse, (key, id))`` from the request, or
+        ``(False, None)`` when no cursor was supplied.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return False, None
+
+        try:
+            payload = base64.urlsafe_b64decode(token.encode("ascii")).decode("ascii")
+            value, pk, reverse = json.loads(payload)
+            value = self.decode_key(value)
+            pk = uuid.UUID(pk)
+        except (binascii.Error, UnicodeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), (value, pk)
+
+    def encode_key(self, value):
+        return value.isoformat()
+
+    def decode_key(self, value):
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError("Cursor key is not a datetime.")
+        return value
+
+
+class SearchRankPagination(KeysetCursorPagination):
+    """
+    Cursor pagination over search results keyed on ``(rank, id)``, best match
+    first. The queryset must be annotated with ``rank``.
+    """
+
+    key_field = "rank"
+
+    def encode_key(self, value):
+        return value
+
+    def decode_key(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("Cursor key is not a rank.")
+        return float(value)
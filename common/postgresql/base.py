@@ -0,0 +1,60 @@
+import time
+
+from django.db import connections
+from django.db.backends.postgresql import base
+
+from common.stats import LatencyStats
+
+# Upper bounds (seconds) of the pool checkout histogram buckets
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5, 1, 5)
+
+_pool_waits = {}
+
+
+def pool_wait_stats(alias):
+    return _pool_waits.setdefault(alias, LatencyStats(POOL_WAIT_BUCKETS))
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's PostgreSQL backend, timing every checkout from the connection pool.
+    """
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+
+        started = time.perf_counter()
+        try:
+            connection = super().get_new_connection(conn_params)
+        except Exception:
+            pool_wait_stats(self.alias).record(
+                time.perf_counter() - started, error=True
+            )
+            raise
+        pool_wait_stats(self.alias).record(time.perf_counter() - started)
+        return connection
+
+
+def pool_stats():
+    """
+    Return in-use, idle and waiting counts plus the checkout wait histogram
+    for every pooled database connection in this process.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is None:
+            continue
+        counters = pool.get_stats()
+        stats[alias] = {
+            "size": counters.get("pool_size", 0),
+            "max_size": pool.max_size,
+            "in_use": counters.get("pool_size", 0) - counters.get("pool_available", 0),
+            "idle": counters.get("pool_available", 0),
+            "waiting": counters.get("requests_waiting", 0),
+            "timeouts": counters.get("requests_errors", 0),
+            "connections_lost": counters.get("connections_lost", 0),
+            "wait": pool_wait_stats(alias).snapshot(),
+        }
+    return stats
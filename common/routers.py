@@ -0,0 +1,163 @@
+import contextvars
+import inspect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed all WAL
+# it received, or when the alias actually points at a primary.
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+@dataclass
+class RoutingState:
+    """
+    Per-request routing flags. ``replica`` allows reads from a replica,
+    ``wrote`` pins the rest of the request to the primary.
+    """
+
+    replica: bool = False
+    wrote: bool = False
+
+
+_state = contextvars.ContextVar("db_routing_state", default=RoutingState())
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Let reads inside the block go to a replica until the first write.
+    """
+    token = _state.set(RoutingState(replica=enabled))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def use_replica(view):
+    """
+    Decorator for function views, sync or async, that only read.
+    """
+    if inspect.iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+
+    else:
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                return view(*args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """
+    Route the reads of the listed view actions (viewset actions such as
+    ``list``, or HTTP method names for plain ``APIView``s) to a replica.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        action = getattr(self, "action_map", {}).get(method, method)
+        with replica_reads(action in self.replica_actions):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaHealth:
+    """
+    Process-local cache of each replica's lag, refreshed at most every
+    ``DB_REPLICA_LAG_CHECK_INTERVAL`` seconds. Unreachable replicas count as
+    infinitely behind until the next check.
+    """
+
+    def __init__(self):
+        self._lags = {}
+        self._lock = threading.Lock()
+
+    def lag(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._lags.get(alias, (None, None))
+            if (
+                checked_at is not None
+                and now - checked_at < settings.DB_REPLICA_LAG_CHECK_INTERVAL
+            ):
+                return lag
+            # Other threads keep using the old value while this one checks.
+            self._lags[alias] = (now, lag if lag is not None else float("inf"))
+
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError as e:
+            logger.warning("Replica %s is unreachable: %s", alias, e)
+            lag = float("inf")
+
+        with self._lock:
+            self._lags[alias] = (time.monotonic(), lag)
+        return lag
+
+    def healthy(self, aliases):
+        return [
+            alias for alias in aliases if self.lag(alias) <= settings.DB_REPLICA_MAX_LAG
+        ]
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random healthy replica when the current request allows
+    it; everything else, and every read after a write, goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            not state.replica
+            or state.wrote
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        replicas = replica_health.healthy(settings.DATABASE_REPLICAS)
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state.replica:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,49 @@
+import threading
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class LatencyStats:
+    """
+    Thread-safe call count, error count and latency histogram, for one
+    upstream or one database's pool checkouts.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(self.bounds) + 1)
+
+    def record(self, seconds, error=False):
+        index = next(
+            (i for i, bound in enumerate(self.bounds) if seconds <= bound),
+            len(self.bounds),
+        )
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.buckets[index] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "avg_ms": (
+                    round(self.total_seconds / self.calls * 1000, 2)
+                    if self.calls
+                    else 0.0
+                ),
+                "max_ms": round(self.max_seconds * 1000, 2),
+                "histogram": dict(zip([*map(str, self.bounds), "+Inf"], self.buckets)),
+            }
@@ -0,0 +1,215 @@
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Descriptions of the phases in the Server-Timing header
+PHASES = {
+    "auth": "JWT authentication",
+    "db": "database",
+    "serialize": "serialization and rendering",
+    "user": "user service",
+    "schedule": "schedule service",
+    "location": "location service",
+}
+
+_timings = contextvars.ContextVar("request_timings", default=None)
+_active = contextvars.ContextVar("active_phases", default=frozenset())
+
+
+class RequestTimings:
+    """
+    Total time and count per phase of one request. Calls made concurrently
+    (an upstream fan-out) add up, so a phase can exceed the request's time.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            total = self.phases.setdefault(phase, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def header(self, total):
+        """
+        The ``Server-Timing`` header value, durations in milliseconds.
+        """
+        metrics = []
+        for phase, (seconds, count) in self.phases.items():
+            description = PHASES.get(phase, phase)
+            metrics.append(
+                f'{phase};dur={seconds * 1000:.2f};desc="{description} ({count})"'
+            )
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+def record(phase, seconds):
+    """
+    Add ``seconds`` to ``phase`` of the current request, if it is sampled.
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Execute wrapper timing queries as the db phase of the current request.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - started)
+
+
+def install_query_timer(connection, **kwargs):
+    # First in the list, so wrappers pushed and popped around a block by
+    # ``execute_wrapper`` stay last.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def timing(phase):
+    """
+    Whether a ``timed(phase)`` block would be timed now: the request is
+    sampled and no block of the phase is open.
+    """
+    return _timings.get() is not None and phase not in _active.get()
+
+
+@contextmanager
+def timed(phase):
+    """
+    Time the block as ``phase`` of the current request. Blocks nested in one
+    of the same phase (a nested serializer) are counted once, by the outer.
+    """
+    timings = _timings.get()
+    active = _active.get()
+    if timings is None or phase in active:
+        yield
+        return
+    token = _active.set(active | {phase})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+        _active.reset(token)
+
+
+class TimedRepresentationMixin:
+    """
+    Serializer mixin timing ``to_representation`` as the serialize phase.
+    """
+
+    def to_representation(self, instance):
+        if not timing("serialize"):  # Skip the context manager per object
+            return super().to_representation(instance)
+        with timed("serialize"):
+            return super().to_representation(instance)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` timing the encoding as the serialize phase.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed("serialize"):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class ServerTimingMiddleware:
+    """
+    Measure where a request's time goes and report it in a ``Server-Timing``
+    header.
+
+    A ``SERVER_TIMING_SAMPLE_RATE`` share of requests is measured; the rest
+    pass straight through. The measured request's timings live in a context
+    variable, which follows it into ``sync_to_async`` threads and upstream
+    fan-out workers: every database connection carries an execute wrapper
+    timing queries while one is set, and the upstream clients, JWT
+    authentication, serializers and the JSON renderer record their phases
+    through ``record``/``timed``. Every measured request is logged as one
+    JSON line: at INFO from ``SERVER_TIMING_LOG_THRESHOLD_MS`` on, at DEBUG
+    below it.
+
+    Streaming responses are measured up to their first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_timer, dispatch_uid=__name__)
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    def report(self, request, response, timings, total):
+        response["Server-Timing"] = timings.header(total)
+        slow = total * 1000 >= settings.SERVER_TIMING_LOG_THRESHOLD_MS
+        level = logging.INFO if slow else logging.DEBUG
+        if logger.isEnabledFor(level):
+            payload = {
+                "event": "request_timing",
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 2),
+                "phases": {
+                    phase: {"ms": round(seconds * 1000, 2), "count": count}
+                    for phase, (seconds, count) in timings.phases.items()
+                },
+            }
+            logger.log(level, json.dumps(payload), extra={"timing": payload})
+        return response
@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from common.stats import LatencyStats
+from common.timing import record
+
+# Upstream name -> settings attribute holding its base URL
+UPSTREAMS = {
+    "user": "USER_SERVICE_API",
+    "schedule": "SCHEDULE_SERVICE_URL",
+    "location": "LOCATION_SERVICE_URL",
+}
+
+
+class UpstreamClient:
+    """
+    Keep-alive HTTP client for one upstream service.
+
+    Wraps a ``requests.Session`` whose connection pool is sized per upstream,
+    applies a default timeout, retries idempotent methods with jittered
+    exponential backoff, and records per-call latency, also as a phase of
+    the current request's timings.
+    """
+
+    def __init__(self, name, setting, pool_size, timeout, retries, backoff):
+        self.name = name
+        self.setting = setting
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.stats = LatencyStats()
+        self.session = requests.Session()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            backoff_jitter=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+    @property
+    def base_url(self):
+        # Read at call time so settings overrides apply to cached clients.
+        return getattr(settings, self.setting)
+
+    def url(self, path):
+        return f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except requests.RequestException as e:
+            self.record(time.perf_counter() - started, error=True)
+            # With retries mounted, requests reports an exhausted read timeout
+            # as a plain ConnectionError; keep it catchable as a Timeout.
+            cause = getattr(e.args[0], "reason", None) if e.args else None
+            if isinstance(cause, ReadTimeoutError):
+                raise requests.ReadTimeout(*e.args, request=e.request) from e
+            raise
+        self.record(time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+    def record(self, seconds, error):
+        self.stats.record(seconds, error=error)
+        record(self.name, seconds)
+
+    def pool_stats(self):
+        """
+        Connections opened so far and those idle in the keep-alive pool,
+        against the pool's size.
+        """
+        pools = self.adapter.poolmanager.pools
+        opened = idle = 0
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            idle += sum(conn is not None for conn in list(pool.pool.queue))
+        return {"size": self.pool_size, "opened": opened, "idle": idle}
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+
+class AsyncUpstreamClient:
+    """
+    asyncio counterpart of ``UpstreamClient`` built on ``httpx.AsyncClient``.
+
+    Keeps up to ``pool_size`` keep-alive connections so a single event loop can
+    have that many calls in flight. Connection failures are retried by the
+    transport; latency is recorded in the matching sync client's stats.
+    """
+
+    def __init__(self, name, setting, pool_size, timeout, retries, stats):
+        self.name = name
+        self.setting = setting
+        self.stats = stats
+        limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(retries=retries, limits=limits),
+        )
+
+    @property
+    def base_url(self):
+        return getattr(settings, self.setting)
+
+    def url(self, path):
+        return f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+
+    async def request(self, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, self.url(path), **kwargs)
+        except httpx.HTTPError:
+            self.record(time.perf_counter() - started, error=True)
+            raise
+        self.record(time.perf_counter() - started, error=response.status_code >= 500)
+        return response
+
+    def record(self, seconds, error):
+        self.stats.record(seconds, error=error)
+        record(self.name, seconds)
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def upstream(name):
+    """
+    Return the shared, process-wide client for the named upstream service.
+    """
+    client = _clients.get(name)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = UpstreamClient(
+                name,
+                UPSTREAMS[name],
+                pool_size=settings.UPSTREAM_POOL_SIZES.get(
+                    name, settings.UPSTREAM_POOL_SIZE
+                ),
+                timeout=settings.UPSTREAM_TIMEOUT,
+                retries=settings.UPSTREAM_RETRIES,
+                backoff=settings.UPSTREAM_RETRY_BACKOFF,
+            )
+        return _clients[name]
+
+
+def async_upstream(name):
+    """
+    Return the async client for the named upstream on the running event loop.
+
+    httpx connections are bound to the loop that opened them, so clients are
+    kept per loop and dropped with it.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    if name not in clients:
+        clients[name] = AsyncUpstreamClient(
+            name,
+            UPSTREAMS[name],
+            pool_size=settings.UPSTREAM_ASYNC_POOL_SIZE,
+            timeout=settings.UPSTREAM_TIMEOUT,
+            retries=settings.UPSTREAM_RETRIES,
+            stats=upstream(name).stats,
+        )
+    return clients[name]
+
+
+def upstream_stats():
+    """
+    Return latency and connection pool stats for every upstream client created
+    in this process.
+    """
+    return {
+        name: {**client.stats.snapshot(), "pool": client.pool_stats()}
+        for name, client in _clients.items()
+    }
@@ -0,0 +1,57 @@
+"""
+Gunicorn configuration for production.
+
+Run with ``gunicorn -c python:core.gunicorn_conf``. ``SERVER_MODE`` picks the
+worker model: ``sync`` serves ``core.wsgi`` from preforked (optionally
+threaded) workers, ``asgi`` serves ``core.asgi`` from uvicorn event-loop
+workers. Everything else is tuned through the environment variables below.
+"""
+
+import multiprocessing
+
+from environs import Env
+
+env = Env()
+env.read_env()
+
+# Worker model
+SERVER_MODE = env.str("SERVER_MODE", default="sync")
+if SERVER_MODE not in ("sync", "asgi"):
+    raise ValueError(f"SERVER_MODE must be 'sync' or 'asgi', not '{SERVER_MODE}'.")
+
+bind = env.str("GUNICORN_BIND", default=f"0.0.0.0:{env.int('PORT', default=8000)}")
+workers = env.int("WEB_CONCURRENCY", default=multiprocessing.cpu_count() * 2 + 1)
+threads = env.int("GUNICORN_THREADS", default=1)
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "core.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "core.wsgi:application"
+    # Plain sync workers ignore keep-alive; threaded workers honour it.
+    worker_class = "gthread" if threads > 1 else "sync"
+
+# Connections and recycling
+keepalive = env.int("GUNICORN_KEEPALIVE", default=5)
+max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+max_requests_jitter = env.int("GUNICORN_MAX_REQUESTS_JITTER", default=100)
+timeout = env.int("GUNICORN_TIMEOUT", default=30)
+graceful_timeout = env.int("GUNICORN_GRACEFUL_TIMEOUT", default=30)
+
+# Import Django once in the master so workers share its memory copy-on-write
+preload_app = env.bool("GUNICORN_PRELOAD", default=True)
+
+# Logging
+accesslog = env.str("GUNICORN_ACCESS_LOG", default="-")
+errorlog = "-"
+loglevel = env.str("GUNICORN_LOG_LEVEL", default="info")
+
+
+def post_fork(server, worker):
+    """
+    Drop any database connection inherited from the preloaded master, so
+    workers never share a socket.
+    """
+    from django.db import connections
+
+    connections.close_all()
@@ -1,3 +1,4 @@
+import copy
 from pathlib import Path
 from datetime import timedelta
 from environs import Env
@@ -19,14 +20,17 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.contenttypes",
     "django.contrib.auth",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
+    "common",
     "service",
     "tenant",
 ]
 
 # Middleware
 MIDDLEWARE = [
+    "common.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,22 +38,70 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
 ]
 
+# Logging for the project's own packages; Django's loggers keep their defaults
+LOG_LEVEL = env.str("LOG_LEVEL", default="INFO")
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        name: {"handlers": ["console"], "level": LOG_LEVEL, "propagate": False}
+        for name in ("common", "service", "tenant")
+    },
+}
+
 # Root URL configuration
 ROOT_URLCONF = "core.urls"
 
+# Database connection pool, one per process (requires psycopg 3)
+DB_POOL_ENABLED = env.bool("DB_POOL_ENABLED", default=True)
+DB_POOL_MIN_SIZE = env.int("DB_POOL_MIN_SIZE", default=2)
+DB_POOL_MAX_SIZE = env.int("DB_POOL_MAX_SIZE", default=10)
+DB_POOL_TIMEOUT = env.float("DB_POOL_TIMEOUT", default=10)
+DB_POOL_MAX_IDLE = env.float("DB_POOL_MAX_IDLE", default=300)
+DB_POOL_MAX_LIFETIME = env.float("DB_POOL_MAX_LIFETIME", default=3600)
+DB_POOL_OPTIONS = DB_POOL_ENABLED and {
+    "min_size": DB_POOL_MIN_SIZE,
+    "max_size": DB_POOL_MAX_SIZE,
+    "timeout": DB_POOL_TIMEOUT,
+    "max_idle": DB_POOL_MAX_IDLE,
+    "max_lifetime": DB_POOL_MAX_LIFETIME,
+}
+
 # Database settings
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "common.postgresql",
         "NAME": env.str("POSTGRES_DB", default="app_database"),
         "USER": env.str("POSTGRES_USER", default="postgres"),
         "PASSWORD": env.str("POSTGRES_PASSWORD", default="password"),
         "HOST": env.str("POSTGRES_HOST", default="localhost"),
         "PORT": env.int("POSTGRES_PORT", default=5432),
-        "OPTIONS": {"options": "-c search_path=tenant_api"},
+        # Checked out connections are pinged before use
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "options": "-c search_path=tenant_api",
+            "pool": DB_POOL_OPTIONS,
+        },
     }
 }
 
+# Read replicas: hosts sharing the primary's database and credentials. Safe
+# reads are routed to them by common.routers.ReplicaRouter.
+DB_REPLICA_HOSTS = env.list("POSTGRES_REPLICA_HOSTS", default=[])
+DB_REPLICA_MAX_LAG = env.float("DB_REPLICA_MAX_LAG", default=5)
+DB_REPLICA_LAG_CHECK_INTERVAL = env.float("DB_REPLICA_LAG_CHECK_INTERVAL", default=5)
+DATABASE_REPLICAS = []
+for index, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["common.routers.ReplicaRouter"]
+
 # REST framework settings
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -59,8 +111,28 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "common.timing.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
+# Default and maximum ``page_size`` for cursor-paginated lists
+PAGINATION_PAGE_SIZE = env.int("PAGINATION_PAGE_SIZE", default=50)
+PAGINATION_MAX_PAGE_SIZE = env.int("PAGINATION_MAX_PAGE_SIZE", default=200)
+
+# Rows fetched per server-side cursor round trip by the streaming export
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+
+# Most items accepted by one batch create/update/delete request
+SERVICE_BATCH_MAX_SIZE = env.int("SERVICE_BATCH_MAX_SIZE", default=500)
+
+# Largest radius (miles) accepted by the available-services search
+LOCATION_SEARCH_MAX_RADIUS_MI = env.float("LOCATION_SEARCH_MAX_RADIUS_MI", default=100)
+
+# Text search configuration used to build and query service search vectors
+SEARCH_CONFIG = env.str("SEARCH_CONFIG", default="english")
+
 # Simple JWT settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=300),
@@ -70,6 +142,9 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Per-process cache of verified JWTs (service.authentication); 0 disables it
+AUTH_TOKEN_CACHE_SIZE = env.int("AUTH_TOKEN_CACHE_SIZE", default=10000)
+
 # API documentation settings
 SPECTACULAR_SETTINGS = {
     "TITLE": "Capsule Service API",
@@ -103,5 +178,83 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 USER_SERVICE_API = "http://user-api:8000/api/auth/"
 
+# Upstream service endpoints
+LOCATION_SERVICE_URL = env.str(
+    "LOCATION_SERVICE_URL", default="http://location-api:8000"
+)
+SCHEDULE_SERVICE_URL = env.str(
+    "SCHEDULE_SERVICE_URL", default="http://schedule-api:8000"
+)
+SERVICE_API_KEY = env.str("SERVICE_API_KEY", default="")
+
+# Schedule availability fan-out (AvailableServicesView)
+SCHEDULE_FANOUT_WORKERS = env.int("SCHEDULE_FANOUT_WORKERS", default=16)
+SCHEDULE_CHECK_TIMEOUT = env.float("SCHEDULE_CHECK_TIMEOUT", default=2.0)
+SCHEDULE_FANOUT_DEADLINE = env.float("SCHEDULE_FANOUT_DEADLINE", default=5.0)
+
+# Outbound HTTP client (common.upstream): default timeout (seconds), keep-alive
+# pool size per upstream, and retries with jittered backoff for idempotent calls
+UPSTREAM_TIMEOUT = env.float("UPSTREAM_TIMEOUT", default=5.0)
+UPSTREAM_POOL_SIZE = env.int("UPSTREAM_POOL_SIZE", default=10)
+UPSTREAM_POOL_SIZES = env.dict(
+    "UPSTREAM_POOL_SIZES",
+    subcast_values=int,
+    default={"schedule": SCHEDULE_FANOUT_WORKERS},
+)
+UPSTREAM_ASYNC_POOL_SIZE = env.int("UPSTREAM_ASYNC_POOL_SIZE", default=200)
+UPSTREAM_RETRIES = env.int("UPSTREAM_RETRIES", default=2)
+UPSTREAM_RETRY_BACKOFF = env.float("UPSTREAM_RETRY_BACKOFF", default=0.1)
+
+# Cache
+CACHES = {
+    "default": {
+        "BACKEND": env.str(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": env.str("CACHE_LOCATION", default="tenant-service"),
+    }
+}
+
+# Lifetime (seconds) of cached public list bodies (service catalog, plans)
+RESPONSE_CACHE_TTL = env.int("RESPONSE_CACHE_TTL", default=300)
+
+# Per-request phase timings (common.timing): share of requests measured and
+# given a Server-Timing header, and the duration (ms) from which a measured
+# request's JSON log line is at INFO rather than DEBUG
+SERVER_TIMING_SAMPLE_RATE = env.float("SERVER_TIMING_SAMPLE_RATE", default=1.0)
+SERVER_TIMING_LOG_THRESHOLD_MS = env.float(
+    "SERVER_TIMING_LOG_THRESHOLD_MS", default=500
+)
+
+# ServiceLocation upstream lookup cache TTLs (seconds)
+SERVICE_AVAILABILITY_CACHE_TTL = env.int("SERVICE_AVAILABILITY_CACHE_TTL", default=10)
+SERVICE_ADDRESS_CACHE_TTL = env.int("SERVICE_ADDRESS_CACHE_TTL", default=86400)
+SERVICE_NEGATIVE_CACHE_TTL = env.int("SERVICE_NEGATIVE_CACHE_TTL", default=60)
+
 KAFKA_TOPIC = env.str("KAFKA_TOPIC", default="default_topic")
 KAFKA_SERVERS = env.list("KAFKA_SERVERS", default=["kafka:9092"])
+
+# Event producer (common.events): "kafka", or "memory" for an in-process fake
+KAFKA_BACKEND = env.str("KAFKA_BACKEND", default="kafka")
+KAFKA_LINGER_MS = env.int("KAFKA_LINGER_MS", default=20)
+KAFKA_BATCH_SIZE = env.int("KAFKA_BATCH_SIZE", default=32768)
+KAFKA_COMPRESSION_TYPE = env.str("KAFKA_COMPRESSION_TYPE", default=None)
+KAFKA_MAX_BLOCK_MS = env.int("KAFKA_MAX_BLOCK_MS", default=5000)
+# Bounded in-memory buffer and what to do when it is full:
+# "drop_newest", "drop_oldest" or "spill" (append to KAFKA_SPILL_PATH)
+KAFKA_BUFFER_SIZE = env.int("KAFKA_BUFFER_SIZE", default=10000)
+KAFKA_OVERFLOW_POLICY = env.str("KAFKA_OVERFLOW_POLICY", default="drop_newest")
+KAFKA_SPILL_PATH = env.str("KAFKA_SPILL_PATH", default=None)
+
+# Tenant plans: plan applied to new tenants, and plan cache lifetime (seconds)
+DEFAULT_TENANT_PLAN = env.str("DEFAULT_TENANT_PLAN", default="Free")
+TENANT_PLAN_CACHE_TTL = env.int("TENANT_PLAN_CACHE_TTL", default=300)
+
+# Tenant outbox relay (manage.py relay_outbox)
+OUTBOX_BATCH_SIZE = env.int("OUTBOX_BATCH_SIZE", default=100)
+OUTBOX_POLL_INTERVAL = env.float("OUTBOX_POLL_INTERVAL", default=1.0)
+OUTBOX_MAX_ATTEMPTS = env.int("OUTBOX_MAX_ATTEMPTS", default=8)
+OUTBOX_RETRY_BACKOFF = env.float("OUTBOX_RETRY_BACKOFF", default=2.0)
+OUTBOX_RETRY_BACKOFF_MAX = env.float("OUTBOX_RETRY_BACKOFF_MAX", default=300.0)
+# How long a relay owns the events it claimed; must cover delivering a batch
+OUTBOX_LEASE_SECONDS = env.float("OUTBOX_LEASE_SECONDS", default=600.0)
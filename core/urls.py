@@ -7,9 +7,12 @@ from drf_spectacular.views import (
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import permission_classes
 
+from .views import MetricsView
+
 urlpatterns = [
     path("api/services/", include("service.urls")),
     path("api/tenant/", include("tenant.urls")),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 urlpatterns += [
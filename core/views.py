@@ -0,0 +1,22 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.postgresql.base import pool_stats
+from common.upstream import upstream_stats
+from service.authentication import token_cache
+
+
+class MetricsView(APIView):
+    """
+    Per-process runtime stats: database pool, upstream clients and the
+    verified-token cache. Each worker process reports only its own numbers.
+    """
+
+    def get(self, request):
+        return Response(
+            {
+                "db_pool": pool_stats(),
+                "upstreams": upstream_stats(),
+                "auth_token_cache": token_cache.stats(),
+            }
+        )
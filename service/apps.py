@@ -6,4 +6,4 @@ class ServiceConfig(AppConfig):
     name = "service"
 
     def ready(self):
-        pass
+        import service.signals
@@ -0,0 +1,158 @@
+import httpx
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from common.fanout import afan_out
+from common.pagination import KeysetCursorPagination
+from common.routers import use_replica
+from common.timing import TimedJSONRenderer
+from common.upstream import async_upstream
+from .authentication import CustomJWTAuthentication
+from .geo import nearby_service_locations, nearest_services, parse_search_area
+from .models import Service
+from .serializers import ServiceSerializer, get_expanded_fields
+from .views import merge_service_details, service_details_queryset
+
+# Async (ASGI-native) counterparts of the read-only service endpoints. They run
+# on the event loop without a thread hop per request, and upstream calls use
+# httpx so one worker can keep many of them in flight. The DRF views in
+# ``views.py`` stay mounted at their usual URLs for side-by-side comparison.
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    """
+    Render ``data`` as JSON the same way the DRF views do.
+    """
+    return HttpResponse(
+        TimedJSONRenderer().render(data),
+        content_type="application/json",
+        status=status_code,
+    )
+
+
+def authenticate(request, **kwargs):
+    """
+    Wrap ``request`` for the serializers and authenticate it with the JWT
+    backend. Returns ``(drf_request, None)`` or ``(None, error_response)``.
+    """
+    drf_request = Request(request, parser_context={"kwargs": kwargs})
+    try:
+        result = CustomJWTAuthentication().authenticate(request)
+    except AuthenticationFailed as exc:
+        return None, render({"detail": str(exc.detail)}, status.HTTP_401_UNAUTHORIZED)
+    if result is None:
+        return None, render(
+            {"detail": "Authentication credentials were not provided."},
+            status.HTTP_401_UNAUTHORIZED,
+        )
+    drf_request.user, drf_request.auth = result
+    return drf_request, None
+
+
+async def acheck_schedule_availability(service_id, date, time):
+    """
+    Async version of ``check_schedule_availability``.
+    """
+    response = await async_upstream("schedule").get(
+        "api/schedule/availability",
+        params={"service_id": service_id, "date": date, "time": time},
+        timeout=settings.SCHEDULE_CHECK_TIMEOUT,
+    )
+    return response.status_code == 200 and bool(response.json().get("available"))
+
+
+@require_GET
+@use_replica
+async def service_list(request):
+    """
+    Async version of the service list endpoint.
+    """
+    drf_request, error = authenticate(request)
+    if error is not None:
+        return error
+
+    queryset = Service.objects.all()
+    if "options" in get_expanded_fields(drf_request):
+        queryset = queryset.prefetch_related("options__values")
+
+    paginator = KeysetCursorPagination()
+    page = await paginator.apaginate_queryset(queryset, drf_request)
+    serializer = ServiceSerializer(page, many=True, context={"request": drf_request})
+    return render(paginator.get_paginated_response(serializer.data).data)
+
+
+@require_GET
+@use_replica
+async def service_detail(request, pk):
+    """
+    Async version of the service detail endpoint.
+    """
+    drf_request, error = authenticate(request, pk=pk)
+    if error is not None:
+        return error
+
+    try:
+        service = await Service.objects.prefetch_related("options__values").aget(pk=pk)
+    except Service.DoesNotExist:
+        return render({"detail": "No Service matches the given query."}, 404)
+
+    serializer = ServiceSerializer(service, context={"request": drf_request})
+    return render(serializer.data)
+
+
+@require_GET
+@use_replica
+async def available_services(request):
+    """
+    Async version of ``AvailableServicesView``.
+    """
+    drf_request, error = authenticate(request)
+    if error is not None:
+        return error
+
+    date = request.GET.get("date", None)
+    time = request.GET.get("time", None)
+
+    try:
+        latitude, longitude, radius = parse_search_area(request.GET)
+    except ValueError as e:
+        return render({"error": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        locations = nearby_service_locations(latitude, longitude, radius)
+        services = nearest_services([row async for row in locations])
+
+        unchecked = 0
+        if date and time:
+            checks = await afan_out(
+                lambda service: acheck_schedule_availability(service["id"], date, time),
+                services,
+                deadline=settings.SCHEDULE_FANOUT_DEADLINE,
+            )
+            services = [
+                service
+                for service, available in zip(services, checks.results)
+                if available
+            ]
+            unchecked = checks.failed + checks.timed_out
+
+        queryset = service_details_queryset(services)
+        if queryset is not None:
+            instances = [instance async for instance in queryset]
+            merge_service_details(services, instances, drf_request)
+
+        response = render(services)
+        if unchecked:
+            response["X-Partial-Results"] = "true"
+            response["X-Unchecked-Services"] = str(unchecked)
+        return response
+
+    except httpx.HTTPError as e:
+        return render(
+            {"error": f"Service request failed: {str(e)}"},
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -1,8 +1,18 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from common.timing import timed
+
 
 class SimulatedUser:
+    __slots__ = ("user_id", "username", "email")
+
     def __init__(self, user_id, username, email):
         self.user_id = user_id
         self.username = username
@@ -16,8 +26,72 @@ class SimulatedUser:
         return self.username
 
 
+class VerifiedTokenCache:
+    """
+    Bounded, per-process LRU of already verified tokens.
+
+    Keys are SHA-256 digests of the raw token, so the cache never holds bearer
+    credentials. Entries keep only the user and the token's ``exp`` claim, at
+    which they expire.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(raw_token):
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, user, expires_at):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (user, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+token_cache = VerifiedTokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
 class CustomJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
+        with timed("auth"):
+            return self.authenticate_token(request)
+
+    def authenticate_token(self, request):
         # Get the header from the request
         header = self.get_header(request)
         if header is None:  # Handle missing header
@@ -28,6 +102,13 @@ class CustomJWTAuthentication(JWTAuthentication):
         if raw_token is None:  # Handle missing token
             return None
 
+        # Skip signature verification for tokens verified recently. The
+        # validated token is not kept, so such requests have no request.auth.
+        cache_key = token_cache.key(raw_token)
+        user = token_cache.get(cache_key)
+        if user is not None:
+            return user, None
+
         try:
             # Validate the token
             validated_token = self.get_validated_token(raw_token)
@@ -44,4 +125,5 @@ class CustomJWTAuthentication(JWTAuthentication):
 
         # Create and return the user and token
         user = SimulatedUser(user_id=user_id, username=username, email=email)
+        token_cache.set(cache_key, user, validated_token["exp"])
         return user, validated_token
@@ -0,0 +1,222 @@
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from common.conditional import invalidate_responses
+from tenant.models import Tenant
+from .models import Service, ServiceOption, ServiceOptionValue
+from .nested import OPTION_FIELDS, _build_value, sync_services_options
+from .search import refresh_search_vectors
+from .serializers import BatchServiceSerializer
+
+# Fields a batch update may change, as in ServiceSerializer.update
+UPDATE_FIELDS = (
+    "name",
+    "category",
+    "description",
+    "price",
+    "is_available",
+    "max_clients_per_slot",
+    "image",
+    "duration_minutes",
+)
+
+
+def rejected(errors):
+    """
+    Per-item results for a batch that was not written: the errors of invalid
+    items, and ``skipped`` for the valid ones.
+    """
+    return [
+        (
+            {"index": i, "status": "invalid", "errors": item_errors}
+            if item_errors
+            else {"index": i, "status": "skipped"}
+        )
+        for i, item_errors in enumerate(errors)
+    ]
+
+
+def written(instances, status):
+    return [
+        {"index": i, "id": str(instance.pk), "status": status}
+        for i, instance in enumerate(instances)
+    ]
+
+
+def validate_items(batch):
+    """
+    Validate every item's serializer and return their errors, ``{}`` for
+    valid items.
+    """
+    return [{} if item.is_valid() else dict(item.errors) for item in batch]
+
+
+def parse_item_ids(items):
+    """
+    Return each item's service id, or ``None`` with an error for items that
+    lack a valid one or repeat an earlier item's. Items are either ids or
+    objects with an ``id``.
+    """
+    ids, errors, seen = [], [], set()
+    for item in items:
+        try:
+            service_id = uuid.UUID(
+                str(item.get("id") if isinstance(item, dict) else item)
+            )
+        except ValueError:
+            ids.append(None)
+            errors.append({"id": ["A valid service id is required."]})
+            continue
+        if service_id in seen:
+            ids.append(None)
+            errors.append({"id": ["Duplicate id in batch."]})
+        else:
+            seen.add(service_id)
+            ids.append(service_id)
+            errors.append({})
+    return ids, errors
+
+
+def create_services(items, context):
+    """
+    Create services, with their nested options and values, from ``items``.
+
+    All items are validated first, tenants in a single query. If any item is
+    invalid nothing is written; otherwise services, options and values are
+    inserted with one ``bulk_create`` each in a single transaction. Returns
+    ``(results, ok)``.
+    """
+    batch = [BatchServiceSerializer(data=item, context=context) for item in items]
+    errors = validate_items(batch)
+
+    tenant_ids = {
+        item.validated_data["tenant_id"]
+        for item, item_errors in zip(batch, errors)
+        if not item_errors
+    }
+    known_tenants = set(
+        Tenant.objects.filter(id__in=tenant_ids).values_list("id", flat=True)
+    )
+    for item, item_errors in zip(batch, errors):
+        if not item_errors and item.validated_data["tenant_id"] not in known_tenants:
+            tenant_id = item.validated_data["tenant_id"]
+            item_errors["tenant"] = [
+                f'Invalid pk "{tenant_id}" - object does not exist.'
+            ]
+    if any(errors):
+        return rejected(errors), False
+
+    services, options, values = [], [], []
+    for item in batch:
+        data = dict(item.validated_data)
+        service = Service(**{k: v for k, v in data.items() if k != "options"})
+        services.append(service)
+        for option_data in data.get("options") or []:
+            option = ServiceOption(
+                service=service,
+                **{f: option_data[f] for f in OPTION_FIELDS if f in option_data},
+            )
+            options.append(option)
+            values.extend(
+                _build_value(option, v) for v in option_data.get("values", [])
+            )
+
+    with transaction.atomic():
+        Service.objects.bulk_create(services)
+        ServiceOption.objects.bulk_create(options)
+        ServiceOptionValue.objects.bulk_create(values)
+        # Bulk writes skip the signals that keep the search vector and the
+        # cached catalog current.
+        refresh_search_vectors([service.pk for service in services])
+        invalidate_responses("services")
+    return written(services, "created"), True
+
+
+def update_services(items, context):
+    """
+    Partially update the services identified by each item's ``id``.
+
+    Services are loaded in one query and every item is validated before any
+    write. Service fields are written with a single ``bulk_update``; items
+    carrying ``options`` have them synced like a nested PATCH, all together
+    with one write per table, so the batch costs a constant number of
+    queries. Any error rolls the whole batch back. Returns ``(results, ok)``.
+    """
+    ids, errors = parse_item_ids(items)
+    instances = Service.objects.in_bulk([pk for pk in ids if pk is not None])
+
+    batch = []
+    for item, service_id, item_errors in zip(items, ids, errors):
+        instance = instances.get(service_id)
+        if service_id is not None and instance is None:
+            item_errors["id"] = ["Service not found."]
+        if item_errors:
+            batch.append(None)
+            continue
+        serializer = BatchServiceSerializer(
+            instance, data=item, partial=True, context=context
+        )
+        if not serializer.is_valid():
+            item_errors.update(serializer.errors)
+        batch.append(serializer)
+    if any(errors):
+        return rejected(errors), False
+
+    now = timezone.now()
+    fields = set()
+    for serializer in batch:
+        for field in UPDATE_FIELDS:
+            if field in serializer.validated_data:
+                setattr(serializer.instance, field, serializer.validated_data[field])
+                fields.add(field)
+        serializer.instance.updated_at = now
+
+    with transaction.atomic():
+        services = [serializer.instance for serializer in batch]
+        Service.objects.bulk_update(services, [*sorted(fields), "updated_at"])
+        synced = [
+            (serializer.instance, serializer.validated_data["options"], item_errors)
+            for serializer, item_errors in zip(batch, errors)
+            if serializer.validated_data.get("options") is not None
+        ]
+        if synced:
+            _, option_errors = sync_services_options(
+                [(service, options_data) for service, options_data, _ in synced]
+            )
+            for (_, _, item_errors), sync_errors in zip(synced, option_errors):
+                item_errors.update(sync_errors)
+        if any(errors):
+            transaction.set_rollback(True)
+            return rejected(errors), False
+
+        refresh_search_vectors([service.pk for service in services])
+        invalidate_responses("services")
+    return written(services, "updated"), True
+
+
+def delete_services(items):
+    """
+    Delete the services whose ids are listed in ``items``, all or none.
+    Returns ``(results, ok)``.
+    """
+    ids, errors = parse_item_ids(items)
+    existing = set(
+        Service.objects.filter(id__in=[pk for pk in ids if pk is not None]).values_list(
+            "id", flat=True
+        )
+    )
+    for service_id, item_errors in zip(ids, errors):
+        if service_id is not None and service_id not in existing:
+            item_errors["id"] = ["Service not found."]
+    if any(errors):
+        return rejected(errors), False
+
+    with transaction.atomic():
+        Service.objects.filter(id__in=ids).delete()
+        invalidate_responses("services")
+    return [
+        {"index": i, "id": str(service_id), "status": "deleted"}
+        for i, service_id in enumerate(ids)
+    ], True
@@ -0,0 +1,394 @@
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tenant.models import Tenant, TenantLocation
+from .models import Service
+from .synthetic import CatalogGenerator, Shape
+
+# Shape of every benchmark dataset; only the tenant count varies
+DATASET_SHAPE = {
+    "locations_per_tenant": (1, 3),
+    "services_per_tenant": (10, 90),
+    "options_per_service": (0, 3),
+    "values_per_option": (2, 4),
+    "centers": 10,
+    "spread_mi": 15.0,
+}
+
+# Metrics a budget can cap
+BUDGET_METRICS = ("queries", "p50_ms", "p95_ms", "peak_kb")
+
+# Transaction control, left out of query counts: savepoints depend on whether
+# the caller already holds a transaction
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """
+    One request to benchmark. ``path``, string ``params`` and ``body`` are
+    formatted with the dataset's fixtures (``tenant``, ``service``,
+    ``latitude``, ``longitude``). Endpoints that ``write`` run inside a
+    transaction that is rolled back after every request.
+    """
+
+    name: str
+    path: str
+    method: str = "get"
+    params: dict = field(default_factory=dict)
+    body: object = None
+    status: int = 200
+    writes: bool = False
+
+
+def service_payload(name):
+    return {
+        "tenant": "{tenant}",
+        "name": name,
+        "price": "25.00",
+        "options": [
+            {
+                "name": "Length",
+                "values": [
+                    {"name": "30"},
+                    {"name": "60", "additional_price": "10.00"},
+                ],
+            }
+        ],
+    }
+
+
+AVAILABILITY = {
+    "latitude": "{latitude}",
+    "longitude": "{longitude}",
+    "radius": "1",
+    "date": "2025-01-01",
+    "time": "10:00",
+}
+
+ENDPOINTS = (
+    Endpoint("service-list", "/api/services/"),
+    Endpoint("service-list-options", "/api/services/", params={"expand": "options"}),
+    Endpoint("service-detail", "/api/services/{service}/"),
+    Endpoint("service-options", "/api/services/{service}/options/"),
+    Endpoint("service-catalog", "/api/services/catalog/"),
+    Endpoint("service-search", "/api/services/search/", params={"q": "premium mas"}),
+    Endpoint(
+        "service-export",
+        "/api/services/export/",
+        params={"tenant": "{tenant}", "expand": "options"},
+    ),
+    Endpoint("service-available", "/api/services/available/", params=AVAILABILITY),
+    Endpoint("service-list-async", "/api/services/async/"),
+    Endpoint("service-detail-async", "/api/services/async/{service}/"),
+    Endpoint(
+        "service-available-async",
+        "/api/services/async/available/",
+        params=AVAILABILITY,
+    ),
+    Endpoint(
+        "service-create",
+        "/api/services/",
+        method="post",
+        body=service_payload("Benchmark service"),
+        status=201,
+        writes=True,
+    ),
+    Endpoint(
+        "service-update",
+        "/api/services/{service}/",
+        method="patch",
+        body={"price": "30.00", "options": service_payload("")["options"]},
+        writes=True,
+    ),
+    Endpoint(
+        "service-batch-create",
+        "/api/services/batch/",
+        method="post",
+        body=[service_payload(f"Benchmark service {i}") for i in range(50)],
+        status=201,
+        writes=True,
+    ),
+    Endpoint("tenant-list", "/api/tenant/"),
+    Endpoint("tenant-detail", "/api/tenant/{tenant}/"),
+    Endpoint("plan-list", "/api/tenant/plans/"),
+    Endpoint("metrics", "/api/metrics/"),
+)
+
+
+class StubScheduleHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the schedule service, the only upstream the endpoints
+    call. About three services in four are available, decided by their id.
+    ``delay`` adds a fixed latency to every answer.
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, as pooled clients expect
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/api/schedule/availability":
+            return self.reply(404, {})
+        if self.delay:
+            time.sleep(self.delay)
+        service_id = parse_qs(url.query).get("service_id", [""])[0]
+        return self.reply(200, {"available": zlib.crc32(service_id.encode()) % 4 != 0})
+
+    def reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except BrokenPipeError:
+            pass  # The caller gave up at its deadline
+
+    def log_message(self, *args):
+        pass
+
+
+def fill(value, fixtures):
+    """
+    Format the strings in ``value``, a JSON-like structure, with ``fixtures``.
+    """
+    if isinstance(value, str):
+        return value.format(**fixtures)
+    if isinstance(value, dict):
+        return {k: fill(v, fixtures) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fill(v, fixtures) for v in value]
+    return value
+
+
+def percentile(samples, pct):
+    """
+    The ``pct`` percentile of ``samples``, interpolated between ranks.
+    """
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # The async fan-out opens many connections at once
+
+
+class EndpointBenchmark:
+    """
+    Run every endpoint in ``ENDPOINTS`` against synthetic datasets of each
+    size in ``sizes`` (tenant counts, smallest first), on the current
+    database.
+
+    Each dataset grows the previous one, so only the new tenants are
+    generated. Every endpoint is requested once to warm caches, then
+    ``iterations`` times for its query count (the most any request ran,
+    savepoints aside) and
+    p50/p95 latency, then once more under ``tracemalloc`` for the peak
+    Python memory it allocated. Requests go through the test client with a
+    signed JWT, so authentication, routing and rendering are included.
+    """
+
+    def __init__(self, sizes, iterations, seed, report, upstream_delay=0.0):
+        self.sizes = sorted(sizes)
+        self.iterations = iterations
+        self.seed = seed
+        self.report = report
+        self.upstream_delay = upstream_delay
+
+    def run(self, endpoints=ENDPOINTS):
+        server = StubServer(("127.0.0.1", 0), StubScheduleHandler)
+        StubScheduleHandler.delay = self.upstream_delay
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        results = []
+        try:
+            with override_settings(
+                SCHEDULE_SERVICE_URL=f"http://127.0.0.1:{server.server_port}"
+            ):
+                for size in self.sizes:
+                    fixtures = self.prepare(size)
+                    client = self.client(fixtures["owner"])
+                    for endpoint in endpoints:
+                        result = self.measure(client, endpoint, fixtures)
+                        result.update(size=size, services=fixtures["services"])
+                        results.append(result)
+                        self.report(
+                            f"{size:>7} {endpoint.name:<24} {result['queries']:>3} q  "
+                            f"p50 {result['p50_ms']:8.2f} ms  "
+                            f"p95 {result['p95_ms']:8.2f} ms  "
+                            f"{result['peak_kb']:8.0f} KiB"
+                        )
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
+
+    def prepare(self, size):
+        """
+        Grow the dataset to ``size`` tenants and return its fixtures.
+        """
+        generator = CatalogGenerator(
+            Shape(tenants=size, **DATASET_SHAPE), self.seed, 200, lambda line: None
+        )
+        started = time.monotonic()
+        generator.generate()
+        tenant = Tenant.objects.get(id=generator.tenant_id(0))
+        location = TenantLocation.objects.filter(provider=tenant).first()
+        service = (
+            Service.objects.filter(tenant=tenant, options__isnull=False)
+            .order_by("created_at", "id")
+            .first()
+        )
+        services = Service.objects.count()
+        self.report(
+            f"Dataset of {size} tenants ({services} services) ready in "
+            f"{time.monotonic() - started:.1f}s."
+        )
+        return {
+            "tenant": str(tenant.id),
+            "owner": str(tenant.owner_id),
+            "service": str(service.id),
+            "latitude": str(location.latitude),
+            "longitude": str(location.longitude),
+            "services": services,
+        }
+
+    def client(self, user_id):
+        token = AccessToken()
+        token["user_id"] = user_id
+        token["username"] = "benchmark"
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def request(self, client, endpoint, fixtures):
+        send = getattr(client, endpoint.method)
+        path = fill(endpoint.path, fixtures)
+        if endpoint.method == "get":
+            args = {"data": fill(endpoint.params, fixtures)}
+        else:
+            args = {"data": fill(endpoint.body, fixtures), "format": "json"}
+
+        if endpoint.writes:
+            with transaction.atomic():
+                response = send(path, **args)
+                transaction.set_rollback(True)
+        else:
+            response = send(path, **args)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        if response.status_code != endpoint.status:
+            raise RuntimeError(
+                f"{endpoint.name} answered {response.status_code}, "
+                f"expected {endpoint.status}."
+            )
+        return response
+
+    def measure(self, client, endpoint, fixtures):
+        self.request(client, endpoint, fixtures)  # Warm caches
+
+        latencies, queries = [], 0
+        for _ in range(self.iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self.request(client, endpoint, fixtures)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries = max(
+                queries,
+                sum(
+                    not query["sql"].startswith(TRANSACTION_STATEMENTS)
+                    for query in captured
+                ),
+            )
+
+        tracemalloc.start()
+        try:
+            self.request(client, endpoint, fixtures)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "endpoint": endpoint.name,
+            "queries": queries,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "peak_kb": round(peak / 1024, 1),
+        }
+
+
+def check_budgets(results, budgets, metrics=BUDGET_METRICS):
+    """
+    Return a message for every result exceeding its budget. ``budgets`` maps
+    endpoint names, or ``*`` for every endpoint, to caps on ``metrics``.
+    """
+    violations = []
+    for result in results:
+        budget = {
+            **budgets.get("*", {}),
+            **budgets.get(result["endpoint"], {}),
+        }
+        for metric in metrics:
+            if metric in budget and result[metric] > budget[metric]:
+                violations.append(
+                    f"{result['endpoint']} at {result['size']} tenants: "
+                    f"{metric} {result[metric]} exceeds the budget of "
+                    f"{budget[metric]}."
+                )
+    return violations
+
+
+def check_scaling(results):
+    """
+    Return a message for every endpoint whose query count grows with the
+    dataset, the sign of a query per row.
+    """
+    counts = {}
+    for result in results:
+        counts.setdefault(result["endpoint"], {})[result["size"]] = result["queries"]
+    return [
+        f"{endpoint} runs {' -> '.join(str(q) for q in by_size.values())} queries "
+        f"at {' -> '.join(str(s) for s in by_size)} tenants."
+        for endpoint, by_size in counts.items()
+        if len(set(by_size.values())) > 1
+    ]
+
+
+def check_baseline(results, baseline, tolerance):
+    """
+    Return a message for every result that regressed against the same
+    endpoint and size in ``baseline``: more queries, or a p95 latency more
+    than ``tolerance`` (a fraction) slower.
+    """
+    previous = {(r["endpoint"], r["size"]): r for r in baseline}
+    violations = []
+    for result in results:
+        before = previous.get((result["endpoint"], result["size"]))
+        if before is None:
+            continue
+        where = f"{result['endpoint']} at {result['size']} tenants"
+        if result["queries"] > before["queries"]:
+            violations.append(
+                f"{where}: {result['queries']} queries, up from {before['queries']}."
+            )
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            violations.append(
+                f"{where}: p95 {result['p95_ms']} ms, up from {before['p95_ms']} ms."
+            )
+    return violations
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import ServiceSerializer
+
+CSV_COLUMNS = [
+    "id",
+    "tenant",
+    "name",
+    "category",
+    "description",
+    "price",
+    "is_available",
+    "max_clients_per_slot",
+    "image",
+    "duration_minutes",
+    "is_public",
+]
+
+
+def export_rows(queryset, include_options):
+    """
+    Yield services from ``queryset`` as serialized dicts.
+
+    Rows are read through a server-side cursor ``EXPORT_CHUNK_SIZE`` at a time;
+    with ``include_options`` each chunk's options and values are prefetched in
+    two queries. Only one chunk is held in memory at a time.
+
+    The cursor is read inside a transaction: in autocommit mode Django declares
+    it ``WITH HOLD``, and PostgreSQL then materializes the whole result before
+    the first row is fetched.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    if include_options:
+        queryset = queryset.prefetch_related("options__values")
+    serializer = ServiceSerializer(context={"include_options": include_options})
+    with transaction.atomic(using=queryset.db):
+        for service in queryset.iterator(chunk_size=chunk_size):
+            row = serializer.to_representation(service)
+            if not include_options:
+                del row["options"]
+            yield row
+
+
+def chunked(lines):
+    """
+    Join lines into strings of ``EXPORT_CHUNK_SIZE`` rows, so the server
+    writes one block per chunk rather than one per row.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= settings.EXPORT_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def ndjson_stream(rows):
+    """
+    One JSON object per line.
+    """
+    encoder = JSONEncoder(ensure_ascii=False)
+    return chunked(f"{encoder.encode(row)}\n" for row in rows)
+
+
+def csv_stream(rows, include_options):
+    """
+    A header line, then one line per service. Nested options, when included,
+    are written as a JSON array in an ``options`` column.
+    """
+    columns = CSV_COLUMNS + (["options"] if include_options else [])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    encoder = JSONEncoder(ensure_ascii=False)
+
+    def line(values):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    def lines():
+        yield line(columns)
+        for row in rows:
+            if include_options:
+                row["options"] = encoder.encode(row["options"])
+            yield line(row[column] for column in columns)
+
+    return chunked(lines())
+
+
+def async_chunks(chunks):
+    """
+    Serve the sync ``chunks`` as an async iterator for ASGI servers, fetching
+    each chunk through ``sync_to_async``. Given a sync iterator, Django's
+    ASGI handler would read it to the end before sending the first byte.
+    """
+
+    async def iterate():
+        fetch = sync_to_async(next)
+        try:
+            while (chunk := await fetch(chunks, None)) is not None:
+                yield chunk
+        finally:
+            # Ends the cursor's transaction when the client goes away early
+            await sync_to_async(chunks.close)()
+
+    return iterate()
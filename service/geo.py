@@ -0,0 +1,116 @@
+import math
+
+from django.conf import settings
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+from .models import ServiceLocation
+
+EARTH_RADIUS_MI = 3958.8
+
+
+def parse_search_area(params):
+    """
+    Return ``(latitude, longitude, radius_mi)`` from query parameters.
+
+    Raises ``ValueError`` with a client-facing message when they are missing
+    or out of range.
+    """
+    if not params.get("latitude") or not params.get("longitude"):
+        raise ValueError("Latitude and longitude are required.")
+    try:
+        latitude = float(params["latitude"])
+        longitude = float(params["longitude"])
+        radius_mi = float(params.get("radius", 10))  # Default to 10 miles
+    except ValueError:
+        raise ValueError("Latitude, longitude and radius must be numbers.")
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Latitude or longitude is out of range.")
+    max_radius = settings.LOCATION_SEARCH_MAX_RADIUS_MI
+    if not 0 < radius_mi <= max_radius:
+        raise ValueError(f"Radius must be between 0 and {max_radius} miles.")
+    return latitude, longitude, radius_mi
+
+
+def bounding_box(latitude, longitude, radius_mi):
+    """
+    Return ``(min_lat, max_lat, lon_ranges)`` enclosing every point within
+    ``radius_mi`` of the centre. ``lon_ranges`` has two ranges when the box
+    crosses the antimeridian, and spans all longitudes near the poles.
+    """
+    angle = radius_mi / EARTH_RADIUS_MI
+    delta_lat = math.degrees(angle)
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), [(-180, 180)]
+
+    delta_lon = math.degrees(
+        math.asin(min(1, math.sin(angle) / math.cos(math.radians(latitude))))
+    )
+    min_lon, max_lon = longitude - delta_lon, longitude + delta_lon
+    if min_lon < -180:
+        return min_lat, max_lat, [(min_lon + 360, 180), (-180, max_lon)]
+    if max_lon > 180:
+        return min_lat, max_lat, [(min_lon, 180), (-180, max_lon - 360)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+
+def haversine_mi(latitude, longitude):
+    """
+    Great-circle distance in miles from the centre to a row's
+    ``latitude``/``longitude``, as a database expression.
+    """
+    centre_lat = math.radians(latitude)
+    row_lat = Radians(F("latitude"))
+    half_dlat = (row_lat - centre_lat) / 2
+    half_dlon = (Radians(F("longitude")) - math.radians(longitude)) / 2
+    a = Power(Sin(half_dlat), 2) + math.cos(centre_lat) * Cos(row_lat) * Power(
+        Sin(half_dlon), 2
+    )
+    # Rounding can push ``a`` a hair past 1, outside asin's domain.
+    return 2 * EARTH_RADIUS_MI * ASin(Least(Sqrt(a), Value(1.0)))
+
+
+def nearby_service_locations(latitude, longitude, radius_mi):
+    """
+    Service locations of active services within ``radius_mi`` of the centre
+    whose own ``service_range_mi`` also covers it, nearest first.
+
+    The bounding box is answered from the coordinates index; the exact
+    haversine check only runs on the rows inside it.
+    """
+    min_lat, max_lat, lon_ranges = bounding_box(latitude, longitude, radius_mi)
+    in_lon_ranges = Q()
+    for min_lon, max_lon in lon_ranges:
+        in_lon_ranges |= Q(longitude__range=(min_lon, max_lon))
+
+    return (
+        ServiceLocation.objects.filter(latitude__range=(min_lat, max_lat))
+        .filter(in_lon_ranges, service__is_active=True)
+        .annotate(distance_mi=haversine_mi(latitude, longitude))
+        .filter(
+            Q(distance_mi__lte=radius_mi) & Q(distance_mi__lte=F("service_range_mi"))
+        )
+        .order_by("distance_mi")
+        .values("service_id", "service__tenant_id", "location_id", "distance_mi")
+    )
+
+
+def nearest_services(rows):
+    """
+    Collapse ``nearby_service_locations`` rows to one result per service, at
+    its nearest location, keeping the nearest-first order.
+    """
+    services = {}
+    for row in rows:
+        services.setdefault(
+            row["service_id"],
+            {
+                "id": str(row["service_id"]),
+                "tenant_id": str(row["service__tenant_id"]),
+                "location_id": str(row["location_id"]),
+                "distance_mi": round(row["distance_mi"], 2),
+            },
+        )
+    return list(services.values())
@@ -0,0 +1,689 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from common.conditional import invalidate_responses
+from tenant.models import Tenant, TenantLocation, TenantOutboxEvent
+from .models import (
+    ImportCheckpoint,
+    Service,
+    ServiceLocation,
+    ServiceOption,
+    ServiceOptionValue,
+)
+from .search import refresh_search_vectors
+
+# Session advisory lock held for a whole run, so imports never overlap
+IMPORT_LOCK_KEY = 7_242_817_301
+
+# Invalid rows listed in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One kind of record: the model it is merged into, the model fields read
+    from each record, and the natural key rows are upserted on. ``parent`` is
+    the foreign key field checked in bulk before merging.
+
+    ``lookups`` are record fields naming related rows by their natural key,
+    as ``(name, model, field)``; they are staged alongside the row and
+    resolved in bulk into the ``resolved`` fields, which are not read from
+    the record.
+    """
+
+    name: str
+    model: type
+    fields: tuple
+    key: tuple
+    parent: str = None
+    nested_options: bool = False
+    lookups: tuple = ()
+    resolved: tuple = ()
+
+
+STAGES = (
+    Stage(
+        "tenants",
+        Tenant,
+        fields=(
+            "id",
+            "owner_id",
+            "name",
+            "description",
+            "logo",
+            "contact_email",
+            "phone_number",
+            "is_disabled",
+            "is_active",
+        ),
+        key=("id",),
+    ),
+    Stage(
+        "locations",
+        TenantLocation,
+        fields=("provider", "location_id", "latitude", "longitude", "is_active"),
+        key=("provider_id", "location_id"),
+        parent="provider",
+    ),
+    Stage(
+        "services",
+        Service,
+        fields=(
+            "tenant",
+            "name",
+            "category",
+            "description",
+            "price",
+            "is_available",
+            "max_clients_per_slot",
+            "image",
+            "duration_minutes",
+            "is_public",
+            "is_active",
+        ),
+        key=("tenant_id", "name"),
+        parent="tenant",
+        nested_options=True,
+    ),
+    Stage(
+        "service_locations",
+        ServiceLocation,
+        fields=(
+            "service",
+            "location",
+            "latitude",
+            "longitude",
+            "service_range_mi",
+            "availability_start",
+            "availability_end",
+            "external_schedule_id",
+            "external_location_id",
+            "is_active",
+        ),
+        key=("service_id", "location_id"),
+        lookups=(
+            ("tenant", Service, "tenant"),
+            ("service", Service, "name"),
+            ("location", TenantLocation, "location_id"),
+        ),
+        resolved=("service", "location", "latitude", "longitude"),
+    ),
+)
+
+OPTION_FIELDS = ("name", "is_required", "max_selections")
+VALUE_FIELDS = ("name", "additional_price")
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def default_run_name(paths):
+    """
+    A run name derived from the input files' paths, sizes and modification
+    times, so re-running the same command resumes the same run.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(
+            f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime}".encode()
+        )
+    return digest.hexdigest()[:12]
+
+
+def read_records(path):
+    """
+    Yield ``(line, record)`` from an NDJSON or CSV file, chosen by extension.
+    Lines that are not a JSON object yield ``(line, None)``.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError:
+                record = None
+            yield line, record if isinstance(record, dict) else None
+
+
+def clean_fields(model, names, record, required=()):
+    """
+    Convert ``record``'s values for the ``names`` fields of ``model`` with the
+    model fields' own validation. Missing fields take the field default.
+    Returns ``(values, errors)``.
+    """
+    values, errors = [], {}
+    for name in names:
+        field = model._meta.get_field(name)
+        value = record.get(name)
+        if value == "" and field.null:
+            value = None  # Empty CSV cell
+        if value is None and name not in record and name not in required:
+            value = field.get_default()
+        if value is None:
+            if name in required or not field.null:
+                errors[name] = ["This field is required."]
+            else:
+                values.append(None)
+            continue
+        try:
+            if field.is_relation:
+                value = uuid.UUID(str(value))
+            else:
+                value = field.clean(value, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+        except ValueError:
+            errors[name] = ["Must be a valid UUID."]
+        values.append(value)
+    return values, errors
+
+
+def clean_lookups(lookups, record):
+    """
+    Convert ``record``'s natural-key references with the fields they match.
+    All are required. Returns ``(values, errors)``.
+    """
+    values, errors = [], {}
+    for name, model, field in lookups:
+        value, error = clean_fields(
+            model, [field], {field: record.get(name)}, required=[field]
+        )
+        values.extend(value)
+        if error:
+            errors[name] = error[field]
+    return values, errors
+
+
+def clean_options(raw):
+    """
+    Validate a service record's nested ``options`` (a list, or its JSON text
+    in CSV files) and return them as JSON for the staging table. Returns
+    ``(None, None)`` when the record has no options, leaving the service's
+    options untouched.
+    """
+    if raw is None or raw == "":
+        return None, None
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return None, ["Must be a JSON list."]
+    if not isinstance(raw, list):
+        return None, ["Must be a list."]
+
+    options, errors = [], []
+    for i, option in enumerate(raw):
+        if not isinstance(option, dict):
+            errors.append(f"Option {i}: must be an object.")
+            continue
+        values, option_errors = clean_fields(ServiceOption, OPTION_FIELDS, option)
+        errors.extend(
+            f"Option {i}: {k}: {' '.join(v)}" for k, v in option_errors.items()
+        )
+        cleaned = dict(zip(OPTION_FIELDS, values))
+        cleaned["values"] = None
+        if option.get("values") is not None:
+            cleaned["values"] = []
+            for j, value in enumerate(option["values"]):
+                if not isinstance(value, dict):
+                    errors.append(f"Option {i} value {j}: must be an object.")
+                    continue
+                value_values, value_errors = clean_fields(
+                    ServiceOptionValue, VALUE_FIELDS, value
+                )
+                errors.extend(
+                    f"Option {i} value {j}: {k}: {' '.join(v)}"
+                    for k, v in value_errors.items()
+                )
+                name, price = value_values if not value_errors else (None, None)
+                cleaned["values"].append({"name": name, "additional_price": str(price)})
+        options.append(cleaned)
+    if errors:
+        return None, errors
+    return json.dumps(options), None
+
+
+class CatalogImport:
+    """
+    Load tenants, tenant locations, services (with nested options and
+    values) and service locations from NDJSON/CSV files.
+
+    Each stage runs in three steps, each recorded in an ``ImportCheckpoint``:
+
+    1. Rows are validated with the model fields and ``COPY``-ed into an
+       unlogged staging table in one transaction. Rows repeating a natural key
+       are reduced to the last one, and rows whose parent does not exist are
+       dropped, both in one statement each.
+    2. Staged rows are merged into the real tables in batches of
+       ``batch_size``: an ``UPDATE`` for rows whose natural key already exists
+       (only where a value changed) and an ``INSERT`` for the rest, one
+       transaction per batch.
+    3. The checkpoint is marked complete. A failed run started again under
+       the same name skips the finished steps and batches.
+    """
+
+    def __init__(self, run, batch_size, report):
+        if not re.fullmatch(r"[a-z0-9_]{1,40}", run):
+            raise ValueError("Run names use a-z, 0-9 and _ (at most 40 characters).")
+        self.run = run
+        self.batch_size = batch_size
+        self.report = report
+
+    def staging_table(self, stage, suffix=""):
+        return f"import_{self.run}_{stage.name}{suffix}"
+
+    def execute(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    def run_stages(self, paths):
+        """
+        Import ``paths``, a mapping of stage name to file, in stage order.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [IMPORT_LOCK_KEY])
+            if not cursor.fetchone()[0]:
+                raise RuntimeError("Another catalog import is running.")
+        try:
+            for stage in STAGES:
+                if stage.name in paths:
+                    self.run_stage(stage, paths[stage.name])
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [IMPORT_LOCK_KEY])
+        invalidate_responses("services")
+
+    def run_stage(self, stage, path):
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            run=self.run, stage=stage.name
+        )
+        if checkpoint.completed_at is not None:
+            self.report(f"{stage.name}: already imported in run {self.run}.")
+            return
+
+        if not self.staging_exists(stage):
+            self.stage_file(stage, path, checkpoint)
+        elif checkpoint.merged_through:
+            self.report(
+                f"{stage.name}: resuming after staged row {checkpoint.merged_through}."
+            )
+
+        started = time.monotonic()
+        merged = 0
+        last = self.last_seq(stage)
+        lo = checkpoint.merged_through + 1
+        while lo <= last:
+            hi = lo + self.batch_size - 1
+            with transaction.atomic():
+                merged += self.merge_batch(stage, lo, hi)
+                checkpoint.merged_through = min(hi, last)
+                checkpoint.save(update_fields=["merged_through", "updated_at"])
+            rate = merged / max(time.monotonic() - started, 1e-6)
+            self.report(
+                f"{stage.name}: merged through row {checkpoint.merged_through} "
+                f"of {last} ({rate:,.0f} rows/s)."
+            )
+            lo = hi + 1
+
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=["completed_at", "updated_at"])
+        self.drop_staging(stage)
+
+    def staging_exists(self, stage):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [self.staging_table(stage)])
+            return cursor.fetchone()[0] is not None
+
+    def last_seq(self, stage):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT coalesce(max(seq), 0) FROM {qn(self.staging_table(stage))}"
+            )
+            return cursor.fetchone()[0]
+
+    def drop_staging(self, stage):
+        for suffix in ("", "_options", "_values"):
+            self.execute(
+                f"DROP TABLE IF EXISTS {qn(self.staging_table(stage, suffix))}"
+            )
+
+    def columns(self, stage):
+        return [stage.model._meta.get_field(name).column for name in stage.fields]
+
+    def stage_file(self, stage, path, checkpoint):
+        """
+        Validate and ``COPY`` the file into a fresh staging table, then drop
+        duplicate keys and orphans in bulk. All or nothing.
+        """
+        started = time.monotonic()
+        table = qn(self.staging_table(stage))
+        columns = self.columns(stage)
+        definitions = [
+            f"{qn(column)} {stage.model._meta.get_field(name).db_type(connection)}"
+            for name, column in zip(stage.fields, columns)
+        ] + [
+            f"{qn(name)} {model._meta.get_field(field).db_type(connection)}"
+            for name, model, field in stage.lookups
+        ]
+        if "id" not in columns:
+            definitions.append("id uuid NOT NULL DEFAULT gen_random_uuid()")
+        if stage.nested_options:
+            definitions.append("options jsonb")
+        read = [name for name in stage.fields if name not in stage.resolved]
+        copy_columns = [
+            "seq",
+            "line",
+            *(stage.model._meta.get_field(name).column for name in read),
+            *(name for name, _, _ in stage.lookups),
+        ] + (["options"] if stage.nested_options else [])
+
+        seq, invalid = 0, []
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE UNLOGGED TABLE {table} (seq bigint NOT NULL, "
+                "line bigint NOT NULL, existing boolean NOT NULL DEFAULT false, "
+                f"{', '.join(definitions)})"
+            )
+            copy_sql = (
+                f"COPY {table} ({', '.join(qn(c) for c in copy_columns)}) FROM STDIN"
+            )
+            with cursor.copy(copy_sql) as copy:
+                for line, record in read_records(path):
+                    if record is None:
+                        invalid.append((line, {"record": ["Not a JSON object."]}))
+                        continue
+                    values, errors = clean_fields(
+                        stage.model, read, record, required=stage.key
+                    )
+                    if stage.lookups:
+                        references, lookup_errors = clean_lookups(stage.lookups, record)
+                        errors.update(lookup_errors)
+                        values.extend(references)
+                    if stage.nested_options:
+                        options, option_errors = clean_options(record.get("options"))
+                        if option_errors:
+                            errors["options"] = option_errors
+                        values.append(options)
+                    if errors:
+                        invalid.append((line, errors))
+                        continue
+                    seq += 1
+                    copy.write_row([seq, line, *values])
+                    if seq % 100_000 == 0:
+                        self.report(f"{stage.name}: staged {seq} rows.")
+
+            orphans, parent = [], stage.parent
+            if stage.model is ServiceLocation:
+                orphans = self.resolve_service_locations(stage, cursor)
+                parent = "service or location"
+            key = " AND ".join(f"a.{qn(k)} = b.{qn(k)}" for k in stage.key)
+            cursor.execute(
+                f"DELETE FROM {table} a USING {table} b WHERE {key} AND a.seq < b.seq"
+            )
+            duplicates = cursor.rowcount
+            if stage.parent:
+                parent = stage.model._meta.get_field(stage.parent)
+                parent_table = qn(parent.related_model._meta.db_table)
+                cursor.execute(
+                    f"DELETE FROM {table} s WHERE NOT EXISTS (SELECT 1 FROM "
+                    f"{parent_table} p WHERE p.id = s.{qn(parent.column)}) "
+                    "RETURNING line"
+                )
+                orphans = sorted(row[0] for row in cursor.fetchall())
+            cursor.execute(f"CREATE INDEX ON {table} (seq)")
+            if stage.nested_options:
+                self.stage_options(stage)
+            cursor.execute(f"ANALYZE {table}")
+
+            checkpoint.rows = seq - duplicates - len(orphans)
+            checkpoint.save(update_fields=["rows", "updated_at"])
+
+        self.report(
+            f"{stage.name}: staged {checkpoint.rows} rows in "
+            f"{time.monotonic() - started:.1f}s ({len(invalid)} invalid, "
+            f"{duplicates} repeated keys, {len(orphans)} without a parent)."
+        )
+        for line, errors in invalid[:MAX_REPORTED_ERRORS]:
+            self.report(f"  line {line}: {json.dumps(errors, ensure_ascii=False)}")
+        if orphans:
+            sample = ", ".join(str(line) for line in orphans[:MAX_REPORTED_ERRORS])
+            self.report(f"  lines whose {parent} does not exist: {sample}")
+
+    def resolve_service_locations(self, stage, cursor):
+        """
+        Fill the staged service locations' service and location from the
+        tenant's service name and location reference, copying the location's
+        coordinates for the radius search, and drop the rows either is
+        missing for. Returns the dropped rows' lines.
+        """
+        table = qn(self.staging_table(stage))
+        cursor.execute(
+            f"UPDATE {table} s SET service_id = t.id FROM "
+            f"{qn(Service._meta.db_table)} t "
+            "WHERE t.tenant_id = s.tenant AND t.name = s.service"
+        )
+        cursor.execute(
+            f"UPDATE {table} s SET location_id = t.id, latitude = t.latitude, "
+            f"longitude = t.longitude FROM {qn(TenantLocation._meta.db_table)} t "
+            "WHERE t.provider_id = s.tenant AND t.location_id = s.location"
+        )
+        cursor.execute(
+            f"DELETE FROM {table} WHERE service_id IS NULL OR location_id IS NULL "
+            "RETURNING line"
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+    def stage_options(self, stage):
+        """
+        Unpack the staged services' options and values into their own staging
+        tables, keeping the last of any repeated name.
+        """
+        services = qn(self.staging_table(stage))
+        options = qn(self.staging_table(stage, "_options"))
+        values = qn(self.staging_table(stage, "_values"))
+        self.execute(
+            f"""
+            CREATE UNLOGGED TABLE {options} AS
+            SELECT row_number() OVER () AS row, s.seq, o.position,
+                   gen_random_uuid() AS id, false AS existing,
+                   o.doc->>'name' AS name,
+                   (o.doc->>'is_required')::boolean AS is_required,
+                   (o.doc->>'max_selections')::integer AS max_selections,
+                   o.doc->'values' AS "values"
+            FROM {services} s
+            CROSS JOIN LATERAL jsonb_array_elements(s.options)
+                WITH ORDINALITY AS o(doc, position)
+            WHERE s.options IS NOT NULL
+            """
+        )
+        self.execute(
+            f"DELETE FROM {options} a USING {options} b "
+            "WHERE a.seq = b.seq AND a.name = b.name AND a.position < b.position"
+        )
+        self.execute(
+            f"""
+            CREATE UNLOGGED TABLE {values} AS
+            SELECT o.row AS option_row, o.seq, v.position,
+                   gen_random_uuid() AS id, false AS existing,
+                   v.doc->>'name' AS name,
+                   (v.doc->>'additional_price')::numeric(10, 2) AS additional_price
+            FROM {options} o
+            CROSS JOIN LATERAL jsonb_array_elements(o."values")
+                WITH ORDINALITY AS v(doc, position)
+            WHERE jsonb_typeof(o."values") = 'array'
+            """
+        )
+        self.execute(
+            f"DELETE FROM {values} a USING {values} b WHERE a.option_row = "
+            "b.option_row AND a.name = b.name AND a.position < b.position"
+        )
+        self.execute(f"CREATE INDEX ON {options} (seq)")
+        self.execute(f"CREATE INDEX ON {options} (row)")
+        self.execute(f"CREATE INDEX ON {values} (seq)")
+        self.execute(f"ANALYZE {options}")
+        self.execute(f"ANALYZE {values}")
+
+    def merge_batch(self, stage, lo, hi):
+        """
+        Upsert staged rows ``lo..hi`` into the stage's table on its natural
+        key. Returns the number of staged rows in the batch.
+        """
+        table = qn(stage.model._meta.db_table)
+        staging = qn(self.staging_table(stage))
+        columns = self.columns(stage)
+        batch = "s.seq BETWEEN %s AND %s"
+        key = " AND ".join(f"t.{qn(k)} = s.{qn(k)}" for k in stage.key)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {staging} s WHERE {batch}", [lo, hi])
+            rows = cursor.fetchone()[0]
+        self.execute(
+            f"UPDATE {staging} s SET id = t.id, existing = true FROM {table} t "
+            f"WHERE {batch} AND {key}",
+            [lo, hi],
+        )
+
+        changing = [c for c in columns if c not in stage.key]
+        self.execute(
+            f"UPDATE {table} t SET "
+            + ", ".join(f"{qn(c)} = s.{qn(c)}" for c in changing)
+            + f", updated_at = now() FROM {staging} s WHERE s.existing AND "
+            f"s.id = t.id AND {batch} AND "
+            f"({', '.join(f't.{qn(c)}' for c in changing)}) IS DISTINCT FROM "
+            f"({', '.join(f's.{qn(c)}' for c in changing)})",
+            [lo, hi],
+        )
+        inserted = [c for c in columns if c != "id"]
+        self.execute(
+            f"INSERT INTO {table} (id, created_at, updated_at, "
+            f"{', '.join(qn(c) for c in inserted)}) "
+            f"SELECT s.id, now(), now(), {', '.join(f's.{qn(c)}' for c in inserted)} "
+            f"FROM {staging} s WHERE NOT s.existing AND {batch}",
+            [lo, hi],
+        )
+
+        if stage.model is Tenant:
+            # Tenant.save's post_save receiver queues these for new tenants.
+            self.execute(
+                f"INSERT INTO {qn(TenantOutboxEvent._meta.db_table)} (id, "
+                "created_at, updated_at, is_active, event, tenant_id, user_id, "
+                "attempts, next_attempt_at, last_error) "
+                "SELECT gen_random_uuid(), now(), now(), true, %s, s.id, "
+                f"s.owner_id, 0, now(), '' FROM {staging} s "
+                f"WHERE NOT s.existing AND {batch}",
+                [TenantOutboxEvent.TENANT_CREATED, lo, hi],
+            )
+        elif stage.model is TenantLocation:
+            # Keep the radius search's copies of the coordinates in step.
+            self.execute(
+                f"UPDATE {qn(ServiceLocation._meta.db_table)} t SET "
+                "latitude = s.latitude, longitude = s.longitude "
+                f"FROM {staging} s WHERE s.existing AND t.location_id = s.id "
+                f"AND {batch} AND (t.latitude, t.longitude) IS DISTINCT FROM "
+                "(s.latitude, s.longitude)",
+                [lo, hi],
+            )
+        elif stage.nested_options:
+            self.merge_options(stage, lo, hi)
+            refresh_search_vectors(
+                RawSQL(f"SELECT s.id FROM {staging} s WHERE {batch}", (lo, hi))
+            )
+        return rows
+
+    def merge_options(self, stage, lo, hi):
+        """
+        Sync the options, and their values, of services ``lo..hi`` that listed
+        them: matching names are updated, new ones inserted and missing ones
+        deleted, as a nested PATCH through the API would.
+        """
+        services = qn(self.staging_table(stage))
+        options = qn(self.staging_table(stage, "_options"))
+        values = qn(self.staging_table(stage, "_values"))
+        option_table = qn(ServiceOption._meta.db_table)
+        value_table = qn(ServiceOptionValue._meta.db_table)
+        params = [lo, hi]
+
+        self.execute(
+            f"UPDATE {options} o SET id = t.id, existing = true "
+            f"FROM {services} s, {option_table} t WHERE o.seq BETWEEN %s AND %s "
+            "AND s.seq = o.seq AND t.service_id = s.id AND t.name = o.name",
+            params,
+        )
+        # Existing options of services that listed theirs, missing from the list
+        dropped = (
+            f"SELECT t.id FROM {option_table} t JOIN {services} s "
+            "ON t.service_id = s.id WHERE s.seq BETWEEN %s AND %s AND s.existing "
+            "AND s.options IS NOT NULL AND NOT EXISTS "
+            f"(SELECT 1 FROM {options} o WHERE o.seq = s.seq AND o.id = t.id)"
+        )
+        self.execute(
+            f"DELETE FROM {value_table} WHERE option_id IN ({dropped})", params
+        )
+        self.execute(f"DELETE FROM {option_table} WHERE id IN ({dropped})", params)
+        self.execute(
+            f"UPDATE {option_table} t SET is_required = o.is_required, "
+            f"max_selections = o.max_selections, updated_at = now() FROM {options} o "
+            "WHERE o.existing AND o.id = t.id AND o.seq BETWEEN %s AND %s AND "
+            "(t.is_required, t.max_selections) IS DISTINCT FROM "
+            "(o.is_required, o.max_selections)",
+            params,
+        )
+        self.execute(
+            f"INSERT INTO {option_table} (id, created_at, updated_at, is_active, "
+            "service_id, name, is_required, max_selections) "
+            "SELECT o.id, now(), now(), true, s.id, o.name, o.is_required, "
+            f"o.max_selections FROM {options} o JOIN {services} s ON s.seq = o.seq "
+            "WHERE NOT o.existing AND o.seq BETWEEN %s AND %s",
+            params,
+        )
+
+        self.execute(
+            f"UPDATE {values} v SET id = t.id, existing = true "
+            f"FROM {options} o, {value_table} t WHERE v.seq BETWEEN %s AND %s "
+            "AND o.row = v.option_row AND t.option_id = o.id AND t.name = v.name",
+            params,
+        )
+        self.execute(
+            f"DELETE FROM {value_table} t USING {options} o "
+            "WHERE o.seq BETWEEN %s AND %s AND o.existing "
+            "AND jsonb_typeof(o.\"values\") = 'array' AND t.option_id = o.id "
+            f"AND NOT EXISTS (SELECT 1 FROM {values} v "
+            "WHERE v.option_row = o.row AND v.id = t.id)",
+            params,
+        )
+        self.execute(
+            f"UPDATE {value_table} t SET additional_price = v.additional_price, "
+            f"updated_at = now() FROM {values} v WHERE v.existing AND v.id = t.id "
+            "AND v.seq BETWEEN %s AND %s "
+            "AND t.additional_price IS DISTINCT FROM v.additional_price",
+            params,
+        )
+        self.execute(
+            f"INSERT INTO {value_table} (id, created_at, updated_at, is_active, "
+            "option_id, name, additional_price) "
+            "SELECT v.id, now(), now(), true, o.id, v.name, v.additional_price "
+            f"FROM {values} v JOIN {options} o ON o.row = v.option_row "
+            "WHERE NOT v.existing AND v.seq BETWEEN %s AND %s",
+            params,
+        )
@@ -0,0 +1,48 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from service.authentication import CustomJWTAuthentication, token_cache
+
+
+class Command(BaseCommand):
+    help = "Compare cached and uncached JWT authentication cost per request."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=20000, help="Requests per run."
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        token = AccessToken()
+        token["user_id"] = str(uuid.uuid4())
+        token["username"] = "bench"
+        request = Request(
+            APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        )
+        auth = CustomJWTAuthentication()
+
+        def run(clear_cache):
+            token_cache.clear()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                if clear_cache:
+                    token_cache.clear()
+                auth.authenticate(request)
+            return (time.perf_counter() - started) / iterations * 1_000_000
+
+        uncached = run(clear_cache=True)
+        cached = run(clear_cache=False)
+
+        self.stdout.write(f"Uncached: {uncached:8.2f} us/request")
+        self.stdout.write(f"Cached:   {cached:8.2f} us/request")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Speedup:  {uncached / cached:8.1f}x {token_cache.stats()}"
+            )
+        )
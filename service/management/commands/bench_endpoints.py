@@ -0,0 +1,139 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from service.benchmark import (
+    ENDPOINTS,
+    EndpointBenchmark,
+    check_baseline,
+    check_budgets,
+    check_scaling,
+)
+
+DEFAULT_BUDGETS = os.path.join(
+    os.path.dirname(__file__), "..", "..", "benchmark_budgets.json"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every endpoint against synthetic datasets of several sizes "
+        "in a throwaway test database: query count, p50/p95 latency and peak "
+        "memory. Fails when a budget or baseline is exceeded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="100,1000",
+            help="Comma-separated dataset sizes, in tenants.",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=20, help="Timed requests per endpoint."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--endpoints", help="Comma-separated endpoint names (default: all)."
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark-results.json",
+            help="File the results are written to as JSON.",
+        )
+        parser.add_argument(
+            "--budgets",
+            default=DEFAULT_BUDGETS,
+            help="JSON file of per-endpoint caps on queries, p50_ms, p95_ms and "
+            "peak_kb.",
+        )
+        parser.add_argument(
+            "--baseline", help="Results file of an earlier run to compare against."
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p95 slowdown against the baseline, as a fraction.",
+        )
+        parser.add_argument(
+            "--upstream-delay",
+            type=float,
+            default=0.0,
+            help="Milliseconds the stub schedule service waits before answering.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database and its datasets for the next run.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes takes comma-separated integers.")
+        endpoints = ENDPOINTS
+        if options["endpoints"]:
+            names = set(options["endpoints"].split(","))
+            endpoints = [e for e in ENDPOINTS if e.name in names]
+            unknown = names - {e.name for e in endpoints}
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        with open(options["budgets"]) as f:
+            budgets = json.load(f)
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)["results"]
+
+        benchmark = EndpointBenchmark(
+            sizes,
+            options["iterations"],
+            options["seed"],
+            self.stdout.write,
+            upstream_delay=options["upstream_delay"] / 1000,
+        )
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            results = benchmark.run(endpoints)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        violations = check_budgets(results, budgets) + check_scaling(results)
+        if baseline is not None:
+            violations += check_baseline(results, baseline, options["tolerance"])
+        with open(options["output"], "w") as f:
+            json.dump(
+                {
+                    "created_at": timezone.now().isoformat(),
+                    "seed": options["seed"],
+                    "iterations": options["iterations"],
+                    "results": results,
+                    "violations": violations,
+                },
+                f,
+                indent=2,
+            )
+
+        if violations:
+            for violation in violations:
+                self.stderr.write(violation)
+            raise CommandError(
+                f"{len(violations)} budget violations; results in {options['output']}."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"All endpoints within budget; results in {options['output']}."
+            )
+        )
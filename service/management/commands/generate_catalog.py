@@ -0,0 +1,80 @@
+import argparse
+
+from django.core.management.base import BaseCommand
+
+from service.synthetic import CENTERS, CatalogGenerator, Shape
+
+
+def count_range(text):
+    """
+    Parse ``N`` or ``LOW-HIGH`` into a ``(low, high)`` count range.
+    """
+    low, _, high = text.partition("-")
+    try:
+        bounds = (int(low), int(high or low))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected N or LOW-HIGH, got {text!r}.")
+    if not 0 <= bounds[0] <= bounds[1]:
+        raise argparse.ArgumentTypeError(f"Invalid range {text!r}.")
+    return bounds
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic catalog (tenants, locations, "
+        "services, options and values) for benchmarking. Needs no other service."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenants", type=int, default=1000)
+        parser.add_argument("--locations-per-tenant", type=count_range, default=(1, 3))
+        parser.add_argument("--services-per-tenant", type=count_range, default=(10, 90))
+        parser.add_argument("--options-per-service", type=count_range, default=(0, 3))
+        parser.add_argument("--values-per-option", type=count_range, default=(2, 4))
+        parser.add_argument(
+            "--centers",
+            type=int,
+            default=10,
+            help=f"Metro areas tenants are spread over (at most {len(CENTERS)}).",
+        )
+        parser.add_argument(
+            "--spread",
+            type=float,
+            default=15.0,
+            help="Radius in miles locations are scattered over around each centre.",
+        )
+        parser.add_argument(
+            "--public-ratio",
+            type=float,
+            default=0.5,
+            help="Share of services that are public.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Tenants written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        shape = Shape(
+            tenants=options["tenants"],
+            locations_per_tenant=options["locations_per_tenant"],
+            services_per_tenant=options["services_per_tenant"],
+            options_per_service=options["options_per_service"],
+            values_per_option=options["values_per_option"],
+            centers=options["centers"],
+            spread_mi=options["spread"],
+            public_ratio=options["public_ratio"],
+        )
+        generator = CatalogGenerator(
+            shape, options["seed"], options["batch_size"], self.stdout.write
+        )
+        written = generator.generate()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {written} tenants "
+                f"({shape.tenants - written} already present)."
+            )
+        )
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from service.importer import CatalogImport, default_run_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load tenants, tenant locations, services (with nested options "
+        "and values) and service locations from NDJSON or CSV files through "
+        "COPY and set-based upserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenants", help="Tenants file, matched on id.")
+        parser.add_argument(
+            "--locations",
+            help="Tenant locations file, matched on (provider, location_id).",
+        )
+        parser.add_argument(
+            "--services",
+            help="Services file, matched on (tenant, name); nested options on "
+            "name within their service, values on name within their option.",
+        )
+        parser.add_argument(
+            "--service-locations",
+            help="Service locations file, matched on (service, location): each "
+            "row names its tenant, the service by name and the location by its "
+            "location_id.",
+        )
+        parser.add_argument(
+            "--run",
+            help="Run name. Defaults to one derived from the files, so running "
+            "the same command again resumes a failed run.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20000,
+            help="Staged rows merged per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        paths = {
+            stage: options[stage]
+            for stage in ("tenants", "locations", "services", "service_locations")
+            if options[stage]
+        }
+        if not paths:
+            raise CommandError(
+                "Pass at least one of --tenants, --locations, --services, "
+                "--service-locations."
+            )
+
+        run = options["run"] or default_run_name(paths.values())
+        try:
+            catalog_import = CatalogImport(
+                run, options["batch_size"], self.stdout.write
+            )
+            catalog_import.run_stages(paths)
+        except (OSError, RuntimeError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Import {run} complete."))
@@ -13,10 +13,10 @@ from tenant.models import (
     TenantLocation,
 )
 from . import progress_bar
-from django.conf import settings
+from common.upstream import upstream
 
-# API endpoint to fetch user details
-USER_RETRIEVE_URL = settings.USER_SERVICE_API + "users/filter"
+# User service path to fetch user details
+USER_RETRIEVE_PATH = "users/filter"
 USER_EMAIL = "ccrowder@capsuleio.com"
 
 
@@ -32,8 +32,8 @@ class Command(BaseCommand):
             Fetch the user ID for the given email.
             """
             try:
-                response = requests.get(
-                    USER_RETRIEVE_URL, params={"email": email}, timeout=10
+                response = upstream("user").get(
+                    USER_RETRIEVE_PATH, params={"email": email}, timeout=10
                 )
                 response.raise_for_status()
                 user_data = response.json()
@@ -0,0 +1,76 @@
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = "Hammer a running server with concurrent authenticated GETs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="URL to request, e.g. http://localhost:8000/")
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Requests kept in flight."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Seconds to run for."
+        )
+
+    def handle(self, *args, **options):
+        token = AccessToken()
+        token["user_id"] = str(uuid.uuid4())
+        token["username"] = "load-test"
+
+        latencies, errors, elapsed = asyncio.run(
+            self.run(
+                options["url"],
+                str(token),
+                options["concurrency"],
+                options["duration"],
+            )
+        )
+
+        if not latencies:
+            self.stderr.write(f"No successful requests ({errors} errors).")
+            return
+        cuts = statistics.quantiles(latencies, n=100)
+        self.stdout.write(f"Requests:   {len(latencies)} ok, {errors} errors")
+        self.stdout.write(
+            f"Latency:    p50 {cuts[49] * 1000:.1f} ms, "
+            f"p95 {cuts[94] * 1000:.1f} ms, p99 {cuts[98] * 1000:.1f} ms"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Throughput: {len(latencies) / elapsed:.1f} req/s")
+        )
+
+    async def run(self, url, token, concurrency, duration):
+        latencies = []
+        errors = 0
+        limits = httpx.Limits(max_connections=concurrency)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async with httpx.AsyncClient(limits=limits, headers=headers) as client:
+
+            async def worker(stop_at):
+                nonlocal errors
+                while time.monotonic() < stop_at:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                    except httpx.HTTPError:
+                        errors += 1
+                        continue
+                    if response.status_code >= 400:
+                        errors += 1
+                    else:
+                        latencies.append(time.perf_counter() - started)
+
+            started = time.monotonic()
+            await asyncio.gather(
+                *(worker(started + duration) for _ in range(concurrency))
+            )
+            return latencies, errors, time.monotonic() - started
@@ -0,0 +1,350 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:26
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("tenant", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Service",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(help_text="Name of the service.", max_length=255),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        default="other",
+                        help_text="Category of the service.",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "description",
+                    models.TextField(
+                        blank=True, help_text="Description of the service."
+                    ),
+                ),
+                (
+                    "price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Price of the service.",
+                        max_digits=10,
+                    ),
+                ),
+                (
+                    "is_available",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether the service is available.",
+                    ),
+                ),
+                (
+                    "max_clients_per_slot",
+                    models.PositiveIntegerField(
+                        default=1,
+                        help_text="Maximum number of clients allowed per time slot.",
+                    ),
+                ),
+                (
+                    "image",
+                    models.CharField(
+                        blank=True,
+                        help_text="Image representing the service.",
+                        max_length=255,
+                        null=True,
+                    ),
+                ),
+                (
+                    "duration_minutes",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Duration of the service in minutes.",
+                        null=True,
+                    ),
+                ),
+                ("is_public", models.BooleanField(default=False)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        help_text="The provider offering this service.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="services",
+                        to="tenant.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "Service",
+            },
+        ),
+        migrations.CreateModel(
+            name="ServiceLocation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "service_range_mi",
+                    models.FloatField(
+                        default=10.0,
+                        help_text="Service range in miles from this location.",
+                    ),
+                ),
+                (
+                    "availability_start",
+                    models.TimeField(
+                        blank=True,
+                        help_text="Service availability start time.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "availability_end",
+                    models.TimeField(
+                        blank=True,
+                        help_text="Service availability end time.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "external_schedule_id",
+                    models.UUIDField(
+                        blank=True,
+                        help_text="Reference to the scheduling system.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "external_location_id",
+                    models.UUIDField(
+                        blank=True,
+                        help_text="Reference to the location service.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "location",
+                    models.ForeignKey(
+                        help_text="The location where this service is available.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="service_locations",
+                        to="tenant.tenantlocation",
+                    ),
+                ),
+                (
+                    "service",
+                    models.ForeignKey(
+                        help_text="The service offered at this location.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="service_locations",
+                        to="service.service",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ServiceLocation",
+            },
+        ),
+        migrations.CreateModel(
+            name="ServiceOption",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of the option (e.g., 'Choose a size').",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "is_required",
+                    models.BooleanField(
+                        default=False, help_text="Indicates if this option is required."
+                    ),
+                ),
+                (
+                    "max_selections",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Maximum number of selections allowed for this option.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "service",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="options",
+                        to="service.service",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ServiceOption",
+            },
+        ),
+        migrations.CreateModel(
+            name="ServiceOptionValue",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of the value (e.g., 'Large', 'Medium').",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "additional_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0.0,
+                        help_text="Additional price for this option value.",
+                        max_digits=10,
+                    ),
+                ),
+                (
+                    "option",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="values",
+                        to="service.serviceoption",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ServiceOptionValue",
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes for the hot service query shapes, built with CREATE INDEX
+    CONCURRENTLY so the tables stay writable while they build.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("service", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="service",
+            index=models.Index(
+                fields=["created_at", "id"], name="service_created_id_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="service",
+            index=models.Index(
+                fields=["tenant", "-created_at"], name="service_tenant_recent_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="service",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("is_public", True)),
+                fields=["-created_at"],
+                name="service_public_recent_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="service",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_active", True), ("is_available", True), ("is_public", True)
+                ),
+                fields=["category", "-created_at"],
+                name="service_public_category_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="service",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("is_available", True)),
+                fields=["tenant", "-created_at"],
+                name="service_tenant_available_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Same document as service.search.search_document(), in plain SQL so the
+# migration does not depend on application code.
+BACKFILL_SQL = """
+    UPDATE "Service" s SET search_vector =
+        setweight(to_tsvector(%(config)s::regconfig, coalesce(s.name, '')), 'A')
+        || setweight(to_tsvector(%(config)s::regconfig, coalesce(s.category, '')), 'B')
+        || setweight(to_tsvector(%(config)s::regconfig, coalesce(s.description, '')), 'C')
+        || setweight(to_tsvector(%(config)s::regconfig, concat_ws(' ',
+            (SELECT string_agg(o.name, ' ') FROM "ServiceOption" o
+             WHERE o.service_id = s.id),
+            (SELECT string_agg(v.name, ' ') FROM "ServiceOptionValue" v
+             JOIN "ServiceOption" o ON o.id = v.option_id
+             WHERE o.service_id = s.id)
+        )), 'D')
+    WHERE s.id IN (
+        SELECT id FROM "Service" WHERE search_vector IS NULL LIMIT %(batch)s
+    )
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """
+    Fill the new column in committed batches so no long lock is held.
+    """
+    params = {"config": settings.SEARCH_CONFIG, "batch": BACKFILL_BATCH_SIZE}
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(BACKFILL_SQL, params)
+            if cursor.rowcount == 0:
+                break
+
+
+class Migration(migrations.Migration):
+    """
+    Stored, weighted search document for services, backfilled in batches and
+    indexed with GIN built concurrently.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("service", "0002_index_pack"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Weighted full-text document over the service and its options.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name="service",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="service_search_idx"
+            ),
+        ),
+    ]
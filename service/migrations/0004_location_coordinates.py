@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:49
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Coordinates copied from the tenant location, indexed concurrently for
+    the radius search's bounding-box pre-filter.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("service", "0003_search_vector"),
+        ("tenant", "0003_location_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="servicelocation",
+            name="latitude",
+            field=models.FloatField(
+                editable=False,
+                help_text="Copy of the location's latitude, for the radius search index.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="servicelocation",
+            name="longitude",
+            field=models.FloatField(
+                editable=False,
+                help_text="Copy of the location's longitude, for the radius search index.",
+                null=True,
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="servicelocation",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="service_location_coords_idx"
+            ),
+        ),
+    ]
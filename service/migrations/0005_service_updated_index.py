@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Index the export's ``(updated_at, id)`` order, built concurrently.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("service", "0004_location_coordinates"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="service",
+            index=models.Index(
+                fields=["updated_at", "id"], name="service_updated_id_idx"
+            ),
+        ),
+    ]
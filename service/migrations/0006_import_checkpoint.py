@@ -0,0 +1,92 @@
+# Generated by Django 5.1.4 on 2026-10-18 00:02
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("service", "0005_service_updated_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "run",
+                    models.CharField(
+                        help_text="Name of the import run.", max_length=40
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        help_text="Stage of the run (tenants, locations, services).",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "rows",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Valid rows copied into the staging table."
+                    ),
+                ),
+                (
+                    "merged_through",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Staging rows up to this sequence number are merged.",
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When every staged row was merged.",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ImportCheckpoint",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("run", "stage"), name="import_checkpoint_run_stage_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
-import requests
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from common.cache import get_or_fetch
+from common.upstream import upstream
 from common.models import BaseModel
 from django.conf import settings
 
@@ -39,9 +42,37 @@ class Service(BaseModel):
         null=True, blank=True, help_text="Duration of the service in minutes."
     )
     is_public = models.BooleanField(default=False)
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted full-text document over the service and its options.",
+    )
 
     class Meta:
         db_table = "Service"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="service_created_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="service_updated_id_idx"),
+            models.Index(
+                fields=["tenant", "-created_at"], name="service_tenant_recent_idx"
+            ),
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_public=True, is_active=True),
+                name="service_public_recent_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at"],
+                condition=models.Q(is_public=True, is_active=True, is_available=True),
+                name="service_public_category_idx",
+            ),
+            models.Index(
+                fields=["tenant", "-created_at"],
+                condition=models.Q(is_active=True, is_available=True),
+                name="service_tenant_available_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="service_search_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -68,6 +99,16 @@ class ServiceLocation(BaseModel):
     service_range_mi = models.FloatField(
         default=10.0, help_text="Service range in miles from this location."
     )
+    latitude = models.FloatField(
+        null=True,
+        editable=False,
+        help_text="Copy of the location's latitude, for the radius search index.",
+    )
+    longitude = models.FloatField(
+        null=True,
+        editable=False,
+        help_text="Copy of the location's longitude, for the radius search index.",
+    )
     availability_start = models.TimeField(
         null=True, blank=True, help_text="Service availability start time."
     )
@@ -83,47 +124,88 @@ class ServiceLocation(BaseModel):
 
     class Meta:
         db_table = "ServiceLocation"
+        indexes = [
+            models.Index(
+                fields=["latitude", "longitude"], name="service_location_coords_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.service.name} at {self.location}"
 
+    def save(self, *args, **kwargs):
+        self.latitude = self.location.latitude
+        self.longitude = self.location.longitude
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def availability_cache_key(external_schedule_id):
+        return f"service-location:availability:{external_schedule_id}"
+
+    @staticmethod
+    def address_cache_key(external_location_id):
+        return f"service-location:address:{external_location_id}"
+
     def get_availability(self):
         """
         Fetch availability data from the scheduling service.
+
+        Responses are cached for ``SERVICE_AVAILABILITY_CACHE_TTL`` seconds and
+        404s for ``SERVICE_NEGATIVE_CACHE_TTL``; concurrent misses for the same
+        schedule share one upstream call.
         """
         if not self.external_schedule_id:
             return {"error": "No external schedule ID provided."}
 
-        url = f"{settings.SCHEDULE_SERVICE_URL}/api/availability/{self.external_schedule_id}/"
-        response = requests.get(
-            url, headers={"Authorization": f"Bearer {settings.SERVICE_API_KEY}"}
+        path = f"api/availability/{self.external_schedule_id}/"
+        return get_or_fetch(
+            self.availability_cache_key(self.external_schedule_id),
+            lambda: self._fetch(
+                "schedule",
+                path,
+                settings.SERVICE_AVAILABILITY_CACHE_TTL,
+                "Failed to fetch availability.",
+            ),
         )
 
-        if response.status_code == 200:
-            return response.json()
-        return {
-            "error": "Failed to fetch availability.",
-            "status": response.status_code,
-        }
-
     def get_address(self):
         """
         Fetch address details from the location service.
+
+        Addresses are cached for ``SERVICE_ADDRESS_CACHE_TTL`` seconds and 404s
+        for ``SERVICE_NEGATIVE_CACHE_TTL``; concurrent misses for the same
+        location share one upstream call.
         """
         if not self.external_location_id:
             return {"error": "No external location ID provided."}
 
-        url = f"{settings.LOCATION_SERVICE_URL}/api/locations/{self.external_location_id}/"
-        response = requests.get(
-            url, headers={"Authorization": f"Bearer {settings.SERVICE_API_KEY}"}
+        path = f"api/locations/{self.external_location_id}/"
+        return get_or_fetch(
+            self.address_cache_key(self.external_location_id),
+            lambda: self._fetch(
+                "location",
+                path,
+                settings.SERVICE_ADDRESS_CACHE_TTL,
+                "Failed to fetch location details.",
+            ),
+        )
+
+    @staticmethod
+    def _fetch(upstream_name, path, ttl, error):
+        """
+        GET ``path`` from an upstream and return ``(payload, cache_timeout)``
+        for ``get_or_fetch``.
+        """
+        response = upstream(upstream_name).get(
+            path, headers={"Authorization": f"Bearer {settings.SERVICE_API_KEY}"}
         )
 
         if response.status_code == 200:
-            return response.json()
-        return {
-            "error": "Failed to fetch location details.",
-            "status": response.status_code,
-        }
+            return response.json(), ttl
+        payload = {"error": error, "status": response.status_code}
+        if response.status_code == 404:
+            return payload, settings.SERVICE_NEGATIVE_CACHE_TTL
+        return payload, None
 
 
 class ServiceOption(BaseModel):
@@ -176,3 +258,35 @@ class ServiceOptionValue(BaseModel):
 
     def __str__(self):
         return f"{self.name} (Option: {self.option.name})"
+
+
+class ImportCheckpoint(BaseModel):
+    """
+    Progress of one stage of an ``import_catalog`` run, so a failed run can
+    resume where it stopped.
+    """
+
+    run = models.CharField(max_length=40, help_text="Name of the import run.")
+    stage = models.CharField(
+        max_length=20, help_text="Stage of the run (tenants, locations, services)."
+    )
+    rows = models.PositiveIntegerField(
+        default=0, help_text="Valid rows copied into the staging table."
+    )
+    merged_through = models.BigIntegerField(
+        default=0, help_text="Staging rows up to this sequence number are merged."
+    )
+    completed_at = models.DateTimeField(
+        null=True, blank=True, help_text="When every staged row was merged."
+    )
+
+    class Meta:
+        db_table = "ImportCheckpoint"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["run", "stage"], name="import_checkpoint_run_stage_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.run}/{self.stage}"
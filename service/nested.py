@@ -0,0 +1,234 @@
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from common.conditional import invalidate_responses
+
+from .models import ServiceOption, ServiceOptionValue
+from .search import refresh_search_vectors
+
+OPTION_FIELDS = ("name", "is_required", "max_selections")
+VALUE_FIELDS = ("name", "additional_price")
+
+
+@dataclass
+class NestedWriteResult:
+    """
+    Summary of a nested write: rows touched per operation and SQL queries issued.
+    """
+
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    queries: int = 0
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts the queries run inside it.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def diff_children(existing, items_data, fields, build, label):
+    """
+    Compare received child payloads against the ``existing`` rows (keyed by pk).
+
+    Returns ``(to_create, to_update, to_delete_ids)``. Payloads without an ``id``
+    become new instances via ``build``; payloads with an ``id`` are applied to the
+    matching row and only kept for update if a field actually changed. Existing
+    rows not mentioned in the payload are marked for deletion.
+    """
+    now = timezone.now()
+    received_ids = set()
+    to_create, to_update = [], []
+
+    for data in items_data:
+        item_id = data.get("id")
+        if item_id is None:
+            to_create.append(build(data))
+            continue
+
+        instance = existing.get(item_id)
+        if instance is None:
+            raise serializers.ValidationError(
+                {label: [f"Invalid id '{item_id}' - object does not exist."]}
+            )
+        received_ids.add(item_id)
+
+        changed = False
+        for field in fields:
+            if field in data and getattr(instance, field) != data[field]:
+                setattr(instance, field, data[field])
+                changed = True
+        if changed:
+            instance.updated_at = now
+            to_update.append(instance)
+
+    to_delete = [pk for pk in existing if pk not in received_ids]
+    return to_create, to_update, to_delete
+
+
+def _build_value(option, data):
+    return ServiceOptionValue(
+        option=option, **{f: data[f] for f in VALUE_FIELDS if f in data}
+    )
+
+
+def _apply(model, fields, to_create, to_update, to_delete, result):
+    if to_delete:
+        model.objects.filter(id__in=to_delete).delete()
+    if to_create:
+        model.objects.bulk_create(to_create)
+    if to_update:
+        model.objects.bulk_update(to_update, [*fields, "updated_at"])
+    result.created += len(to_create)
+    result.updated += len(to_update)
+    result.deleted += len(to_delete)
+
+
+def sync_option_values(option, values_data):
+    """
+    Make ``option``'s values match ``values_data`` in a constant number of queries.
+    """
+    result = NestedWriteResult()
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter), transaction.atomic():
+        existing = {v.pk: v for v in ServiceOptionValue.objects.filter(option=option)}
+        to_create, to_update, to_delete = diff_children(
+            existing,
+            values_data,
+            VALUE_FIELDS,
+            lambda data: _build_value(option, data),
+            "values",
+        )
+        _apply(
+            ServiceOptionValue, VALUE_FIELDS, to_create, to_update, to_delete, result
+        )
+        # Bulk writes skip the signals that keep the search vector and the
+        # cached catalog current.
+        refresh_search_vectors([option.service_id])
+        invalidate_responses("services")
+    result.queries = counter.count
+    return result
+
+
+def diff_service_options(service, options_data, existing_options, existing_values):
+    """
+    Compare ``service``'s received options, and their values, against its
+    ``existing_options`` (keyed by pk) and ``existing_values`` (keyed by
+    option pk, then value pk).
+
+    Returns the options and values to create, update and delete, as
+    ``((create, update, delete), (create, update, delete))``.
+    """
+    new_values = []
+    option_values = []
+    for data in options_data:
+        if "values" in data and data.get("id") is not None:
+            option_values.append((data["id"], data["values"]))
+
+    def build_option(data):
+        option = ServiceOption(
+            service=service, **{f: data[f] for f in OPTION_FIELDS if f in data}
+        )
+        new_values.extend(_build_value(option, v) for v in data.get("values", []))
+        return option
+
+    options = diff_children(
+        existing_options, options_data, OPTION_FIELDS, build_option, "options"
+    )
+
+    values_create, values_update, values_delete = list(new_values), [], []
+    for option_id, values_data in option_values:
+        option = existing_options[option_id]
+        created, updated, deleted = diff_children(
+            existing_values.get(option_id, {}),
+            values_data,
+            VALUE_FIELDS,
+            lambda data, option=option: _build_value(option, data),
+            "values",
+        )
+        values_create.extend(created)
+        values_update.extend(updated)
+        values_delete.extend(deleted)
+    return options, (values_create, values_update, values_delete)
+
+
+def sync_services_options(items):
+    """
+    Make the options, and each option's values, of every ``(service,
+    options_data)`` in ``items`` match its ``options_data``.
+
+    Existing options and values of all the services are loaded with one
+    query each, the differences are computed in memory, and the writes are
+    applied with one ``bulk_create``, ``bulk_update`` and ``delete`` per table
+    inside a single transaction. The number of queries grows with neither
+    the number of services nor the size of their menus.
+
+    Returns ``(result, errors)``, with each item's validation errors (``{}``
+    for valid items). If any item is invalid nothing is written.
+    """
+    result = NestedWriteResult()
+    counter = QueryCounter()
+    service_ids = [service.pk for service, _ in items]
+    with connection.execute_wrapper(counter), transaction.atomic():
+        existing_options = {}
+        for option in ServiceOption.objects.filter(service_id__in=service_ids):
+            existing_options.setdefault(option.service_id, {})[option.pk] = option
+        existing_values = {}
+        for value in ServiceOptionValue.objects.filter(
+            option__service_id__in=service_ids
+        ):
+            existing_values.setdefault(value.option_id, {})[value.pk] = value
+
+        options = ([], [], [])
+        values = ([], [], [])
+        errors = []
+        for service, options_data in items:
+            try:
+                service_options, service_values = diff_service_options(
+                    service,
+                    options_data,
+                    existing_options.get(service.pk, {}),
+                    existing_values,
+                )
+            except serializers.ValidationError as e:
+                errors.append(e.detail)
+                continue
+            errors.append({})
+            for collected, diffed in zip(
+                options + values, service_options + service_values
+            ):
+                collected.extend(diffed)
+
+        if not any(errors):
+            # Values of deleted options go with them through the FK cascade.
+            _apply(ServiceOption, OPTION_FIELDS, *options, result)
+            _apply(ServiceOptionValue, VALUE_FIELDS, *values, result)
+            # Bulk writes skip the signals that keep the search vector and the
+            # cached catalog current.
+            refresh_search_vectors(service_ids)
+            invalidate_responses("services")
+    result.queries = counter.count
+    return result, errors
+
+
+def sync_service_options(service, options_data):
+    """
+    Make ``service``'s options, and each option's values, match
+    ``options_data``, in a number of queries that does not grow with the size
+    of the menu. See ``sync_services_options``.
+    """
+    result, (errors,) = sync_services_options([(service, options_data)])
+    if errors:
+        raise serializers.ValidationError(errors)
+    return result
@@ -0,0 +1,79 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast
+
+from .models import Service, ServiceOption, ServiceOptionValue
+
+SEARCH_TERM = re.compile(r"\w+")
+
+
+def search_document():
+    """
+    Weighted ``tsvector`` expression for a service: name (A), category (B),
+    description (C), then option and value names (D).
+    """
+    config = settings.SEARCH_CONFIG
+    option_names = (
+        ServiceOption.objects.filter(service=OuterRef("pk"))
+        .values("service")
+        .annotate(names=StringAgg("name", " "))
+        .values("names")
+    )
+    value_names = (
+        ServiceOptionValue.objects.filter(option__service=OuterRef("pk"))
+        .values("option__service")
+        .annotate(names=StringAgg("name", " "))
+        .values("names")
+    )
+    return (
+        SearchVector("name", weight="A", config=config)
+        + SearchVector("category", weight="B", config=config)
+        + SearchVector("description", weight="C", config=config)
+        + SearchVector(
+            Subquery(option_names), Subquery(value_names), weight="D", config=config
+        )
+    )
+
+
+def refresh_search_vectors(service_ids):
+    """
+    Recompute the stored search vector of the given services in one UPDATE.
+    """
+    Service.objects.filter(id__in=service_ids).update(search_vector=search_document())
+
+
+def parse_search_query(text):
+    """
+    Turn free text into a query matching every term, or ``None`` when the text
+    has no searchable terms. Only the last term, the one still being typed,
+    matches as a prefix: prefix lookups read many more index entries.
+    """
+    terms = SEARCH_TERM.findall(text)
+    if not terms:
+        return None
+    terms[-1] = f"{terms[-1]}:*"
+    return SearchQuery(
+        " & ".join(terms),
+        search_type="raw",
+        config=settings.SEARCH_CONFIG,
+    )
+
+
+def search_services(queryset, text):
+    """
+    Filter ``queryset`` to services matching ``text`` and annotate their
+    ``rank``. The match is answered from the GIN index on ``search_vector``.
+
+    ``ts_rank`` returns a ``real``; it is widened to double precision so the
+    value round-trips exactly through a pagination cursor.
+    """
+    query = parse_search_query(text)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+    )
@@ -1,13 +1,28 @@
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
+
+from common.timing import TimedRepresentationMixin
 from .models import (
     Service,
     ServiceLocation,
     ServiceOption,
     ServiceOptionValue,
 )
+from .nested import sync_option_values, sync_service_options
+
 
+def get_expanded_fields(request):
+    """
+    Return the set of relations requested via ``?expand=a,b``.
+    """
+    if request is None:
+        return set()
+    expand = request.query_params.get("expand", "")
+    return {field.strip() for field in expand.split(",") if field.strip()}
 
-class ServiceLocationSerializer(serializers.ModelSerializer):
+
+class ServiceLocationSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = ServiceLocation
         fields = [
@@ -21,7 +36,12 @@ class ServiceLocationSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class ServiceOptionValueSerializer(serializers.ModelSerializer):
+class ServiceOptionValueSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
+    # Writable so nested updates can reference existing values.
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = ServiceOptionValue
         fields = [
@@ -29,60 +49,47 @@ class ServiceOptionValueSerializer(serializers.ModelSerializer):
             "name",
             "additional_price",
         ]
-        read_only_fields = ["id"]
 
 
-class ServiceOptionSerializer(serializers.ModelSerializer):
-    values = ServiceOptionValueSerializer(many=True)
+class ServiceOptionSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
+    # Writable so nested updates can reference existing options.
+    id = serializers.UUIDField(required=False)
+    values = ServiceOptionValueSerializer(many=True, required=False)
 
     class Meta:
         model = ServiceOption
         fields = ["id", "service", "name", "is_required", "max_selections", "values"]
-        read_only_fields = ["id"]
+        extra_kwargs = {"service": {"required": False}}
 
     def create(self, validated_data):
         values_data = validated_data.pop("values", [])
-        service_option = ServiceOption.objects.create(**validated_data)
-        for value_data in values_data:
-            ServiceOptionValue.objects.create(option=service_option, **value_data)
+        validated_data.pop("id", None)
+        with transaction.atomic():
+            service_option = ServiceOption.objects.create(**validated_data)
+            self.nested_write_result = sync_option_values(service_option, values_data)
         return service_option
 
     def update(self, instance, validated_data):
-        values_data = validated_data.pop("values", [])
-        instance.name = validated_data.get("name", instance.name)
-        instance.is_required = validated_data.get("is_required", instance.is_required)
-        instance.max_selections = validated_data.get(
-            "max_selections", instance.max_selections
-        )
-        instance.save()
-
-        # Handle updating, creating, and deleting option values
-        existing_ids = {value.id for value in instance.values.all()}
-        received_ids = {
-            value_data.get("id") for value_data in values_data if "id" in value_data
-        }
-
-        # Delete values not present in the update request
-        ServiceOptionValue.objects.filter(
-            option=instance, id__in=existing_ids - received_ids
-        ).delete()
-
-        for value_data in values_data:
-            value_id = value_data.get("id", None)
-            if value_id:
-                value_instance = ServiceOptionValue.objects.get(
-                    id=value_id, option=instance
-                )
-                for attr, value in value_data.items():
-                    setattr(value_instance, attr, value)
-                value_instance.save()
-            else:
-                ServiceOptionValue.objects.create(option=instance, **value_data)
+        values_data = validated_data.pop("values", None)
+        with transaction.atomic():
+            instance.name = validated_data.get("name", instance.name)
+            instance.is_required = validated_data.get(
+                "is_required", instance.is_required
+            )
+            instance.max_selections = validated_data.get(
+                "max_selections", instance.max_selections
+            )
+            instance.save()
+
+            # Create, update and delete option values in bulk
+            if values_data is not None:
+                self.nested_write_result = sync_option_values(instance, values_data)
+                instance._prefetched_objects_cache = {}
 
         return instance
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     options = serializers.SerializerMethodField()
 
     class Meta:
@@ -105,20 +112,48 @@ class ServiceSerializer(serializers.ModelSerializer):
 
     def get_options(self, obj):
         """
-        Return service options only in the detail view.
+        Return service options in the detail view, in list views when the
+        client asks for them with ``?expand=options``, or when the caller sets
+        ``include_options`` in the serializer context.
+
+        Options and their values are read from the ``options__values`` prefetch
+        set up by the view, so no per-service queries are issued.
         """
+        if self.context.get("include_options"):
+            return ServiceOptionSerializer(obj.options.all(), many=True).data
         request = self.context.get("request")
-        if request and request.parser_context.get("kwargs", {}).get("pk"):
-            options = ServiceOption.objects.filter(service=obj)
-            return ServiceOptionSerializer(options, many=True).data
+        if request is None:
+            return None
+        is_detail = request.parser_context.get("kwargs", {}).get("pk")
+        if is_detail or "options" in get_expanded_fields(request):
+            return ServiceOptionSerializer(obj.options.all(), many=True).data
         return None
 
+    def to_internal_value(self, data):
+        """
+        Validate the nested ``options`` payload, which the read-side
+        ``SerializerMethodField`` would otherwise ignore.
+        """
+        validated_data = super().to_internal_value(data)
+        if hasattr(data, "get") and data.get("options") is not None:
+            options = ServiceOptionSerializer(
+                data=data["options"], many=True, context=self.context
+            )
+            if not options.is_valid():
+                raise serializers.ValidationError({"options": options.errors})
+            validated_data["options"] = options.validated_data
+        return validated_data
+
     def create(self, validated_data):
-        service = Service.objects.create(**validated_data)
+        options_data = validated_data.pop("options", None)
+        with transaction.atomic():
+            service = Service.objects.create(**validated_data)
+            if options_data:
+                self.nested_write_result = sync_service_options(service, options_data)
         return service
 
     def update(self, instance, validated_data):
-        options_data = validated_data.pop("options", [])
+        options_data = validated_data.pop("options", None)
         instance.name = validated_data.get("name", instance.name)
         instance.category = validated_data.get("category", instance.category)
         instance.description = validated_data.get("description", instance.description)
@@ -133,20 +168,22 @@ class ServiceSerializer(serializers.ModelSerializer):
         instance.duration_minutes = validated_data.get(
             "duration_minutes", instance.duration_minutes
         )
-        instance.save()
-
-        # Update or create service options
-        for option_data in options_data:
-            option_id = option_data.get("id", None)
-            if option_id:
-                option_instance = ServiceOption.objects.get(
-                    id=option_id, service=instance
-                )
-                option_serializer = ServiceOptionSerializer(
-                    option_instance, data=option_data, partial=True
-                )
-                option_serializer.is_valid(raise_exception=True)
-                option_serializer.save()
-            else:
-                self.fields["options"].create(option_data)
+        with transaction.atomic():
+            instance.save()
+
+            # Diff options and values against the database and write in bulk
+            if options_data is not None:
+                self.nested_write_result = sync_service_options(instance, options_data)
+                instance._prefetched_objects_cache = {}
+                prefetch_related_objects([instance], "options__values")
         return instance
+
+
+class BatchServiceSerializer(ServiceSerializer):
+    """
+    ``ServiceSerializer`` for one item of a batch write. The tenant is taken as
+    a plain id so the batch can check every item's tenant in one query rather
+    than one lookup per item.
+    """
+
+    tenant = serializers.UUIDField(source="tenant_id")
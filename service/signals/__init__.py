@@ -0,0 +1 @@
+from .service_signals import *
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from common.conditional import invalidate_responses
+from service.models import Service, ServiceOption, ServiceOptionValue
+from service.search import refresh_search_vectors
+
+SEARCH_FIELDS = {"name", "category", "description"}
+
+# Deletes are not hooked: a post_delete receiver would turn cascades and the
+# nested bulk deletes into one query per row. Code that deletes services,
+# options or values refreshes the search vector and cached responses itself.
+
+
+@receiver(post_save, sender=Service)
+def refresh_service_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Rebuild a service's search vector when one of its searchable fields may
+    have changed.
+    """
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        refresh_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=ServiceOption)
+def refresh_option_search_vector(sender, instance, **kwargs):
+    """
+    Rebuild the owning service's search vector when an option is saved.
+    """
+    refresh_search_vectors([instance.service_id])
+
+
+@receiver(post_save, sender=ServiceOptionValue)
+def refresh_value_search_vector(sender, instance, **kwargs):
+    """
+    Rebuild the owning service's search vector when an option value is saved.
+    """
+    refresh_search_vectors(
+        ServiceOption.objects.filter(pk=instance.option_id).values("service_id")
+    )
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=ServiceOption)
+@receiver(post_save, sender=ServiceOptionValue)
+def invalidate_service_responses(sender, **kwargs):
+    """
+    Retire cached catalog pages whenever a service or its menu is saved.
+    """
+    invalidate_responses("services")
@@ -0,0 +1,369 @@
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from common.conditional import invalidate_responses
+from tenant.models import Tenant, TenantLocation
+from .geo import EARTH_RADIUS_MI
+from .importer import qn
+from .models import Service, ServiceLocation, ServiceOption, ServiceOptionValue
+from .search import refresh_search_vectors
+
+# Metro areas locations are spread around, as (latitude, longitude)
+CENTERS = (
+    (40.7128, -74.0060),  # New York
+    (34.0522, -118.2437),  # Los Angeles
+    (41.8781, -87.6298),  # Chicago
+    (29.7604, -95.3698),  # Houston
+    (33.4484, -112.0740),  # Phoenix
+    (39.9526, -75.1652),  # Philadelphia
+    (32.7767, -96.7970),  # Dallas
+    (37.7749, -122.4194),  # San Francisco
+    (47.6062, -122.3321),  # Seattle
+    (25.7617, -80.1918),  # Miami
+    (33.7490, -84.3880),  # Atlanta
+    (42.3601, -71.0589),  # Boston
+    (39.7392, -104.9903),  # Denver
+    (36.1699, -115.1398),  # Las Vegas
+    (45.5152, -122.6784),  # Portland
+    (30.2672, -97.7431),  # Austin
+    (44.9778, -93.2650),  # Minneapolis
+    (38.9072, -77.0369),  # Washington
+    (35.2271, -80.8431),  # Charlotte
+    (51.5074, -0.1278),  # London
+)
+
+CATEGORIES = (
+    "hair",
+    "nails",
+    "massage",
+    "fitness",
+    "cleaning",
+    "landscaping",
+    "moving",
+    "tutoring",
+    "pet care",
+    "repair",
+)
+
+WORDS = (
+    "deep",
+    "express",
+    "premium",
+    "classic",
+    "deluxe",
+    "mobile",
+    "family",
+    "weekend",
+    "organic",
+    "signature",
+    "custom",
+    "quick",
+    "full",
+    "basic",
+    "seasonal",
+    "studio",
+    "home",
+    "group",
+    "private",
+    "starter",
+)
+
+OPTION_NAMES = ("Length", "Size", "Add-on", "Level", "Extras", "Style", "Products")
+
+# Tenants are created over the HISTORY before CREATED_BEFORE, and their
+# services between the tenant's creation and CREATED_BEFORE. The window is
+# fixed rather than relative to now, so the rows stay deterministic.
+CREATED_BEFORE = datetime(2025, 1, 1, tzinfo=UTC)
+HISTORY = timedelta(days=730)
+
+# Columns generated for each model, in insert order. The models' other
+# columns take their field defaults.
+COLUMNS = {
+    Tenant: (
+        "id",
+        "owner_id",
+        "name",
+        "description",
+        "contact_email",
+        "phone_number",
+        "created_at",
+    ),
+    TenantLocation: (
+        "id",
+        "provider_id",
+        "location_id",
+        "latitude",
+        "longitude",
+        "created_at",
+    ),
+    Service: (
+        "id",
+        "tenant_id",
+        "name",
+        "category",
+        "description",
+        "price",
+        "duration_minutes",
+        "max_clients_per_slot",
+        "is_available",
+        "is_public",
+        "created_at",
+    ),
+    ServiceLocation: (
+        "id",
+        "service_id",
+        "location_id",
+        "service_range_mi",
+        "latitude",
+        "longitude",
+        "created_at",
+    ),
+    ServiceOption: ("id", "service_id", "name", "is_required", "created_at"),
+    ServiceOptionValue: (
+        "id",
+        "option_id",
+        "name",
+        "additional_price",
+        "created_at",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Shape:
+    """
+    The size of a generated catalog. Per-parent counts are ``(low, high)``
+    ranges each parent draws from uniformly; equal bounds give fixed counts.
+    """
+
+    tenants: int
+    locations_per_tenant: tuple = (1, 1)
+    services_per_tenant: tuple = (10, 10)
+    options_per_service: tuple = (0, 3)
+    values_per_option: tuple = (2, 4)
+    centers: int = 10
+    spread_mi: float = 15.0
+    public_ratio: float = 0.5
+
+
+def seeded_uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def scatter(rng, latitude, longitude, radius_mi):
+    """
+    A point uniformly distributed within ``radius_mi`` of the centre.
+    """
+    distance = radius_mi * math.sqrt(rng.random()) / EARTH_RADIUS_MI
+    bearing = rng.uniform(0, 2 * math.pi)
+    latitude += math.degrees(distance * math.cos(bearing))
+    longitude += math.degrees(
+        distance * math.sin(bearing) / math.cos(math.radians(latitude))
+    )
+    return round(latitude, 6), round((longitude + 180) % 360 - 180, 6)
+
+
+def created_between(rng, start, end):
+    """
+    A creation time drawn uniformly from ``start..end``, to the microsecond.
+    """
+    span = int((end - start) / timedelta(microseconds=1))
+    return start + timedelta(microseconds=rng.randint(0, span))
+
+
+def default_columns(model, now):
+    """
+    The columns of ``model`` not in ``COLUMNS``, with the values a saved
+    instance would get for them.
+    """
+    defaults = {}
+    for field in model._meta.concrete_fields:
+        if field.column in COLUMNS[model]:
+            continue
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            defaults[field.column] = now
+        else:
+            defaults[field.column] = field.get_db_prep_save(
+                field.get_default(), connection
+            )
+    return defaults
+
+
+class CatalogGenerator:
+    """
+    Build a deterministic synthetic catalog: tenants with locations, services
+    placed at those locations, and their options and values.
+
+    Every tenant's rows, ids included, come from a random generator seeded
+    with ``seed`` and the tenant's index, so the same seed and shape always
+    produce the same data however it is batched. Tenants are written
+    ``batch_size`` at a time, each batch in one transaction with one ``COPY``
+    per table. Tenants that already exist are skipped, so running again
+    completes an interrupted run, and a larger ``tenants`` count grows an
+    existing dataset.
+    """
+
+    def __init__(self, shape, seed, batch_size, report):
+        self.shape = shape
+        self.seed = seed
+        self.batch_size = batch_size
+        self.report = report
+        self.centers = CENTERS[: max(1, min(shape.centers, len(CENTERS)))]
+
+    def tenant_rng(self, index):
+        return random.Random(f"{self.seed}:{index}")
+
+    def tenant_id(self, index):
+        return seeded_uuid(self.tenant_rng(index))
+
+    def tenant_rows(self, index):
+        """
+        Return the rows of tenant ``index`` as tuples in ``COLUMNS`` order,
+        keyed by model.
+        """
+        shape = self.shape
+        rng = self.tenant_rng(index)
+        rows = {model: [] for model in COLUMNS}
+
+        tenant_id = seeded_uuid(rng)
+        tenant_created = created_between(rng, CREATED_BEFORE - HISTORY, CREATED_BEFORE)
+        rows[Tenant].append(
+            (
+                tenant_id,
+                seeded_uuid(rng),
+                f"{rng.choice(WORDS).title()} Provider {index}",
+                " ".join(rng.choices(WORDS, k=8)),
+                f"provider{index}@example.com",
+                f"555-{index % 10_000_000:07d}",
+                tenant_created,
+            )
+        )
+        locations = []
+        center = rng.choice(self.centers)
+        for _ in range(rng.randint(*shape.locations_per_tenant)):
+            location = (
+                seeded_uuid(rng),
+                *scatter(rng, *center, shape.spread_mi),
+            )
+            locations.append(location)
+            rows[TenantLocation].append(
+                (
+                    location[0],
+                    tenant_id,
+                    seeded_uuid(rng),
+                    *location[1:],
+                    tenant_created,
+                )
+            )
+
+        for number in range(rng.randint(*shape.services_per_tenant)):
+            service_id = seeded_uuid(rng)
+            created = created_between(rng, tenant_created, CREATED_BEFORE)
+            category = rng.choice(CATEGORIES)
+            rows[Service].append(
+                (
+                    service_id,
+                    tenant_id,
+                    f"{' '.join(rng.choices(WORDS, k=2)).title()} "
+                    f"{category.title()} {number}",
+                    category,
+                    " ".join(rng.choices(WORDS, k=12)),
+                    Decimal(rng.randint(500, 50_000)) / 100,
+                    rng.choice((15, 30, 45, 60, 90, 120)),
+                    rng.choice((1, 1, 1, 2, 5)),
+                    rng.random() < 0.9,
+                    rng.random() < shape.public_ratio,
+                    created,
+                )
+            )
+            if locations:
+                location_id, latitude, longitude = rng.choice(locations)
+                rows[ServiceLocation].append(
+                    (
+                        seeded_uuid(rng),
+                        service_id,
+                        location_id,
+                        rng.choice((5.0, 10.0, 15.0, 25.0)),
+                        latitude,
+                        longitude,
+                        created,
+                    )
+                )
+            option_count = min(
+                rng.randint(*shape.options_per_service), len(OPTION_NAMES)
+            )
+            for option_name in rng.sample(OPTION_NAMES, k=option_count):
+                option_id = seeded_uuid(rng)
+                rows[ServiceOption].append(
+                    (option_id, service_id, option_name, rng.random() < 0.3, created)
+                )
+                rows[ServiceOptionValue].extend(
+                    (
+                        seeded_uuid(rng),
+                        option_id,
+                        f"{option_name} {value}",
+                        Decimal(rng.randint(0, 4_000)) / 100,
+                        created,
+                    )
+                    for value in range(rng.randint(*shape.values_per_option))
+                )
+        return rows
+
+    def generate(self):
+        """
+        Write every tenant not yet present. Returns the number of tenants
+        written.
+        """
+        started = time.monotonic()
+        written = 0
+        for start in range(0, self.shape.tenants, self.batch_size):
+            stop = min(start + self.batch_size, self.shape.tenants)
+            written += self.write_batch(range(start, stop))
+            rate = written / max(time.monotonic() - started, 1e-6)
+            self.report(
+                f"Tenants {stop} of {self.shape.tenants} ({rate:,.0f} tenants/s)."
+            )
+        invalidate_responses("services")
+        return written
+
+    def write_batch(self, indexes):
+        # A tenant is written in one transaction with its rows, so its id
+        # marks them all as present.
+        ids = {index: self.tenant_id(index) for index in indexes}
+        existing = set(
+            Tenant.objects.filter(id__in=ids.values()).values_list("id", flat=True)
+        )
+        indexes = [index for index in indexes if ids[index] not in existing]
+        if not indexes:
+            return 0
+
+        rows = {model: [] for model in COLUMNS}
+        for index in indexes:
+            for model, tenant_rows in self.tenant_rows(index).items():
+                rows[model].extend(tenant_rows)
+
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            # COPY skips Tenant's post_save, so no outbox events are queued
+            # for these synthetic owners.
+            for model, model_rows in rows.items():
+                defaults = default_columns(model, now)
+                columns = [*COLUMNS[model], *defaults]
+                sql = (
+                    f"COPY {qn(model._meta.db_table)} "
+                    f"({', '.join(qn(c) for c in columns)}) FROM STDIN"
+                )
+                extra = tuple(defaults.values())
+                with cursor.copy(sql) as copy:
+                    for row in model_rows:
+                        copy.write_row(row + extra)
+            refresh_search_vectors([row[0] for row in rows[Service]])
+        return len(indexes)
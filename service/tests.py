@@ -1,3 +1,1750 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from unittest import mock, skipUnless
+
+import requests
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.models import F, Q
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common.cache import get_or_fetch
+from common.events import (
+    EventProducer,
+    InMemoryBroker,
+    get_event_producer,
+    set_event_producer,
+)
+from common.fanout import fan_out
+from common.routers import ReplicaRouter, replica_health, replica_reads
+from common.upstream import UpstreamClient, upstream_stats
+from tenant.models import Tenant, TenantLocation
+from .geo import bounding_box, nearby_service_locations, nearest_services
+from .export import export_rows
+from .importer import CatalogImport
+from .models import (
+    ImportCheckpoint,
+    Service,
+    ServiceLocation,
+    ServiceOption,
+    ServiceOptionValue,
+)
+from .authentication import (
+    CustomJWTAuthentication,
+    SimulatedUser,
+    VerifiedTokenCache,
+    token_cache,
+)
+from .benchmark import (
+    ENDPOINTS,
+    EndpointBenchmark,
+    check_baseline,
+    check_budgets,
+    check_scaling,
+)
+from .nested import sync_service_options
+from .search import search_services
+from .synthetic import CREATED_BEFORE, HISTORY, CatalogGenerator, Shape
+
+
+def make_service(options=3, values=10):
+    tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+    service = Service.objects.create(tenant=tenant, name="Service", price=10)
+    for i in range(options):
+        option = ServiceOption.objects.create(service=service, name=f"Option {i}")
+        ServiceOptionValue.objects.bulk_create(
+            ServiceOptionValue(option=option, name=f"Value {j}") for j in range(values)
+        )
+    return service
+
+
+class KeysetPaginationTests(TestCase):
+    path = "/api/services/"
+
+    def setUp(self):
+        tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+        Service.objects.bulk_create(
+            Service(tenant=tenant, name=f"Service {i}", price=10) for i in range(5)
+        )
+        # Every row ties on created_at, so only the id orders them
+        Service.objects.update(created_at=timezone.now())
+        self.ids = [
+            str(pk)
+            for pk in Service.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(SimulatedUser(uuid.uuid4(), "user", ""))
+
+    def test_pages_walk_tied_rows_in_order(self):
+        pages = []
+        response = self.client.get(self.path, {"page_size": 2})
+        while True:
+            body = response.json()
+            pages.append([s["id"] for s in body["results"]])
+            if body["next"] is None:
+                break
+            response = self.client.get(body["next"])
+
+        self.assertEqual(pages, [self.ids[:2], self.ids[2:4], self.ids[4:]])
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get(self.path, {"page_size": 2}).json()
+        second = self.client.get(first["next"]).json()
+        self.assertIsNone(first["previous"])
+
+        previous = self.client.get(second["previous"]).json()
+
+        self.assertEqual([s["id"] for s in previous["results"]], self.ids[:2])
+        self.assertIsNone(previous["previous"])
+        self.assertEqual(previous["next"], first["next"])
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ("not-base64!", "WzEsMl0=", "WyJ4IiwieSIsMF0="):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.path, {"cursor": cursor})
+
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(PAGINATION_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.path, {"page_size": 100})
+
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertIsNotNone(response.json()["next"])
+
+
+class ExpandOptionsTests(TestCase):
+    def setUp(self):
+        for _ in range(5):
+            make_service(options=2, values=3)
+        self.client = APIClient()
+        self.client.force_authenticate(SimulatedUser(uuid.uuid4(), "user", ""))
+
+    def test_query_count_is_independent_of_page_size(self):
+        """
+        A page, its services' options and their values: three queries
+        however many services the page holds.
+        """
+        for page_size in (1, 5):
+            with self.subTest(page_size=page_size), self.assertNumQueries(3):
+                response = self.client.get(
+                    "/api/services/", {"expand": "options", "page_size": page_size}
+                )
+
+            results = response.json()["results"]
+            self.assertEqual(len(results), page_size)
+            self.assertEqual(len(results[0]["options"][0]["values"]), 3)
+
+
+class NestedWriteTests(TestCase):
+    def payload(self, service):
+        return [
+            {
+                "id": option.id,
+                "name": option.name,
+                "values": [
+                    {"id": v.id, "name": f"{v.name}!", "additional_price": 1}
+                    for v in option.values.all()
+                ],
+            }
+            for option in service.options.prefetch_related("values")
+        ]
+
+    def test_query_count_is_independent_of_menu_size(self):
+        small_service = make_service(1, 2)
+        small = sync_service_options(small_service, self.payload(small_service))
+        big_service = make_service(4, 25)
+        big = sync_service_options(big_service, self.payload(big_service))
+
+        self.assertEqual(big.updated, 4 * 25)
+        self.assertEqual(big.queries, small.queries)
+
+    def test_creates_updates_and_deletes(self):
+        service = make_service(2, 3)
+        payload = self.payload(service)
+        payload[0]["values"] = payload[0]["values"][:1]
+        payload.pop()
+        payload.append({"name": "New", "values": [{"name": "Fresh"}]})
+
+        result = sync_service_options(service, payload)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.deleted, 3)
+        self.assertEqual(
+            ServiceOptionValue.objects.filter(option__service=service).count(), 2
+        )
+
+
+class BatchServiceTests(TestCase):
+    path = "/api/services/batch/"
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+        self.client = APIClient()
+        self.client.force_authenticate(SimulatedUser(uuid.uuid4(), "user", ""))
+
+    def payload(self, count):
+        return [
+            {
+                "tenant": str(self.tenant.id),
+                "name": f"Massage {i}",
+                "price": "30.00",
+                "options": [
+                    {"name": "Length", "values": [{"name": "30 min"}, {"name": "60"}]}
+                ],
+            }
+            for i in range(count)
+        ]
+
+    def test_create_query_count_is_independent_of_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.path, self.payload(2), format="json")
+        with CaptureQueriesContext(connection) as big:
+            response = self.client.post(self.path, self.payload(20), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(big), len(small))
+        self.assertEqual({r["status"] for r in response.json()["results"]}, {"created"})
+        self.assertEqual(
+            ServiceOptionValue.objects.filter(
+                option__service__tenant=self.tenant
+            ).count(),
+            22 * 2,
+        )
+        found = search_services(Service.objects.all(), "massage 30")
+        self.assertEqual(found.count(), 22)
+
+    def test_invalid_items_reject_the_whole_batch(self):
+        payload = self.payload(3)
+        payload[1]["price"] = "free"
+        payload[2]["tenant"] = str(uuid.uuid4())
+
+        response = self.client.post(self.path, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertEqual(
+            [r["status"] for r in results], ["skipped", "invalid", "invalid"]
+        )
+        self.assertIn("price", results[1]["errors"])
+        self.assertIn("tenant", results[2]["errors"])
+        self.assertFalse(Service.objects.exists())
+
+    def test_update_and_delete(self):
+        first, second = make_service(1, 1), make_service(1, 1)
+        option = first.options.get()
+
+        response = self.client.patch(
+            self.path,
+            [
+                {"id": str(first.id), "price": "12.50", "options": []},
+                {"id": str(second.id), "name": "Renamed"},
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        self.assertEqual(str(first.price), "12.50")
+        self.assertFalse(ServiceOption.objects.filter(pk=option.pk).exists())
+        self.assertEqual(Service.objects.get(pk=second.pk).name, "Renamed")
+
+        response = self.client.delete(
+            self.path, [str(first.id), str(uuid.uuid4())], format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Service.objects.count(), 2)
+
+        response = self.client.delete(
+            self.path, [str(first.id), str(second.id)], format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Service.objects.exists())
+
+    def test_update_query_count_is_independent_of_batch_size(self):
+        def patch(count):
+            services = [make_service(2, 2) for _ in range(count)]
+            payload = []
+            for service in services:
+                kept, dropped = service.options.order_by("name")
+                values = list(kept.values.order_by("name"))
+                payload.append(
+                    {
+                        "id": str(service.id),
+                        "price": "12.50",
+                        "options": [
+                            {
+                                "id": str(kept.id),
+                                "name": kept.name,
+                                "is_required": True,
+                                "values": [
+                                    {"id": str(values[0].id), "name": "Renamed"},
+                                    {"name": "New"},
+                                ],
+                            },
+                            {"name": "Added", "values": [{"name": "Fresh"}]},
+                        ],
+                    }
+                )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.patch(self.path, payload, format="json")
+            self.assertEqual(response.status_code, 200)
+            return services, len(queries)
+
+        _, small = patch(1)
+        services, big = patch(10)
+
+        self.assertEqual(big, small)
+        for service in services:
+            self.assertEqual(
+                sorted(
+                    ServiceOptionValue.objects.filter(
+                        option__service=service
+                    ).values_list("option__name", "name")
+                ),
+                [
+                    ("Added", "Fresh"),
+                    ("Option 0", "New"),
+                    ("Option 0", "Renamed"),
+                ],
+            )
+
+    def test_failed_option_sync_rolls_back(self):
+        service = make_service(1, 1)
+
+        response = self.client.patch(
+            self.path,
+            [
+                {
+                    "id": str(service.id),
+                    "name": "Renamed",
+                    "options": [{"id": str(uuid.uuid4()), "name": "Ghost"}],
+                }
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("options", response.json()["results"][0]["errors"])
+        self.assertEqual(Service.objects.get(pk=service.pk).name, "Service")
+
+    @override_settings(SERVICE_BATCH_MAX_SIZE=2)
+    def test_batch_size_is_capped(self):
+        response = self.client.post(self.path, self.payload(3), format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Service.objects.exists())
+
+
+class ServiceExportTests(TestCase):
+    path = "/api/services/export/"
+
+    def setUp(self):
+        self.services = [make_service(1, 2) for _ in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(SimulatedUser(uuid.uuid4(), "user", ""))
+
+    def export(self, **params):
+        response = self.client.get(self.path, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_ndjson_in_update_order(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+
+        self.assertEqual([r["id"] for r in rows], [str(s.id) for s in self.services])
+        self.assertNotIn("options", rows[0])
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_csv_with_options(self):
+        lines = list(
+            csv.reader(io.StringIO(self.export(output="csv", expand="options")))
+        )
+
+        self.assertEqual(lines[0][-1], "options")
+        self.assertEqual(len(lines), 4)
+        options = json.loads(lines[1][-1])
+        self.assertEqual(len(options[0]["values"]), 2)
+
+    def test_filters(self):
+        first = self.services[0]
+        Service.objects.filter(pk=first.pk).update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        cutoff = (timezone.now() - timedelta(days=1)).isoformat()
+
+        older = self.export(updated_before=cutoff)
+        own = self.export(tenant=str(first.tenant_id))
+
+        self.assertEqual(json.loads(older)["id"], str(first.id))
+        self.assertEqual(json.loads(own)["id"], str(first.id))
+        self.assertEqual(len(self.export(updated_after=cutoff).splitlines()), 2)
+
+    def test_rejects_bad_parameters(self):
+        for params in ({"output": "xml"}, {"updated_after": "yesterday"}):
+            with self.subTest(params):
+                response = self.client.get(self.path, params)
+                self.assertEqual(response.status_code, 400)
+
+
+class ServiceExportStreamingTests(TransactionTestCase):
+    def setUp(self):
+        self.services = [make_service(0) for _ in range(3)]
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_cursor_is_not_held(self):
+        """
+        The export's cursor is an ordinary one: a ``WITH HOLD`` cursor would
+        be materialized in full before the first row.
+        """
+        rows = export_rows(Service.objects.order_by("updated_at", "id"), False)
+
+        first = next(rows)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT is_holdable FROM pg_cursors")
+            holdable = [row[0] for row in cursor.fetchall()]
+        remaining = list(rows)
+
+        self.assertEqual(holdable, [False])
+        self.assertEqual(
+            [first["id"], *(row["id"] for row in remaining)],
+            [str(s.id) for s in self.services],
+        )
+        self.assertFalse(connection.in_atomic_block)
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    async def test_streams_under_asgi(self):
+        """
+        Through the ASGI handler the body is sent chunk by chunk as it is
+        read, not collected into a list first (which Django warns about).
+        """
+        token = AccessToken()
+        token["user_id"] = str(uuid.uuid4())
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/services/export/",
+            "raw_path": b"/api/services/export/",
+            "query_string": b"output=csv",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+        messages = []
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()  # The client never disconnects
+
+        async def send(message):
+            messages.append(message)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            await ASGIHandler()(scope, receive, send)
+
+        self.assertEqual(
+            [w for w in caught if "StreamingHttpResponse" in str(w.message)], []
+        )
+        self.assertEqual(messages[0]["status"], 200)
+        chunks = [m["body"] for m in messages[1:] if m.get("body")]
+        self.assertEqual(len(chunks), 4)  # The header, then one row per chunk
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual([r["id"] for r in rows], [str(s.id) for s in self.services])
+
+
+class ImportCatalogTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+
+    def write(self, name, records):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w") as f:
+            for record in records:
+                f.write((record if isinstance(record, str) else json.dumps(record)))
+                f.write("\n")
+        return path
+
+    def run_import(self, run, **paths):
+        out = io.StringIO()
+        call_command("import_catalog", run=run, stdout=out, **paths)
+        return out.getvalue()
+
+    def service(self, name, price="10.00", **fields):
+        return {"tenant": str(self.tenant.id), "name": name, "price": price, **fields}
+
+    def test_creates_and_upserts(self):
+        tenant_id = str(uuid.uuid4())
+        tenants = self.write(
+            "tenants.ndjson",
+            [{"id": tenant_id, "owner_id": str(uuid.uuid4()), "name": "New"}],
+        )
+        first = self.write(
+            "first.ndjson",
+            [
+                self.service("Cut"),
+                self.service("Shave", "5.00"),
+                {"tenant": tenant_id, "name": "Cut", "price": "7.00"},
+            ],
+        )
+        self.run_import("first", tenants=tenants, services=first)
+        cut = Service.objects.get(tenant=self.tenant, name="Cut")
+
+        second = self.write(
+            "second.csv",
+            ["tenant,name,price,description", f"{self.tenant.id},Cut,12.50,Short"],
+        )
+        self.run_import("second", services=second)
+
+        cut.refresh_from_db()
+        self.assertEqual(Service.objects.count(), 3)
+        self.assertEqual((str(cut.price), cut.description), ("12.50", "Short"))
+        self.assertIsNotNone(cut.search_vector)
+        self.assertTrue(Tenant.objects.filter(id=tenant_id).exists())
+        self.assertNotIn(
+            "import_second_services", connection.introspection.table_names()
+        )
+
+    def test_syncs_nested_options(self):
+        def options(*values):
+            return [{"name": "Length", "values": [{"name": v} for v in values]}]
+
+        path = self.write(
+            "a.ndjson", [self.service("Cut", options=options("30", "60"))]
+        )
+        self.run_import("a", services=path)
+        path = self.write(
+            "b.ndjson",
+            [self.service("Cut", options=options("60", "90") + [{"name": "Oil"}])],
+        )
+        self.run_import("b", services=path)
+
+        service = Service.objects.get(name="Cut")
+        self.assertEqual(
+            sorted(service.options.values_list("name", flat=True)), ["Length", "Oil"]
+        )
+        self.assertEqual(
+            sorted(
+                ServiceOptionValue.objects.filter(option__service=service).values_list(
+                    "name", flat=True
+                )
+            ),
+            ["60", "90"],
+        )
+
+    def test_reports_invalid_rows_and_orphans(self):
+        path = self.write(
+            "services.ndjson",
+            [
+                self.service("Cut"),
+                "not json",
+                self.service("Bad", price="cheap"),
+                {"tenant": str(uuid.uuid4()), "name": "Orphan", "price": "1.00"},
+            ],
+        )
+
+        out = self.run_import("bad", services=path)
+
+        self.assertIn("staged 1 rows", out)
+        self.assertIn("line 2:", out)
+        self.assertIn("line 3:", out)
+        self.assertIn("does not exist: 4", out)
+        self.assertEqual(list(Service.objects.values_list("name", flat=True)), ["Cut"])
+
+    def test_imports_service_locations(self):
+        location = TenantLocation.objects.create(
+            provider=self.tenant, location_id=uuid.uuid4(), latitude=40, longitude=-74
+        )
+        cut = Service.objects.create(tenant=self.tenant, name="Cut", price="10.00")
+        tenant, ref = str(self.tenant.id), str(location.location_id)
+        path = self.write(
+            "service_locations.ndjson",
+            [
+                {"tenant": tenant, "service": "Cut", "location": ref},
+                {"tenant": tenant, "service": "Missing", "location": ref},
+                {"tenant": tenant, "service": "Cut", "location": str(uuid.uuid4())},
+                {"tenant": tenant, "service": "Cut", "location": "nowhere"},
+            ],
+        )
+        out = self.run_import("first", service_locations=path)
+
+        self.assertIn("staged 1 rows", out)
+        self.assertIn("line 4:", out)
+        self.assertIn("service or location does not exist: 2, 3", out)
+        service_location = ServiceLocation.objects.get()
+        self.assertEqual(
+            (service_location.service, service_location.location),
+            (cut, location),
+        )
+        self.assertEqual(
+            (service_location.latitude, service_location.longitude), (40, -74)
+        )
+        self.assertEqual(service_location.service_range_mi, 10.0)
+
+        path = self.write(
+            "again.csv",
+            [
+                "tenant,service,location,service_range_mi",
+                f"{tenant},Cut,{ref},25",
+            ],
+        )
+        self.run_import("second", service_locations=path)
+
+        service_location = ServiceLocation.objects.get()
+        self.assertEqual(service_location.service_range_mi, 25.0)
+        self.assertEqual(
+            list(nearby_service_locations(40, -74, 1).values_list("id", flat=True)),
+            [service_location.id],
+        )
+
+    def test_resumes_after_failed_batch(self):
+        path = self.write(
+            "services.ndjson", [self.service(f"Service {i}") for i in range(5)]
+        )
+        merge_batch = CatalogImport.merge_batch
+        calls = []
+
+        def fail_second(self, stage, lo, hi):
+            calls.append(lo)
+            if len(calls) == 2:
+                raise RuntimeError("Connection lost")
+            return merge_batch(self, stage, lo, hi)
+
+        with mock.patch.object(CatalogImport, "merge_batch", fail_second):
+            with self.assertRaisesMessage(CommandError, "Connection lost"):
+                call_command(
+                    "import_catalog",
+                    services=path,
+                    run="resume",
+                    batch_size=2,
+                    stdout=io.StringIO(),
+                )
+        checkpoint = ImportCheckpoint.objects.get(run="resume", stage="services")
+        self.assertEqual(checkpoint.merged_through, 2)
+        self.assertEqual(Service.objects.count(), 2)
+
+        out = io.StringIO()
+        call_command(
+            "import_catalog", services=path, run="resume", batch_size=2, stdout=out
+        )
+
+        self.assertIn("resuming after staged row 2", out.getvalue())
+        self.assertEqual(Service.objects.count(), 5)
+
+
+class SyntheticCatalogTests(TestCase):
+    shape = Shape(
+        tenants=5,
+        locations_per_tenant=(2, 2),
+        services_per_tenant=(1, 4),
+        options_per_service=(1, 1),
+        values_per_option=(2, 2),
+        centers=1,
+        spread_mi=10,
+    )
+
+    def generate(self, seed=1, batch_size=2):
+        return CatalogGenerator(self.shape, seed, batch_size, lambda line: None)
+
+    def test_shape(self):
+        self.assertEqual(self.generate().generate(), 5)
+
+        services = Service.objects.count()
+        self.assertTrue(5 <= services <= 20)
+        self.assertEqual(TenantLocation.objects.count(), 10)
+        self.assertEqual(ServiceOption.objects.count(), services)
+        self.assertEqual(ServiceOptionValue.objects.count(), 2 * services)
+        self.assertFalse(Service.objects.filter(search_vector__isnull=True).exists())
+        located = ServiceLocation.objects.filter(
+            latitude__range=(40.56, 40.86), longitude__range=(-74.2, -73.8)
+        )
+        self.assertEqual(located.count(), services)
+        created = list(Service.objects.values_list("created_at", flat=True))
+        self.assertEqual(len(set(created)), services)
+        self.assertTrue(
+            all(CREATED_BEFORE - HISTORY <= c <= CREATED_BEFORE for c in created)
+        )
+        self.assertFalse(
+            Service.objects.filter(created_at__lt=F("tenant__created_at")).exists()
+        )
+
+    def test_deterministic_and_resumable(self):
+        first = self.generate(batch_size=2)
+        again = self.generate(batch_size=5)
+
+        self.assertEqual(first.tenant_rows(3), again.tenant_rows(3))
+        self.assertNotEqual(first.tenant_rows(3), self.generate(seed=2).tenant_rows(3))
+
+        first.write_batch(range(0, 2))
+        self.assertEqual(first.generate(), 3)
+        self.assertEqual(Tenant.objects.count(), 5)
+
+
+class EndpointBenchmarkTests(TestCase):
+    def test_query_budgets(self):
+        """
+        Every endpoint stays within its query budget and runs as many queries
+        on a larger dataset: an N+1 fails here.
+        """
+        path = os.path.join(os.path.dirname(__file__), "benchmark_budgets.json")
+        with open(path) as f:
+            budgets = json.load(f)
+        benchmark = EndpointBenchmark([2, 6], 1, 0, lambda line: None)
+
+        results = benchmark.run()
+
+        self.assertEqual(len(results), 2 * len(ENDPOINTS))
+        self.assertEqual(check_budgets(results, budgets, metrics=("queries",)), [])
+        self.assertEqual(check_scaling(results), [])
+
+    def test_checks(self):
+        result = {"endpoint": "service-list", "size": 10, "queries": 3, "p95_ms": 30}
+        before = {**result, "queries": 2, "p95_ms": 20}
+
+        self.assertEqual(len(check_budgets([result], {"*": {"queries": 2}})), 1)
+        self.assertEqual(check_budgets([result], {"service-list": {"p95_ms": 50}}), [])
+        self.assertEqual(len(check_scaling([before, {**result, "size": 20}])), 1)
+        self.assertEqual(len(check_baseline([result], [before], 0.25)), 2)
+        self.assertEqual(check_baseline([result], [before], 1.0)[1:], [])
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Schedule service stub. Services in ``slow_ids`` take a second to answer,
+    those in ``busy_ids`` are unavailable.
+    """
+
+    slow_ids = set()
+    busy_ids = set()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/api/schedule/availability":
+            service_id = parse_qs(url.query)["service_id"][0]
+            if service_id in self.slow_ids:
+                time.sleep(1)
+            return self.reply(200, {"available": service_id not in self.busy_ids})
+        return self.reply(404, {})
+
+    def reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except BrokenPipeError:
+            pass  # The caller gave up at its deadline
+
+    def log_message(self, *args):
+        pass
+
+
+class RecordingUpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Generic upstream stub recording every request as ``(method, path)``.
+    Answers 200 with the path after ``delay`` seconds, or the status in
+    ``statuses`` for that path.
+    """
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    statuses = {}
+    delay = 0.0
+    lock = threading.Lock()
+
+    @classmethod
+    def reset(cls, delay=0.0, statuses=None):
+        cls.requests = []
+        cls.statuses = statuses or {}
+        cls.delay = delay
+
+    def answer(self):
+        with self.lock:
+            self.requests.append((self.command, self.path))
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.delay:
+            time.sleep(self.delay)
+        payload = json.dumps({"path": self.path}).encode()
+        self.send_response(self.statuses.get(self.path, 200))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The caller gave up at its timeout
+
+    do_GET = do_POST = do_PUT = do_DELETE = answer
+
+    def log_message(self, *args):
+        pass
+
+
+class RecordingUpstreamMixin:
+    """
+    Serve ``RecordingUpstreamHandler`` for the test class at ``self.url``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingUpstreamHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        RecordingUpstreamHandler.reset()
+
+
+class UpstreamClientTests(RecordingUpstreamMixin, SimpleTestCase):
+    def make_client(self, retries=2, timeout=1.0, url=None):
+        client = UpstreamClient(
+            "test", "TEST_UPSTREAM_URL", 2, timeout, retries=retries, backoff=0
+        )
+        overrides = override_settings(TEST_UPSTREAM_URL=url or self.url)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        return client
+
+    def test_only_idempotent_methods_are_retried(self):
+        RecordingUpstreamHandler.statuses = {"/busy": 503}
+        client = self.make_client(retries=2)
+
+        self.assertEqual(client.get("busy").status_code, 503)
+        self.assertEqual(len(RecordingUpstreamHandler.requests), 3)
+        RecordingUpstreamHandler.reset(statuses={"/busy": 503})
+        self.assertEqual(client.post("busy", json={}).status_code, 503)
+        self.assertEqual(RecordingUpstreamHandler.requests, [("POST", "/busy")])
+
+    def test_read_timeout_applies(self):
+        RecordingUpstreamHandler.delay = 0.5
+        client = self.make_client(retries=0, timeout=0.1)
+
+        with self.assertRaises(requests.ReadTimeout):
+            client.get("slow")
+
+        self.assertEqual(client.stats.snapshot()["errors"], 1)
+
+    def test_connect_timeout_applies(self):
+        # A listener that never accepts, with its backlog already full
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(0)
+        self.addCleanup(listener.close)
+        address = listener.getsockname()
+        for _ in range(4):
+            pending = socket.socket()
+            pending.setblocking(False)
+            pending.connect_ex(address)
+            self.addCleanup(pending.close)
+        client = self.make_client(retries=0, timeout=0.2, url="http://%s:%d" % address)
+
+        started = time.monotonic()
+        with self.assertRaises(requests.ConnectTimeout):
+            client.get("anything")
+
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_stats_report_calls_and_pool(self):
+        client = self.make_client()
+        for _ in range(3):
+            client.get("ok")
+
+        with mock.patch.dict("common.upstream._clients", {"test": client}, clear=True):
+            stats = upstream_stats()["test"]
+
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(sum(stats["histogram"].values()), 3)
+        # Sequential calls reuse one keep-alive connection
+        self.assertEqual(stats["pool"], {"size": 2, "opened": 1, "idle": 1})
+
+
+class ServiceLocationCacheTests(RecordingUpstreamMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.location = ServiceLocation(
+            external_schedule_id=uuid.uuid4(), external_location_id=uuid.uuid4()
+        )
+        self.availability_path = (
+            f"/api/availability/{self.location.external_schedule_id}/"
+        )
+        overrides = override_settings(
+            SCHEDULE_SERVICE_URL=self.url, LOCATION_SERVICE_URL=self.url
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_concurrent_misses_make_one_call(self):
+        RecordingUpstreamHandler.delay = 0.2
+        results = []
+
+        def fetch():
+            results.append(self.location.get_availability())
+
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(RecordingUpstreamHandler.requests), 1)
+        self.assertEqual(results, [{"path": self.availability_path}] * 8)
+
+    def test_not_found_answers_are_cached(self):
+        RecordingUpstreamHandler.statuses = {self.availability_path: 404}
+
+        first = self.location.get_availability()
+        second = self.location.get_availability()
+
+        self.assertEqual(first["status"], 404)
+        self.assertEqual(second, first)
+        self.assertEqual(len(RecordingUpstreamHandler.requests), 1)
+
+    def test_server_errors_are_not_cached(self):
+        RecordingUpstreamHandler.statuses = {self.availability_path: 500}
+        self.location.get_availability()
+        self.location.get_availability()
+
+        self.assertEqual(len(RecordingUpstreamHandler.requests), 2)
+
+    def test_changed_external_ids_are_fetched(self):
+        self.location.get_availability()
+        self.location.get_address()
+        self.location.get_availability()
+        self.location.get_address()
+        self.assertEqual(len(RecordingUpstreamHandler.requests), 2)
+
+        self.location.external_schedule_id = uuid.uuid4()
+        self.location.external_location_id = uuid.uuid4()
+        self.location.get_availability()
+        self.location.get_address()
+
+        self.assertEqual(len(RecordingUpstreamHandler.requests), 4)
+
+    def test_lock_held_elsewhere_is_left_alone(self):
+        cache.add("key:lock", 1, 10)
+
+        value = get_or_fetch("key", lambda: ("value", 60), lock_timeout=0.1)
+
+        self.assertEqual(value, "value")
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(cache.get("key:lock"), 1)
+
+    def test_waiters_fetch_once_a_lock_is_released_uncached(self):
+        # Another process takes the lock and fails without caching anything.
+        cache.add("key:lock", 1, 10)
+        threading.Timer(0.1, cache.delete, ["key:lock"]).start()
+        started = time.monotonic()
+
+        value = get_or_fetch("key", lambda: ("value", None))
+
+        self.assertEqual(value, "value")
+        self.assertLess(time.monotonic() - started, 1)
+
+
+def make_located_services(count, latitude=1.0, longitude=1.0, step=0.005):
+    """
+    Services each offered at their own location, ``step`` degrees of latitude
+    (about a third of a mile) further north than the previous one.
+    """
+    tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+    services = []
+    for i in range(count):
+        service = Service.objects.create(tenant=tenant, name=f"Service {i}", price=10)
+        location = TenantLocation.objects.create(
+            provider=tenant,
+            location_id=uuid.uuid4(),
+            latitude=latitude + i * step,
+            longitude=longitude,
+        )
+        ServiceLocation.objects.create(service=service, location=location)
+        services.append(service)
+    return services
+
+
+class AvailableServicesFanOutTests(TestCase):
+    path = "/api/services/available/"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubUpstreamHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(SimulatedUser(uuid.uuid4(), "user", ""))
+
+    def search(self, slow=(), busy=(), **overrides):
+        StubUpstreamHandler.slow_ids = {str(s.id) for s in slow}
+        StubUpstreamHandler.busy_ids = {str(s.id) for s in busy}
+        with override_settings(SCHEDULE_SERVICE_URL=self.url, **overrides):
+            return self.client.get(
+                self.path,
+                {
+                    "latitude": 1,
+                    "longitude": 1,
+                    "radius": 50,
+                    "date": "2025-01-01",
+                    "time": "10:00",
+                },
+            )
+
+    def test_results_are_nearest_first(self):
+        services = make_located_services(21)
+        response = self.search(busy=services[-1:])
+
+        self.assertEqual(
+            [s["id"] for s in response.json()], [str(s.id) for s in services[:-1]]
+        )
+        self.assertNotIn("X-Partial-Results", response)
+
+    def test_details_are_loaded_in_bulk(self):
+        make_located_services(2)
+        with self.assertNumQueries(3):
+            self.search()
+
+        services = make_located_services(10, latitude=1.05)
+        with self.assertNumQueries(3):
+            response = self.search()
+
+        details = response.json()[-1]["details"]
+        self.assertEqual(details["name"], services[-1].name)
+
+    def test_deadline_returns_partial_results(self):
+        services = make_located_services(3)
+        response = self.search(slow=services[1:2], SCHEDULE_FANOUT_DEADLINE=0.3)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [s["id"] for s in response.json()],
+            [str(services[0].id), str(services[2].id)],
+        )
+        self.assertEqual(response["X-Partial-Results"], "true")
+        self.assertEqual(response["X-Unchecked-Services"], "1")
+
+    def test_rejects_out_of_range_radius(self):
+        response = self.client.get(
+            self.path, {"latitude": 1, "longitude": 1, "radius": 10_000}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class VerifiedTokenCacheTests(SimpleTestCase):
+    def entry(self, cache, name, expires_in=60):
+        key = cache.key(name.encode())
+        cache.set(key, name, time.time() + expires_in)
+        return key
+
+    def test_hits_and_misses_are_counted(self):
+        cache = VerifiedTokenCache(10)
+        key = self.entry(cache, "a")
+
+        self.assertEqual(cache.get(key), "a")
+        self.assertIsNone(cache.get(cache.key(b"b")))
+
+        self.assertEqual(cache.stats(), {"size": 1, "hits": 1, "misses": 1})
+        cache.clear()
+        self.assertEqual(cache.stats(), {"size": 0, "hits": 0, "misses": 0})
+
+    def test_entries_expire_at_token_exp(self):
+        cache = VerifiedTokenCache(10)
+        key = self.entry(cache, "a", expires_in=60)
+
+        with mock.patch(
+            "service.authentication.time.time", return_value=time.time() + 61
+        ):
+            self.assertIsNone(cache.get(key))
+
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = VerifiedTokenCache(2)
+        a = self.entry(cache, "a")
+        b = self.entry(cache, "b")
+        cache.get(a)  # b is now the least recently used
+
+        c = self.entry(cache, "c")
+
+        self.assertIsNone(cache.get(b))
+        self.assertIsNotNone(cache.get(a))
+        self.assertIsNotNone(cache.get(c))
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_size_zero_disables_the_cache(self):
+        cache = VerifiedTokenCache(0)
+        key = self.entry(cache, "a")
+
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_requests_reuse_verified_tokens(self):
+        token = AccessToken()
+        token["user_id"] = str(uuid.uuid4())
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+
+        with mock.patch.object(
+            CustomJWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=CustomJWTAuthentication.get_validated_token,
+        ) as validate:
+            for _ in range(3):
+                response = client.get("/api/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(validate.call_count, 1)
+        self.assertEqual(token_cache.stats(), {"size": 1, "hits": 2, "misses": 1})
+
+
+class BlockingBroker(InMemoryBroker):
+    """
+    In-memory broker whose creation waits for ``release``, holding the
+    producer thread on the first event so the buffer can be filled.
+    """
+
+    def __init__(self, started, release):
+        started.set()
+        release.wait(5)
+        super().__init__()
+        self.calls = []
+
+    def flush(self, timeout=None):
+        self.calls.append("flush")
+
+    def close(self, timeout=None):
+        self.calls.append("close")
+
+
+class EventProducerTests(SimpleTestCase):
+    def producer(self, **options):
+        started, self.release = threading.Event(), threading.Event()
+        self.brokers = []
+
+        def factory():
+            self.brokers.append(BlockingBroker(started, self.release))
+            return self.brokers[-1]
+
+        producer = EventProducer(
+            factory=factory,
+            buffer_size=2,
+            **options,
+        )
+        self.addCleanup(producer.close)
+        self.addCleanup(self.release.set)
+        producer.send("topic", "first")  # Taken by the thread, which then waits
+        self.assertTrue(started.wait(5))
+        for value in ("second", "third", "fourth"):
+            producer.send("topic", value)
+        return producer
+
+    def delivered(self, producer):
+        self.release.set()
+        producer.flush()
+        return [value for _, value in producer.producer.messages]
+
+    def test_drop_newest(self):
+        producer = self.producer(overflow="drop_newest")
+
+        self.assertEqual(self.delivered(producer), ["first", "second", "third"])
+        self.assertEqual(producer.stats()["dropped"], 1)
+        self.assertEqual(producer.stats()["sent"], 3)
+
+    def test_drop_oldest(self):
+        producer = self.producer(overflow="drop_oldest")
+
+        self.assertEqual(self.delivered(producer), ["first", "third", "fourth"])
+        self.assertEqual(producer.stats()["dropped"], 1)
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spill.jsonl")
+            producer = self.producer(overflow="spill", spill_path=path)
+
+            self.assertEqual(self.delivered(producer), ["first", "second", "third"])
+            with open(path) as f:
+                spilled = [json.loads(line) for line in f]
+
+        self.assertEqual(spilled, [{"topic": "topic", "value": "fourth"}])
+        self.assertEqual(producer.stats()["spilled"], 1)
+        self.assertEqual(producer.stats()["dropped"], 0)
+
+    def test_producer_is_created_lazily(self):
+        factory = mock.Mock(side_effect=InMemoryBroker)
+        producer = EventProducer(factory=factory)
+        self.addCleanup(producer.close)
+        self.assertEqual(factory.call_count, 0)
+
+        producer.send("topic", "value")
+        producer.send("topic", "value")
+        producer.flush()
+
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(producer.counters["sent"], 2)
+
+    def test_shared_producer_is_created_lazily(self):
+        previous = set_event_producer(None)
+        self.addCleanup(set_event_producer, previous)
+
+        producer = get_event_producer()
+        self.addCleanup(producer.close)
+
+        self.assertIs(get_event_producer(), producer)
+        self.assertIsNone(producer.producer)
+        producer.send("topic", "value")
+        producer.flush()
+        self.assertIsInstance(producer.producer, InMemoryBroker)
+
+    def test_close_flushes_pending_events(self):
+        producer = self.producer()
+
+        self.release.set()
+        producer.close()
+
+        (broker,) = self.brokers
+        self.assertEqual(
+            [value for _, value in broker.messages], ["first", "second", "third"]
+        )
+        self.assertEqual(broker.calls, ["flush", "close"])
+        self.assertIsNone(producer.producer)
+        self.assertEqual(producer.stats()["buffered"], 0)
+
+    def test_unavailable_producer_counts_failures(self):
+        producer = EventProducer(factory=mock.Mock(side_effect=OSError("no brokers")))
+        self.addCleanup(producer.close)
+
+        with self.assertLogs("common.events", "WARNING") as logs:
+            producer.send("topic", "value")
+            producer.flush()
+
+        self.assertEqual(producer.stats()["failed"], 1)
+        self.assertIn("no brokers", logs.output[0])
+
+
+class FanOutTests(SimpleTestCase):
+    def test_failed_calls_are_logged(self):
+        def check(item):
+            if item == 2:
+                raise ValueError("upstream down")
+            return item * 10
+
+        with self.assertLogs("common.fanout", "WARNING") as logs:
+            outcome = fan_out(check, [1, 2, 3], max_workers=3, deadline=5)
+
+        self.assertEqual(outcome.results, [10, None, 30])
+        self.assertEqual(outcome.failed, 1)
+        self.assertIn("ValueError: upstream down", logs.output[0])
+
+
+class AsyncAvailableServicesTests(AvailableServicesFanOutTests):
+    """
+    Run the fan-out tests against the async endpoint.
+    """
+
+    path = "/api/services/async/available/"
+
+    def setUp(self):
+        token = AccessToken()
+        token["user_id"] = str(uuid.uuid4())
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_rejects_anonymous_requests(self):
+        response = APIClient().get(self.path, {"latitude": 1, "longitude": 1})
+
+        self.assertEqual(response.status_code, 401)
+
+
+def server_timing(response):
+    """
+    The ``Server-Timing`` header as a dict of metric names to their fields.
+    """
+    metrics = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *fields = metric.split(";")
+        metrics[name] = dict(field.split("=", 1) for field in fields)
+    return metrics
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubUpstreamHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubUpstreamHandler.slow_ids = StubUpstreamHandler.busy_ids = set()
+        token = AccessToken()
+        token["user_id"] = str(uuid.uuid4())
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_phases_are_reported(self):
+        make_service(options=2, values=2)
+        response = self.client.get("/api/services/", {"expand": "options"})
+
+        metrics = server_timing(response)
+        self.assertEqual(
+            set(metrics),
+            {"auth", "db", "serialize", "total"},
+            response["Server-Timing"],
+        )
+        self.assertEqual(metrics["auth"]["desc"], '"JWT authentication (1)"')
+        # Nested serializers are timed once, by the outermost
+        self.assertEqual(
+            metrics["serialize"]["desc"], '"serialization and rendering (2)"'
+        )
+        self.assertGreater(float(metrics["total"]["dur"]), 0)
+
+    def test_upstream_calls_are_reported(self):
+        services = make_located_services(3)
+        query = {
+            "latitude": 1,
+            "longitude": 1,
+            "radius": 50,
+            "date": "2025-01-01",
+            "time": "10:00",
+        }
+        for path in ("/api/services/available/", "/api/services/async/available/"):
+            with self.subTest(path=path), override_settings(
+                SCHEDULE_SERVICE_URL=self.url
+            ):
+                response = self.client.get(path, query)
+
+                self.assertEqual(len(response.json()), len(services))
+                metrics = server_timing(response)
+                self.assertEqual(metrics["schedule"]["desc"], '"schedule service (3)"')
+                self.assertIn("db", metrics)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_timed(self):
+        response = self.client.get("/api/services/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_sampled_requests_are_logged(self):
+        with override_settings(SERVER_TIMING_LOG_THRESHOLD_MS=0), self.assertLogs(
+            "common.timing", "INFO"
+        ) as slow:
+            self.client.get("/api/services/")
+        with self.assertLogs("common.timing", "DEBUG") as fast:
+            self.client.get("/api/services/")
+
+        (record,) = slow.records
+        line = json.loads(record.getMessage())
+        self.assertEqual(line["path"], "/api/services/")
+        self.assertEqual(line["phases"]["auth"]["count"], 1)
+        self.assertEqual(record.timing, line)
+        self.assertEqual([r.levelname for r in fast.records], ["DEBUG"])
+
+
+class GeoSearchTests(TestCase):
+    def test_radius_and_service_range_both_apply(self):
+        near, far = make_located_services(2, step=0.1)  # ~6.9 miles apart
+        ServiceLocation.objects.filter(service=far).update(service_range_mi=30)
+
+        within_5 = nearest_services(nearby_service_locations(1.0, 1.0, 5))
+        within_50 = nearest_services(nearby_service_locations(1.0, 1.0, 50))
+        self.assertEqual([s["id"] for s in within_5], [str(near.id)])
+        self.assertEqual([s["id"] for s in within_50], [str(near.id), str(far.id)])
+
+        # From 14 miles south of ``near`` only ``far``'s larger range reaches.
+        south = nearest_services(nearby_service_locations(0.8, 1.0, 50))
+        self.assertEqual([s["id"] for s in south], [str(far.id)])
+
+    def test_nearest_location_of_each_service(self):
+        (service,) = make_located_services(1)
+        location = TenantLocation.objects.create(
+            provider=service.tenant,
+            location_id=uuid.uuid4(),
+            latitude=1.01,
+            longitude=1.0,
+        )
+        ServiceLocation.objects.create(service=service, location=location)
+
+        results = nearest_services(nearby_service_locations(1.02, 1.0, 10))
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["location_id"], str(location.id))
+        self.assertAlmostEqual(results[0]["distance_mi"], 0.69, places=2)
+
+    def test_search_across_the_antimeridian(self):
+        (service,) = make_located_services(1, latitude=0, longitude=-179.99)
+
+        results = nearest_services(nearby_service_locations(0, 179.99, 5))
+
+        self.assertEqual([s["id"] for s in results], [str(service.id)])
+        self.assertEqual(len(bounding_box(0, 179.99, 5)[2]), 2)
+
+    def test_location_moves_are_copied_to_service_locations(self):
+        (service,) = make_located_services(1)
+        location = service.service_locations.get().location
+        location.latitude = 40.0
+        location.save()
+
+        self.assertEqual(service.service_locations.get().latitude, 40.0)
+        self.assertEqual(nearby_service_locations(1.0, 1.0, 10).count(), 0)
+
+
+class CatalogConditionalGetTests(TestCase):
+    path = "/api/services/catalog/"
+
+    def setUp(self):
+        cache.clear()
+        self.service = make_service(1, 2)
+        Service.objects.filter(pk=self.service.pk).update(is_public=True)
+        Service.objects.create(tenant=self.service.tenant, name="Private", price=1)
+        self.client = APIClient()
+
+    def test_catalog_lists_public_services(self):
+        response = self.client.get(self.path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [s["id"] for s in response.json()["results"]], [str(self.service.id)]
+        )
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+    def test_unchanged_catalog_is_not_modified(self):
+        etag = self.client.get(self.path)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.path)["Last-Modified"]
+
+        response = self.client.get(self.path, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_body_is_served_from_cache(self):
+        first = self.client.get(self.path)
+
+        # One validator query per request, nothing else.
+        with self.assertNumQueries(2):
+            plain = self.client.get(self.path)
+            compressed = self.client.get(self.path, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(plain.content, first.content)
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), first.content)
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(self.path)["ETag"]
+
+        # A bulk write leaves the service's updated_at alone.
+        option = self.service.options.get()
+        values = [{"id": v.id, "name": "Renamed"} for v in option.values.all()]
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_service_options(self.service, [{"id": option.id, "values": values}])
+
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.filter(pk=self.service.pk).update(is_public=False)
+            self.service.options.get().save()
+
+        self.assertEqual(self.client.get(self.path).json()["results"], [])
+
+    def test_writes_in_another_process_change_the_etag(self):
+        query = {"expand": "options"}
+        etag = self.client.get(self.path, query)["ETag"]
+        option = self.service.options.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_service_options(self.service, [{"id": option.id, "name": "New"}])
+        cache.clear()  # This process never saw the write
+
+        response = self.client.get(self.path, query, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["options"][0]["name"], "New")
+
+    def test_encodings_have_distinct_etags(self):
+        plain = self.client.get(self.path)["ETag"]
+        compressed = self.client.get(self.path, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+
+        self.assertNotEqual(plain, compressed)
+        response = self.client.get(
+            self.path, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        response = self.client.get(
+            self.path, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=compressed
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres-specific")
+class QueryPlanTests(TestCase):
+    """
+    Fail if a hot endpoint queryset can only be answered with a sequential scan.
+
+    Test tables are tiny, so sequential scans are disabled for the planner:
+    it still picks one when no index can serve the query.
+    """
+
+    def setUp(self):
+        self.service = make_service(1, 1)
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+
+    def querysets(self):
+        now = timezone.now()
+        owner_id = self.service.tenant.owner_id
+        return {
+            "service list": Service.objects.order_by("-created_at", "-id")[:51],
+            "service deep page": Service.objects.filter(
+                Q(created_at__lt=now) | Q(created_at=now, id__lt=self.service.id)
+            ).order_by("-created_at", "-id")[:51],
+            "tenant services": Service.objects.filter(
+                tenant=self.service.tenant
+            ).order_by("-created_at")[:51],
+            "tenant available services": Service.objects.filter(
+                tenant=self.service.tenant, is_active=True, is_available=True
+            ).order_by("-created_at")[:51],
+            "public catalog": Service.objects.filter(
+                is_public=True, is_active=True
+            ).order_by("-created_at")[:51],
+            "public category": Service.objects.filter(
+                is_public=True, is_active=True, is_available=True, category="other"
+            ).order_by("-created_at")[:51],
+            "service options": ServiceOption.objects.filter(
+                service_id__in=[self.service.id]
+            ),
+            "option values": ServiceOptionValue.objects.filter(
+                option__service=self.service
+            ),
+            "owner tenant count": Tenant.objects.filter(owner_id=owner_id),
+            "owner active tenants": Tenant.objects.filter(
+                owner_id=owner_id, is_active=True
+            ).order_by("-created_at"),
+            "tenant list": Tenant.objects.order_by("-created_at", "-id")[:51],
+            "nearby locations": nearby_service_locations(1.0, 1.0, 10),
+            "service search": search_services(Service.objects.all(), "serv").order_by(
+                "-rank", "-id"
+            )[:51],
+        }
+
+    def test_no_sequential_scans(self):
+        for name, queryset in self.querysets().items():
+            with self.subTest(name):
+                self.assertNotIn("Seq Scan", queryset.explain())
+
+
+@skipUnless(connection.vendor == "postgresql", "Full-text search is Postgres-only")
+class ServiceSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(SimulatedUser(uuid.uuid4(), "user", ""))
+        self.tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+
+    def create(self, name, description="", **fields):
+        return Service.objects.create(
+            tenant=self.tenant, name=name, description=description, price=10, **fields
+        )
+
+    def search(self, **params):
+        response = self.client.get("/api/services/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranks_name_matches_first_and_matches_prefixes(self):
+        in_description = self.create("Facial", "Relaxing massage add-on")
+        in_name = self.create("Deep tissue massage")
+
+        results = self.search(q="mass")["results"]
+
+        self.assertEqual(
+            [r["id"] for r in results], [str(in_name.id), str(in_description.id)]
+        )
+
+    def test_matches_option_values_after_nested_write(self):
+        service = self.create("Haircut")
+        sync_service_options(
+            service, [{"name": "Length", "values": [{"name": "Shoulder"}]}]
+        )
+
+        results = self.search(q="shoulder")["results"]
+
+        self.assertEqual([r["id"] for r in results], [str(service.id)])
+
+    def test_filters(self):
+        self.create("Yoga class", is_available=False)
+        available = self.create("Yoga retreat")
+
+        results = self.search(q="yoga", is_available="true")["results"]
+
+        self.assertEqual([r["id"] for r in results], [str(available.id)])
+
+    def test_pages_follow_rank_order(self):
+        for i in range(5):
+            self.create(f"Pilates {i}", "pilates " * i)
+
+        ids, page = [], self.search(q="pilates", page_size=2)
+        while True:
+            ids.extend(r["id"] for r in page["results"])
+            if page["next"] is None:
+                break
+            page = self.client.get(page["next"]).json()
+
+        expected = search_services(Service.objects.all(), "pilates").order_by(
+            "-rank", "-id"
+        )
+        self.assertEqual(ids, [str(s.id) for s in expected])
+
+    def test_requires_a_query(self):
+        response = self.client.get("/api/services/search/", {"q": " "})
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DB_REPLICA_MAX_LAG=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        patcher = mock.patch.object(replica_health, "lag", return_value=0.5)
+        self.lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_use_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(Service), "default")
+
+    def test_safe_reads_use_replica(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Service), "replica_1")
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Service), "default")
+            self.assertEqual(self.router.db_for_read(Service), "default")
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Service), "replica_1")
+
+    def test_lagging_replica_is_skipped(self):
+        self.lag.return_value = 30
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Service), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DB_REPLICA_MAX_LAG=5)
+class ReplicaHealthTests(SimpleTestCase):
+    def setUp(self):
+        self.connection = mock.MagicMock()
+        primary = mock.Mock(in_atomic_block=False)
+        patcher = mock.patch(
+            "common.routers.connections",
+            {"default": primary, "replica_1": self.connection},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(replica_health, "_lags", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        self.connection.cursor.side_effect = OperationalError("connection refused")
+
+        with self.assertLogs("common.routers", "WARNING") as logs, replica_reads():
+            alias = ReplicaRouter().db_for_read(Service)
+
+        self.assertEqual(alias, "default")
+        self.assertIn("replica_1 is unreachable", logs.output[0])
+
+    def test_lag_is_rechecked_after_the_interval(self):
+        self.connection.cursor.side_effect = OperationalError("connection refused")
+        with self.assertLogs("common.routers", "WARNING"):
+            self.assertEqual(replica_health.lag("replica_1"), float("inf"))
+
+        self.connection.cursor.side_effect = None
+        cursor = self.connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (0.5,)
+        self.assertEqual(replica_health.lag("replica_1"), float("inf"))  # Cached
+        with override_settings(DB_REPLICA_LAG_CHECK_INTERVAL=0):
+            self.assertEqual(replica_health.lag("replica_1"), 0.5)
+            with replica_reads():
+                self.assertEqual(ReplicaRouter().db_for_read(Service), "replica_1")
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedDefaultRouter
-from .views import ServiceViewSet, ServiceOptionViewSet
+from . import async_views
+from .views import ServiceViewSet, ServiceOptionViewSet, AvailableServicesView
 
 router = DefaultRouter()
 router.register(r"", ServiceViewSet, basename="service")
@@ -10,6 +11,15 @@ services_router = NestedDefaultRouter(router, r"", lookup="service")
 services_router.register(r"options", ServiceOptionViewSet, basename="service-options")
 
 urlpatterns = [
+    path("available/", AvailableServicesView.as_view(), name="available-services"),
+    # Async counterparts of the read endpoints, for ASGI deployments
+    path("async/", async_views.service_list, name="service-list-async"),
+    path(
+        "async/available/",
+        async_views.available_services,
+        name="available-services-async",
+    ),
+    path("async/<uuid:pk>/", async_views.service_detail, name="service-detail-async"),
     path("", include(router.urls)),
     path("", include(services_router.urls)),
 ]
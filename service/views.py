@@ -1,21 +1,37 @@
+import uuid
+
 import requests
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import viewsets, permissions, status
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.decorators import action
+from common.conditional import ConditionalListMixin, invalidate_responses
+from common.fanout import fan_out
+from common.pagination import KeysetCursorPagination, SearchRankPagination
+from common.routers import ReplicaReadMixin
+from common.upstream import upstream
+from .batch import create_services, delete_services, update_services
+from .export import async_chunks, csv_stream, export_rows, ndjson_stream
+from .geo import nearby_service_locations, nearest_services, parse_search_area
 from .models import (
     Service,
     ServiceOption,
     ServiceOptionValue,
     ServiceLocation,
 )
+from .search import refresh_search_vectors, search_services
 from .serializers import (
     ServiceSerializer,
     ServiceOptionSerializer,
     ServiceOptionValueSerializer,
     ServiceLocationSerializer,
+    get_expanded_fields,
 )
 
 
@@ -28,12 +44,26 @@ class IsTenantOrTeamMember(permissions.BasePermission):
         return request.user.is_authenticated and request.user.user_id is not None
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ReplicaReadMixin, ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    replica_actions = ("list", "retrieve", "search", "catalog", "export")
+    response_cache_scope = "services"
 
     def get_queryset(self):
-        return Service.objects.all()
+        """
+        Prefetch options and their values whenever the serializer will embed
+        them, so a page of services costs a constant number of queries.
+        """
+        queryset = Service.objects.all()
+        if self.action not in (
+            "list",
+            "search",
+            "catalog",
+        ) or "options" in get_expanded_fields(self.request):
+            queryset = queryset.prefetch_related("options__values")
+        return queryset
 
     def get_serializer_context(self):
         """
@@ -43,16 +73,193 @@ class ServiceViewSet(viewsets.ModelViewSet):
         context["request"] = self.request
         return context
 
-    def partial_update(self, request, *args, **kwargs):
+    def update(self, request, *args, **kwargs):
         """
-        Allows partial update of a Service instance using PATCH.
+        Update a Service instance using PUT, or partially using PATCH.
+
+        Unlike the stock mixin this keeps the instance's prefetch cache, which
+        the serializer refreshes after writing nested options.
         """
+        partial = kwargs.pop("partial", False)
         instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=True)
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def perform_destroy(self, instance):
+        """
+        Delete the service and retire cached catalog pages.
+        """
+        instance.delete()
+        invalidate_responses("services")
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.AllowAny])
+    def catalog(self, request):
+        """
+        Public, active services newest first, optionally narrowed to one
+        ``category``. Polling clients should send ``If-None-Match``: unchanged
+        pages are answered with a 304, and changed ones from a cached body.
+        """
+        queryset = self.get_queryset().filter(is_public=True, is_active=True)
+        category = request.query_params.get("category")
+        if category:
+            queryset = queryset.filter(category=category)
+
+        def build_response():
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return self.conditional_response(request, queryset, build_response)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream every service as NDJSON (default) or CSV (``?output=csv``),
+        oldest update first, with ``?expand=options`` for nested options.
+        ``tenant``, ``updated_after`` (inclusive) and ``updated_before``
+        narrow the export.
+
+        Rows are read through a server-side cursor and written as they are
+        serialized, so memory stays flat however large the table is. Under
+        ASGI the body is an async iterator, which the server streams too.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in ("ndjson", "csv"):
+            return Response(
+                {"error": "output must be ndjson or csv."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = Service.objects.all()
+        tenant = request.query_params.get("tenant")
+        if tenant:
+            tenant_id = parse_uuid(tenant)
+            if tenant_id is None:
+                return Response(
+                    {"error": "tenant must be a UUID."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(tenant_id=tenant_id)
+        for param, lookup in (
+            ("updated_after", "updated_at__gte"),
+            ("updated_before", "updated_at__lt"),
+        ):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                moment = parse_datetime(value)
+            except ValueError:
+                moment = None
+            if moment is None:
+                return Response(
+                    {"error": f"{param} must be an ISO 8601 datetime."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            queryset = queryset.filter(**{lookup: moment})
+
+        # Rows are read after the view returns, outside the replica routing
+        # context, so pin the database chosen now.
+        queryset = queryset.order_by("updated_at", "id")
+        queryset = queryset.using(queryset.db)
+        include_options = "options" in get_expanded_fields(request)
+        rows = export_rows(queryset, include_options)
+
+        if output == "csv":
+            body, content_type = csv_stream(rows, include_options), "text/csv"
+        else:
+            body, content_type = ndjson_stream(rows), "application/x-ndjson"
+        if isinstance(request._request, ASGIRequest):
+            body = async_chunks(body)
+        response = StreamingHttpResponse(body, content_type=content_type)
+        if output == "csv":
+            response["Content-Disposition"] = 'attachment; filename="services.csv"'
+        return response
+
+    @action(detail=False, methods=["post", "patch", "delete"])
+    def batch(self, request):
+        """
+        Create (POST), partially update (PATCH) or delete (DELETE) up to
+        ``SERVICE_BATCH_MAX_SIZE`` services in one request and transaction.
+
+        The body is a list: service payloads (with nested ``options``) to
+        create, payloads with an ``id`` to update, or ids to delete. Results
+        are returned per item; if any item is invalid nothing is written and
+        the response is a 400 listing each item's errors.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Expected a non-empty list of items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.SERVICE_BATCH_MAX_SIZE:
+            return Response(
+                {
+                    "error": f"At most {settings.SERVICE_BATCH_MAX_SIZE} items "
+                    "are accepted per batch."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        context = self.get_serializer_context()
+        if request.method == "POST":
+            results, ok = create_services(items, context)
+            success = status.HTTP_201_CREATED
+        elif request.method == "PATCH":
+            results, ok = update_services(items, context)
+            success = status.HTTP_200_OK
+        else:
+            results, ok = delete_services(items)
+            success = status.HTTP_200_OK
+        return Response(
+            {"results": results},
+            status=success if ok else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=["get"], pagination_class=SearchRankPagination)
+    def search(self, request):
+        """
+        Full-text search over service names, categories, descriptions and
+        option names, best match first. ``q`` matches word prefixes; results
+        can be narrowed with ``tenant``, ``is_public`` and ``is_available``.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response(
+                {"error": "The q parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.get_queryset()
+        tenant = request.query_params.get("tenant")
+        if tenant:
+            tenant_id = parse_uuid(tenant)
+            if tenant_id is None:
+                return Response(
+                    {"error": "tenant must be a UUID."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(tenant_id=tenant_id)
+        for flag in ("is_public", "is_available"):
+            value = request.query_params.get(flag)
+            if value is None:
+                continue
+            if value.lower() not in ("true", "false", "1", "0"):
+                return Response(
+                    {"error": f"{flag} must be true or false."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(**{flag: value.lower() in ("true", "1")})
+
+        page = self.paginate_queryset(search_services(queryset, text))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class ServiceOptionViewSet(viewsets.ModelViewSet):
     serializer_class = ServiceOptionSerializer
@@ -63,7 +270,9 @@ class ServiceOptionViewSet(viewsets.ModelViewSet):
         Only return service options related to the provided service_id.
         """
         service_id = self.kwargs.get("service_pk")  # Get service ID from URL
-        return ServiceOption.objects.filter(service_id=service_id)
+        return ServiceOption.objects.filter(service_id=service_id).prefetch_related(
+            "values"
+        )
 
     def perform_create(self, serializer):
         """
@@ -73,6 +282,15 @@ class ServiceOptionViewSet(viewsets.ModelViewSet):
         service = get_object_or_404(Service, id=service_id)
         serializer.save(service=service)
 
+    def perform_destroy(self, instance):
+        """
+        Delete the option, drop its names from the service's search vector and
+        retire cached catalog pages.
+        """
+        instance.delete()
+        refresh_search_vectors([instance.service_id])
+        invalidate_responses("services")
+
     def partial_update(self, request, *args, **kwargs):
         """
         Handle PATCH requests to update a specific service option.
@@ -84,81 +302,121 @@ class ServiceOptionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class AvailableServicesView(APIView):
+def check_schedule_availability(service_id, date, time):
+    """
+    Ask the schedule service whether a service is free at the given date/time.
+    """
+    response = upstream("schedule").get(
+        "api/schedule/availability",
+        params={"service_id": service_id, "date": date, "time": time},
+        timeout=settings.SCHEDULE_CHECK_TIMEOUT,
+    )
+    return response.status_code == 200 and bool(response.json().get("available"))
+
+
+def parse_uuid(value):
+    """
+    Return ``value`` as a UUID, or ``None`` if it is not one.
+    """
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def service_details_queryset(services):
+    """
+    Return one queryset covering every location-service result, or ``None``.
+    """
+    service_ids = {parse_uuid(service.get("id")) for service in services} - {None}
+    if not service_ids:
+        return None
+    return (
+        Service.objects.filter(id__in=service_ids)
+        .select_related("tenant")
+        .prefetch_related("options__values")
+    )
+
+
+def merge_service_details(services, instances, request):
+    """
+    Set ``details`` on each location-service result from loaded ``instances``.
+    """
+    serializer = ServiceSerializer(
+        instances, many=True, context={"request": request, "include_options": True}
+    )
+    details = {item["id"]: item for item in serializer.data}
+
+    for service in services:
+        item = details.get(str(parse_uuid(service.get("id"))))
+        if item is not None:
+            service["details"] = item
+
+
+def attach_service_details(services, request):
+    """
+    Set ``details`` on each location-service result from a single bulk query.
+    """
+    queryset = service_details_queryset(services)
+    if queryset is not None:
+        merge_service_details(services, list(queryset), request)
+
+
+class AvailableServicesView(ReplicaReadMixin, APIView):
     """
     Retrieves all available services within a radius for an optional date/time.
     """
 
+    replica_actions = ("get",)
+
     def get(self, request):
-        latitude = request.query_params.get("latitude")
-        longitude = request.query_params.get("longitude")
-        radius = request.query_params.get("radius", 10)  # Default to 10 miles
         date = request.query_params.get("date", None)
         time = request.query_params.get("time", None)
 
-        if not latitude or not longitude:
-            return Response(
-                {"error": "Latitude and longitude are required."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        try:
+            latitude, longitude, radius = parse_search_area(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # Step 1: Fetch services in the given radius from location-service
-            location_service_url = (
-                f"{settings.LOCATION_SERVICE_URL}/api/locations/services"
-            )
-            location_params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "radius": radius,
-            }
-            location_response = requests.get(
-                location_service_url, params=location_params
+            # Step 1: Find services covering the point from our own locations
+            services = nearest_services(
+                nearby_service_locations(latitude, longitude, radius)
             )
 
-            if location_response.status_code != 200:
-                return Response(
-                    {"error": "Failed to fetch services from location-service."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
-
-            services = location_response.json()  # List of services with location info
-
-            # Step 2: Filter services based on availability (if date/time provided)
+            # Step 2: Filter services based on availability (if date/time provided).
+            # Checks run concurrently; any that fail or miss the deadline are
+            # dropped and the response is flagged as partial.
             available_services = []
+            unchecked = 0
             if date and time:
-                schedule_service_url = (
-                    f"{settings.SCHEDULE_SERVICE_URL}/api/schedule/availability"
+                checks = fan_out(
+                    lambda service: check_schedule_availability(
+                        service["id"], date, time
+                    ),
+                    services,
+                    max_workers=settings.SCHEDULE_FANOUT_WORKERS,
+                    deadline=settings.SCHEDULE_FANOUT_DEADLINE,
                 )
-                for service in services:
-                    schedule_params = {
-                        "service_id": service["id"],
-                        "date": date,
-                        "time": time,
-                    }
-                    schedule_response = requests.get(
-                        schedule_service_url, params=schedule_params
-                    )
-
-                    if (
-                        schedule_response.status_code == 200
-                        and schedule_response.json().get("available")
-                    ):
-                        available_services.append(service)
+                available_services = [
+                    service
+                    for service, available in zip(services, checks.results)
+                    if available
+                ]
+                unchecked = checks.failed + checks.timed_out
             else:
                 available_services = (
                     services  # If no date/time filter, return all services in range
                 )
 
-            # Step 3: Fetch additional details from tenant-service
-            for service in available_services:
-                tenant_service_url = f"{settings.TENANT_SERVICE_URL}/api/tenants/{service['tenant_id']}/services/{service['id']}"
-                tenant_response = requests.get(tenant_service_url)
-
-                if tenant_response.status_code == 200:
-                    service["details"] = tenant_response.json()
+            # Step 3: Attach service details from our own database
+            attach_service_details(available_services, request)
 
-            return Response(available_services, status=status.HTTP_200_OK)
+            response = Response(available_services, status=status.HTTP_200_OK)
+            if unchecked:
+                response["X-Partial-Results"] = "true"
+                response["X-Unchecked-Services"] = str(unchecked)
+            return response
 
         except requests.RequestException as e:
             return Response(
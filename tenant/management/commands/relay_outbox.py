@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tenant.outbox import relay_batch
+
+
+class Command(BaseCommand):
+    help = "Relay pending tenant outbox events to the user service."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help="Events claimed per batch.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help="Seconds to sleep when the outbox is drained.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the events that are currently due, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+
+        while True:
+            processed = relay_batch(batch_size)
+            total += processed
+            if processed:
+                self.stdout.write(f"Relayed {processed} events ({total} total).")
+            if processed < batch_size:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained ({total} events)."))
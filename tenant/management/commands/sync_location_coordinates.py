@@ -0,0 +1,103 @@
+import logging
+
+import requests
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from common.upstream import upstream
+from service.models import ServiceLocation
+from tenant.models import TenantLocation
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy coordinates from the location service onto tenant locations "
+        "and their service locations. Locations the service fails for are "
+        "logged and skipped; progress is saved every --batch-size locations, "
+        "so running the command again picks up the rest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh every location, not only those without coordinates.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Locations fetched between saves.",
+        )
+
+    def handle(self, *args, **options):
+        locations = TenantLocation.objects.order_by("created_at")
+        if not options["all"]:
+            locations = locations.filter(latitude__isnull=True)
+
+        batch, updated, skipped = [], 0, 0
+        for location in locations.iterator():
+            coordinates = self.fetch(location)
+            if coordinates is None:
+                skipped += 1
+                continue
+            location.latitude, location.longitude = coordinates
+            batch.append(location)
+            if len(batch) >= options["batch_size"]:
+                updated += self.save(batch)
+                batch = []
+        updated += self.save(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated coordinates of {updated} locations ({skipped} skipped)."
+            )
+        )
+
+    def fetch(self, location):
+        """
+        The location's ``(latitude, longitude)`` from the location service, or
+        ``None`` (logged) if it cannot be had.
+        """
+        try:
+            response = upstream("location").get(
+                f"api/locations/{location.location_id}/"
+            )
+            if response.status_code != 200:
+                logger.warning(
+                    "Skipping %s: location service answered %s.",
+                    location.location_id,
+                    response.status_code,
+                )
+                return None
+            data = response.json()
+            return float(data["latitude"]), float(data["longitude"])
+        except requests.RequestException as e:
+            logger.warning("Skipping %s: %s", location.location_id, e)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(
+                "Skipping %s: invalid location payload (%r).",
+                location.location_id,
+                e,
+            )
+        return None
+
+    def save(self, locations):
+        """
+        Save ``locations``' coordinates and copy them onto their service
+        locations. Returns the number saved.
+        """
+        if not locations:
+            return 0
+        TenantLocation.objects.bulk_update(locations, ["latitude", "longitude"])
+        # bulk_update skips post_save, so copy onto service locations here.
+        coordinates = TenantLocation.objects.filter(pk=OuterRef("location_id"))
+        ServiceLocation.objects.filter(
+            location_id__in=[location.pk for location in locations]
+        ).update(
+            latitude=Subquery(coordinates.values("latitude")),
+            longitude=Subquery(coordinates.values("longitude")),
+        )
+        return len(locations)
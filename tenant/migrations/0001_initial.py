@@ -0,0 +1,360 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:26
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Tenant",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "owner_id",
+                    models.UUIDField(
+                        help_text="The ID of the primary user managing this provider (obtained from JWT)."
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of the provider (e.g., business name).",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "description",
+                    models.TextField(
+                        blank=True,
+                        help_text="A description of the provider's business.",
+                    ),
+                ),
+                (
+                    "logo",
+                    models.CharField(
+                        blank=True,
+                        help_text="Logo of the provider.",
+                        max_length=255,
+                        null=True,
+                    ),
+                ),
+                (
+                    "contact_email",
+                    models.EmailField(
+                        blank=True,
+                        help_text="Contact email for this provider.",
+                        max_length=254,
+                    ),
+                ),
+                (
+                    "phone_number",
+                    models.CharField(
+                        blank=True,
+                        help_text="Contact phone number for the provider.",
+                        max_length=15,
+                    ),
+                ),
+                (
+                    "is_disabled",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Indicates whether the provider is disabled.",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "Tenant",
+            },
+        ),
+        migrations.CreateModel(
+            name="TenantPlan",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(help_text="Plan name", max_length=50, unique=True),
+                ),
+                ("max_users", models.IntegerField(default=1)),
+                ("max_storage_gb", models.IntegerField(default=10)),
+                (
+                    "max_tenants",
+                    models.IntegerField(
+                        default=2, help_text="Max tenants allowed under this plan"
+                    ),
+                ),
+                ("custom_roles", models.BooleanField(default=False)),
+                (
+                    "feature_flags",
+                    models.JSONField(
+                        default=dict, help_text="Custom feature toggles for this plan."
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="TenantLocation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "location_id",
+                    models.UUIDField(
+                        help_text="A reference to the location in the location service."
+                    ),
+                ),
+                (
+                    "provider",
+                    models.ForeignKey(
+                        help_text="The provider this location belongs to.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="locations",
+                        to="tenant.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "Location",
+            },
+        ),
+        migrations.CreateModel(
+            name="TenantOutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for each record.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="The timestamp when this record was created.",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="The timestamp when this record was last updated.",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Indicates whether this record is active or not.",
+                    ),
+                ),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("tenant_created", "Tenant created"),
+                            ("tenant_deleted", "Tenant deleted"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "tenant_id",
+                    models.UUIDField(help_text="The tenant this event is about."),
+                ),
+                (
+                    "user_id",
+                    models.UUIDField(
+                        blank=True,
+                        help_text="The tenant owner at the time of the event.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of failed delivery attempts."
+                    ),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Earliest time of the next delivery attempt.",
+                    ),
+                ),
+                (
+                    "processed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the event was delivered or given up on.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, help_text="Reason for the last failed attempt."
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "TenantOutbox",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("processed_at__isnull", True)),
+                        fields=["next_attempt_at"],
+                        name="tenant_outbox_pending_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="tenant",
+            name="plan",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="tenant.tenantplan",
+            ),
+        ),
+        migrations.CreateModel(
+            name="TenantRole",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("name", models.CharField(help_text="Custom role name", max_length=50)),
+                (
+                    "permissions",
+                    models.JSONField(
+                        default=dict, help_text="Permissions associated with this role"
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="roles",
+                        to="tenant.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "TenantRoles",
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name="tenantrole",
+            unique_together={("tenant", "name")},
+        ),
+    ]
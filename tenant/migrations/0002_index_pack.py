@@ -0,0 +1,36 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes for the hot tenant query shapes, built with CREATE INDEX
+    CONCURRENTLY so the tables stay writable while they build.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("tenant", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="tenant",
+            index=models.Index(
+                fields=["created_at", "id"], name="tenant_created_id_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="tenant",
+            index=models.Index(fields=["owner_id"], name="tenant_owner_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="tenant",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["owner_id", "-created_at"],
+                name="tenant_owner_active_idx",
+            ),
+        ),
+    ]
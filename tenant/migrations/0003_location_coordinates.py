@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:49
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenant", "0002_index_pack"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenantlocation",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Latitude of the location in decimal degrees.",
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-90),
+                    django.core.validators.MaxValueValidator(90),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="tenantlocation",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Longitude of the location in decimal degrees.",
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-180),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.utils import timezone
 from common.models import BaseModel
 import uuid
 
@@ -47,10 +49,24 @@ class Tenant(BaseModel):
 
     class Meta:
         db_table = "Tenant"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="tenant_created_id_idx"),
+            models.Index(fields=["owner_id"], name="tenant_owner_idx"),
+            models.Index(
+                fields=["owner_id", "-created_at"],
+                condition=models.Q(is_active=True),
+                name="tenant_owner_active_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Keep post_save outbox writes in the same transaction as the tenant row.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class TenantLocation(BaseModel):
     """
@@ -66,6 +82,18 @@ class TenantLocation(BaseModel):
     location_id = models.UUIDField(
         help_text="A reference to the location in the location service."
     )
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        help_text="Latitude of the location in decimal degrees.",
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+        help_text="Longitude of the location in decimal degrees.",
+    )
 
     class Meta:
         db_table = "Location"
@@ -92,3 +120,52 @@ class TenantRole(models.Model):
 
     def __str__(self):
         return f"{self.tenant.name} - {self.name}"
+
+
+class TenantOutboxEvent(BaseModel):
+    """
+    A tenant lifecycle event waiting to be relayed to the user service.
+
+    Rows are written in the same transaction as the tenant change and drained
+    by the ``relay_outbox`` management command.
+    """
+
+    TENANT_CREATED = "tenant_created"
+    TENANT_DELETED = "tenant_deleted"
+    EVENT_CHOICES = [
+        (TENANT_CREATED, "Tenant created"),
+        (TENANT_DELETED, "Tenant deleted"),
+    ]
+
+    event = models.CharField(max_length=50, choices=EVENT_CHOICES)
+    tenant_id = models.UUIDField(help_text="The tenant this event is about.")
+    user_id = models.UUIDField(
+        null=True, blank=True, help_text="The tenant owner at the time of the event."
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, help_text="Number of failed delivery attempts."
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, help_text="Earliest time of the next delivery attempt."
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the event was delivered or given up on.",
+    )
+    last_error = models.TextField(
+        blank=True, help_text="Reason for the last failed attempt."
+    )
+
+    class Meta:
+        db_table = "TenantOutbox"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(processed_at__isnull=True),
+                name="tenant_outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} for {self.tenant_id}"
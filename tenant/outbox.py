@@ -0,0 +1,145 @@
+import logging
+import random
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from common.events import get_event_producer
+from common.upstream import upstream
+from tenant.models import TenantOutboxEvent
+
+logger = logging.getLogger(__name__)
+
+USER_TENANT_PATH = "users/tenant/"
+
+# Kafka event published when an outbox event is given up on
+FAILURE_EVENTS = {
+    TenantOutboxEvent.TENANT_CREATED: "tenant_association_failed",
+    TenantOutboxEvent.TENANT_DELETED: "tenant_deletion_failed",
+}
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff with full jitter, capped at ``OUTBOX_RETRY_BACKOFF_MAX``.
+    """
+    ceiling = min(
+        settings.OUTBOX_RETRY_BACKOFF * 2**attempts, settings.OUTBOX_RETRY_BACKOFF_MAX
+    )
+    return timedelta(seconds=random.uniform(0, ceiling))
+
+
+def send_to_user_service(event):
+    """
+    Deliver one event. Returns ``(done, reason)``: ``done`` is True when the
+    event needs no further attempts, ``reason`` explains a failure.
+    """
+    if event.event == TenantOutboxEvent.TENANT_CREATED:
+        response = upstream("user").post(
+            USER_TENANT_PATH,
+            json={"tenant_id": str(event.tenant_id), "user": str(event.user_id)},
+            timeout=10,
+        )
+        delivered = (201,)
+    else:
+        response = upstream("user").delete(
+            f"{USER_TENANT_PATH}{event.tenant_id}/", timeout=10
+        )
+        delivered = (200, 404)
+
+    match response.status_code:
+        case status if status in delivered:
+            return True, ""
+        case 400:
+            return True, "Bad Request (400)"
+        case status if status >= 500:
+            return False, f"Server Error ({status})"
+        case status:
+            return True, f"Unexpected status code: {status}"
+
+
+def give_up(event, reason):
+    """
+    Mark ``event`` as processed and report the failure on Kafka.
+    """
+    event.processed_at = timezone.now()
+    event.last_error = reason
+    get_event_producer().send(
+        settings.KAFKA_TOPIC,
+        {
+            "event": FAILURE_EVENTS[event.event],
+            "tenant_id": str(event.tenant_id),
+            "user_id": str(event.user_id),
+            "reason": reason,
+        },
+    )
+    logger.warning("%s failed - sent to Kafka: %s", event, reason)
+
+
+def deliver(event):
+    """
+    Attempt one event and update its state in memory.
+    """
+    try:
+        done, reason = send_to_user_service(event)
+    except requests.RequestException as e:
+        done, reason = False, str(e)
+
+    if done and not reason:
+        event.processed_at = timezone.now()
+        event.last_error = ""
+    elif done:
+        give_up(event, reason)
+    else:
+        event.attempts += 1
+        event.last_error = reason
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            give_up(event, reason)
+        else:
+            event.next_attempt_at = timezone.now() + retry_delay(event.attempts)
+    event.updated_at = timezone.now()
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to ``batch_size`` due events for ``OUTBOX_LEASE_SECONDS`` and
+    return them with the lease's expiry.
+
+    Rows are picked with ``SELECT ... FOR UPDATE SKIP LOCKED`` and leased by
+    moving ``next_attempt_at`` past the lease, so several relays can drain the
+    outbox side by side and the row locks last only as long as the claim.
+    """
+    now = timezone.now()
+    leased_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        events = list(
+            TenantOutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        TenantOutboxEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+            next_attempt_at=leased_until
+        )
+    return events, leased_until
+
+
+def relay_batch(batch_size):
+    """
+    Deliver up to ``batch_size`` due events and return how many were handled.
+
+    Events are claimed in one short transaction, delivered with no
+    transaction open, and their outcomes written in a second one. An outcome
+    is only written while the event's lease is still held: an event whose
+    lease ran out may have been claimed by another relay, which then owns it.
+    """
+    events, leased_until = claim_batch(batch_size)
+    for event in events:
+        deliver(event)
+    TenantOutboxEvent.objects.filter(next_attempt_at=leased_until).bulk_update(
+        events,
+        ["attempts", "next_attempt_at", "processed_at", "last_error", "updated_at"],
+    )
+    return len(events)
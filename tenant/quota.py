@@ -0,0 +1,60 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connection
+
+from tenant.models import TenantPlan
+
+_plans = {}
+_plans_loaded_at = None
+_plans_lock = threading.Lock()
+
+
+def get_plan(name):
+    """
+    Return the ``TenantPlan`` called ``name`` from a process-local cache.
+
+    All plans are loaded in one query on first use, reloaded after
+    ``TENANT_PLAN_CACHE_TTL`` seconds, and dropped whenever a plan is saved or
+    deleted in this process. Raises ``TenantPlan.DoesNotExist`` like ``get``.
+    """
+    global _plans, _plans_loaded_at
+    with _plans_lock:
+        expired = (
+            _plans_loaded_at is None
+            or time.monotonic() - _plans_loaded_at > settings.TENANT_PLAN_CACHE_TTL
+        )
+        if expired:
+            _plans = {plan.name: plan for plan in TenantPlan.objects.all()}
+            _plans_loaded_at = time.monotonic()
+        plan = _plans.get(name)
+
+    if plan is None:
+        raise TenantPlan.DoesNotExist(f"Tenant plan '{name}' does not exist.")
+    return plan
+
+
+def invalidate_plans():
+    """
+    Drop the cached plans so the next lookup reloads them.
+    """
+    global _plans_loaded_at
+    with _plans_lock:
+        _plans.clear()
+        _plans_loaded_at = None
+
+
+def lock_owner(owner_id):
+    """
+    Take a transaction-scoped advisory lock for ``owner_id``.
+
+    Serializes quota check-and-insert for one owner without blocking other
+    owners. Must be called inside ``transaction.atomic()``.
+    """
+    if connection.vendor != "postgresql":
+        return
+    key = int.from_bytes(uuid.UUID(str(owner_id)).bytes[:8], "big", signed=True)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [key])
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+
+from common.timing import TimedRepresentationMixin
 from .models import *
 
 
-class TenantSerializer(serializers.ModelSerializer):
+class TenantSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Tenant
         fields = [
@@ -26,7 +28,6 @@ class TenantSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = self.context["request"].user
-        # TODO Check tenant limit
         validated_data["owner_id"] = user.user_id if user else None
         tenant, _ = Tenant.objects.get_or_create(**validated_data)
         return tenant
@@ -38,7 +39,7 @@ class TenantSerializer(serializers.ModelSerializer):
         return instance
 
 
-class TenantLocationSerializer(serializers.ModelSerializer):
+class TenantLocationSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = TenantLocation
         fields = [
@@ -46,12 +47,14 @@ class TenantLocationSerializer(serializers.ModelSerializer):
             "provider",
             "location_id",
             "address",
+            "latitude",
+            "longitude",
             "created_at",
         ]
         read_only_fields = ["id", "created_at"]
 
 
-class TenantPlanSerializer(serializers.ModelSerializer):
+class TenantPlanSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = TenantPlan
         fields = "__all__"
@@ -1,20 +1,9 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from tenant.models import Tenant, TenantPlan
-import requests
-from django.conf import settings
-from kafka import KafkaProducer
-import json
-
-USER_API_URL = settings.USER_SERVICE_API + "users/tenant/"
-KAFKA_TOPIC = settings.KAFKA_TOPIC
-KAFKA_SERVERS = settings.KAFKA_SERVERS
-
-# Kafka producer setup
-producer = KafkaProducer(
-    bootstrap_servers=KAFKA_SERVERS,
-    value_serializer=lambda v: json.dumps(v).encode("utf-8"),
-)
+from common.conditional import invalidate_responses
+from service.models import ServiceLocation
+from tenant.models import Tenant, TenantLocation, TenantOutboxEvent, TenantPlan
+from tenant.quota import invalidate_plans
 
 # @receiver(post_save, sender=Tenant)
 # def create_tenant_plan(sender, instance, created, **kwargs):
@@ -24,123 +13,49 @@ producer = KafkaProducer(
 
 @receiver(post_save, sender=Tenant)
 def associate_user_with_tenant(sender, instance, created, **kwargs):
+    """
+    When a Tenant is created, queue its association with the owner in the
+    outbox. The ``relay_outbox`` command notifies the User Service and Kafka.
+    """
     if created:
-        try:
-            response = requests.post(
-                USER_API_URL,
-                json={"tenant_id": str(instance.id), "user": str(instance.owner_id)},
-                timeout=10,
-            )
-
-            match response.status_code:
-                case 201:
-                    print("Tenant associated successfully.")
-                case 400:
-                    producer.send(
-                        KAFKA_TOPIC,
-                        {
-                            "event": "tenant_association_failed",
-                            "tenant_id": str(instance.id),
-                            "user_id": str(instance.user_id),
-                            "reason": "Bad Request (400)",
-                        },
-                    )
-                    print(
-                        "Tenant association failed - sent to Kafka: Bad Request (400)"
-                    )
-                case 500:
-                    producer.send(
-                        KAFKA_TOPIC,
-                        {
-                            "event": "tenant_association_failed",
-                            "tenant_id": str(instance.id),
-                            "user_id": str(instance.user_id),
-                            "reason": "Server Error (500)",
-                        },
-                    )
-                    print(
-                        "Tenant association failed - sent to Kafka: Server Error (500)"
-                    )
-                case _:
-                    producer.send(
-                        KAFKA_TOPIC,
-                        {
-                            "event": "tenant_association_failed",
-                            "tenant_id": str(instance.id),
-                            "user_id": str(instance.user_id),
-                            "reason": f"Unexpected status code: {response.status_code}",
-                        },
-                    )
-                    print(
-                        f"Tenant association failed - sent to Kafka: Unexpected status code {response.status_code}"
-                    )
-
-        except requests.RequestException as e:
-            print(f"Error reaching the user API: {e}")
-            producer.send(
-                KAFKA_TOPIC,
-                {
-                    "event": "tenant_association_failed",
-                    "tenant_id": str(instance.id),
-                    "user_id": str(instance.user_id),
-                    "reason": str(e),
-                },
-            )
-            print("Error details sent to Kafka.")
+        TenantOutboxEvent.objects.create(
+            event=TenantOutboxEvent.TENANT_CREATED,
+            tenant_id=instance.id,
+            user_id=instance.owner_id,
+        )
 
 
 @receiver(post_delete, sender=Tenant)
 def remove_user_association(sender, instance, **kwargs):
     """
-    When a Tenant is deleted, notify the User Service and Kafka.
+    When a Tenant is deleted, queue the removal of its user association in the
+    outbox. The ``relay_outbox`` command notifies the User Service and Kafka.
     """
-    try:
-        response = requests.delete(
-            f"{USER_API_URL}{instance.id}/",
-            timeout=10,
-        )
+    TenantOutboxEvent.objects.create(
+        event=TenantOutboxEvent.TENANT_DELETED,
+        tenant_id=instance.id,
+        user_id=instance.owner_id,
+    )
+
 
-        match response.status_code:
-            case 200:
-                print("Tenant association removed successfully.")
-            case 404:
-                print("Tenant association not found in user service.")
-            case 400 | 500:
-                producer.send(
-                    KAFKA_TOPIC,
-                    {
-                        "event": "tenant_deletion_failed",
-                        "tenant_id": str(instance.id),
-                        "user_id": str(instance.user_id),
-                        "reason": f"Failed with status {response.status_code}",
-                    },
-                )
-                print(
-                    f"Tenant deletion failed - sent to Kafka: Status {response.status_code}"
-                )
-            case _:
-                producer.send(
-                    KAFKA_TOPIC,
-                    {
-                        "event": "tenant_deletion_failed",
-                        "tenant_id": str(instance.id),
-                        "user_id": str(instance.user_id),
-                        "reason": f"Unexpected status code: {response.status_code}",
-                    },
-                )
-                print(
-                    f"Unexpected response code {response.status_code} for tenant deletion."
-                )
+@receiver(post_save, sender=TenantPlan)
+@receiver(post_delete, sender=TenantPlan)
+def invalidate_plan_cache(sender, **kwargs):
+    """
+    Drop the process-local plan cache and the cached plan list whenever a
+    plan changes.
+    """
+    invalidate_plans()
+    invalidate_responses("plans")
 
-    except requests.RequestException as e:
-        print(f"Error removing tenant association: {e}")
-        producer.send(
-            KAFKA_TOPIC,
-            {
-                "event": "tenant_deletion_failed",
-                "tenant_id": str(instance.id),
-                "user_id": str(instance.user_id),
-                "reason": str(e),
-            },
+
+@receiver(post_save, sender=TenantLocation)
+def copy_location_coordinates(sender, instance, created, **kwargs):
+    """
+    Keep the coordinates copied onto the location's service locations, which
+    the radius search reads, in step with the location.
+    """
+    if not created:
+        ServiceLocation.objects.filter(location=instance).update(
+            latitude=instance.latitude, longitude=instance.longitude
         )
-        print("Error details sent to Kafka.")
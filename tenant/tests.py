@@ -1,3 +1,386 @@
-from django.test import TestCase
+import io
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.events import EventProducer, InMemoryBroker, set_event_producer
+from service.authentication import SimulatedUser
+from service.models import Service, ServiceLocation
+from .models import Tenant, TenantLocation, TenantOutboxEvent, TenantPlan
+from .outbox import claim_batch, relay_batch
+from .quota import get_plan, invalidate_plans, lock_owner
+
+
+class PlanListConditionalGetTests(TestCase):
+    path = "/api/tenant/plans/"
+
+    def setUp(self):
+        cache.clear()
+        self.plan = TenantPlan.objects.create(name="basic")
+        self.client = APIClient()
+
+    def test_unchanged_plans_are_not_modified(self):
+        etag = self.client.get(self.path)["ETag"]
+
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_plan_changes_are_served_fresh(self):
+        etag = self.client.get(self.path)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plan.delete()
+
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+
+def tenant_client(owner_id):
+    client = APIClient()
+    client.force_authenticate(SimulatedUser(owner_id, "owner", ""))
+    return client
+
+
+@override_settings(DEFAULT_TENANT_PLAN="basic")
+class TenantQuotaTests(TestCase):
+    path = "/api/tenant/"
+
+    def setUp(self):
+        invalidate_plans()
+        self.addCleanup(invalidate_plans)
+        self.plan = TenantPlan.objects.create(name="basic", max_tenants=2)
+        self.owner = uuid.uuid4()
+
+    def create(self, owner, name="Tenant"):
+        return tenant_client(owner).post(self.path, {"name": name}, format="json")
+
+    def test_limit_is_counted_per_owner(self):
+        self.assertEqual(self.create(self.owner, "One").status_code, 201)
+        self.assertEqual(self.create(self.owner, "Two").status_code, 201)
+
+        response = self.create(self.owner, "Three")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("(2/2)", response.json()["error"])
+        self.assertEqual(self.create(uuid.uuid4(), "Other").status_code, 201)
+        tenant = Tenant.objects.filter(owner_id=self.owner).first()
+        self.assertEqual(tenant.plan, self.plan)
+
+    def test_quota_check_query_count_is_constant(self):
+        get_plan("basic")  # Plans come from the process cache from here on
+        counts = []
+        for existing in range(2):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.create(self.owner, f"Tenant {existing}")
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(captured))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_plans_are_cached(self):
+        get_plan("basic")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_plan("basic").max_tenants, 2)
+            with self.assertRaises(TenantPlan.DoesNotExist):
+                get_plan("missing")
+
+    def test_plan_changes_invalidate_the_cache(self):
+        get_plan("basic")
+
+        self.plan.max_tenants = 7
+        self.plan.save()
+        self.assertEqual(get_plan("basic").max_tenants, 7)
+
+        self.plan.delete()
+        with self.assertRaises(TenantPlan.DoesNotExist):
+            get_plan("basic")
+
+
+@override_settings(DEFAULT_TENANT_PLAN="basic")
+class TenantQuotaLockTests(TransactionTestCase):
+    def setUp(self):
+        invalidate_plans()
+        self.addCleanup(invalidate_plans)
+        TenantPlan.objects.create(name="basic", max_tenants=1)
+
+    def test_concurrent_creates_are_serialized(self):
+        """
+        Two creates for one owner race for the last slot. Holding the lock a
+        moment widens the window in which both would count zero tenants.
+        """
+        owner = uuid.uuid4()
+        statuses = []
+
+        def slow_lock(owner_id):
+            lock_owner(owner_id)
+            time.sleep(0.2)
+
+        def create(name):
+            try:
+                response = tenant_client(owner).post(
+                    "/api/tenant/", {"name": name}, format="json"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        with mock.patch("tenant.views.lock_owner", slow_lock):
+            threads = [threading.Thread(target=create, args=(name,)) for name in "AB"]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(statuses), [201, 400])
+        self.assertEqual(Tenant.objects.filter(owner_id=owner).count(), 1)
+
+
+@override_settings(
+    KAFKA_TOPIC="tenants",
+    OUTBOX_MAX_ATTEMPTS=3,
+    OUTBOX_RETRY_BACKOFF=2.0,
+    OUTBOX_RETRY_BACKOFF_MAX=300.0,
+)
+class OutboxRelayTests(TestCase):
+    def setUp(self):
+        self.producer = EventProducer(factory=InMemoryBroker)
+        previous = set_event_producer(self.producer)
+        self.addCleanup(set_event_producer, previous)
+        self.addCleanup(self.producer.close)
+
+        self.user_service = mock.Mock()
+        patcher = mock.patch("tenant.outbox.upstream", return_value=self.user_service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def event(self, kind=TenantOutboxEvent.TENANT_CREATED, **fields):
+        return TenantOutboxEvent.objects.create(
+            event=kind, tenant_id=uuid.uuid4(), user_id=uuid.uuid4(), **fields
+        )
+
+    def answer(self, status):
+        self.user_service.post.return_value = mock.Mock(status_code=status)
+        self.user_service.delete.return_value = mock.Mock(status_code=status)
+
+    def published(self):
+        self.producer.flush()
+        return self.producer.producer.messages if self.producer.producer else []
+
+    def test_delivered_event_is_processed(self):
+        event = self.event()
+        self.answer(201)
+
+        self.assertEqual(relay_batch(10), 1)
+
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.attempts, 0)
+        self.user_service.post.assert_called_once_with(
+            "users/tenant/",
+            json={"tenant_id": str(event.tenant_id), "user": str(event.user_id)},
+            timeout=10,
+        )
+        self.assertEqual(self.published(), [])
+
+    def test_server_error_is_retried_with_backoff(self):
+        event = self.event()
+        self.answer(503)
+        before = timezone.now()
+
+        relay_batch(10)
+
+        event.refresh_from_db()
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.last_error, "Server Error (503)")
+        # Full jitter up to OUTBOX_RETRY_BACKOFF * 2 ** attempts
+        self.assertGreaterEqual(event.next_attempt_at, before)
+        self.assertLessEqual(
+            event.next_attempt_at, timezone.now() + timedelta(seconds=4)
+        )
+
+    def test_request_errors_are_retried(self):
+        event = self.event()
+        self.user_service.post.side_effect = requests.ConnectionError("refused")
+
+        relay_batch(10)
+
+        event.refresh_from_db()
+        self.assertEqual((event.attempts, event.last_error), (1, "refused"))
+
+    def test_backoff_is_capped(self):
+        with override_settings(OUTBOX_MAX_ATTEMPTS=50, OUTBOX_RETRY_BACKOFF_MAX=1.0):
+            event = self.event(attempts=20)
+            self.answer(503)
+            relay_batch(10)
+
+        event.refresh_from_db()
+        self.assertLessEqual(
+            event.next_attempt_at, timezone.now() + timedelta(seconds=1)
+        )
+
+    def test_gives_up_after_max_attempts(self):
+        event = self.event(attempts=2)
+        self.answer(503)
+
+        with self.assertLogs("tenant.outbox", "WARNING"):
+            relay_batch(10)
+
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.attempts, 3)
+        self.assertEqual(
+            self.published(),
+            [
+                (
+                    "tenants",
+                    {
+                        "event": "tenant_association_failed",
+                        "tenant_id": str(event.tenant_id),
+                        "user_id": str(event.user_id),
+                        "reason": "Server Error (503)",
+                    },
+                )
+            ],
+        )
+
+    def test_client_errors_give_up_at_once(self):
+        event = self.event(TenantOutboxEvent.TENANT_DELETED)
+        self.answer(400)
+
+        with self.assertLogs("tenant.outbox", "WARNING"):
+            relay_batch(10)
+
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(event.attempts, 0)
+        self.assertEqual(self.published()[0][1]["event"], "tenant_deletion_failed")
+
+    def test_claimed_events_are_leased(self):
+        event = self.event()
+
+        events, leased_until = claim_batch(10)
+
+        self.assertEqual(events, [event])
+        event.refresh_from_db()
+        self.assertEqual(event.next_attempt_at, leased_until)
+        self.assertEqual(claim_batch(10)[0], [])
+
+    def test_outcome_is_dropped_when_the_lease_was_lost(self):
+        event = self.event()
+        taken_over = timezone.now() + timedelta(hours=1)
+
+        def lease_expires(*args, **kwargs):
+            # Another relay claims the event while this one delivers it
+            TenantOutboxEvent.objects.filter(pk=event.pk).update(
+                next_attempt_at=taken_over
+            )
+            return mock.Mock(status_code=201)
+
+        self.user_service.post.side_effect = lease_expires
+
+        relay_batch(10)
+
+        event.refresh_from_db()
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.next_attempt_at, taken_over)
+
+
+class OutboxRelayTransactionTests(TransactionTestCase):
+    def test_delivery_runs_outside_a_transaction(self):
+        TenantOutboxEvent.objects.create(
+            event=TenantOutboxEvent.TENANT_DELETED, tenant_id=uuid.uuid4()
+        )
+        in_transaction = []
+
+        def delete(*args, **kwargs):
+            in_transaction.append(connection.in_atomic_block)
+            return mock.Mock(status_code=200)
+
+        with mock.patch("tenant.outbox.upstream") as upstream:
+            upstream.return_value.delete.side_effect = delete
+            relay_batch(10)
+
+        self.assertEqual(in_transaction, [False])
+        self.assertTrue(
+            TenantOutboxEvent.objects.filter(processed_at__isnull=False).exists()
+        )
+
+
+class SyncLocationCoordinatesTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(owner_id=uuid.uuid4(), name="Tenant")
+        self.service = Service.objects.create(tenant=self.tenant, name="Cut", price=10)
+        self.location_service = mock.Mock()
+        patcher = mock.patch(
+            "tenant.management.commands.sync_location_coordinates.upstream",
+            return_value=self.location_service,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def location(self):
+        location = TenantLocation.objects.create(
+            provider=self.tenant, location_id=uuid.uuid4()
+        )
+        ServiceLocation.objects.create(service=self.service, location=location)
+        return location
+
+    def test_failures_are_skipped_and_progress_is_saved(self):
+        ok, unreachable, invalid, missing, later = (self.location() for _ in range(5))
+        answers = {
+            ok.location_id: mock.Mock(
+                status_code=200, json=lambda: {"latitude": 40, "longitude": -74}
+            ),
+            unreachable.location_id: requests.ConnectionError("refused"),
+            invalid.location_id: mock.Mock(
+                status_code=200, json=mock.Mock(side_effect=ValueError("not json"))
+            ),
+            missing.location_id: mock.Mock(
+                status_code=200, json=lambda: {"latitude": 40}
+            ),
+            later.location_id: KeyboardInterrupt(),
+        }
+
+        def get(path):
+            answer = answers[uuid.UUID(path.split("/")[2])]
+            if isinstance(answer, BaseException):
+                raise answer
+            return answer
+
+        self.location_service.get.side_effect = get
+        with self.assertLogs("tenant", "WARNING") as logs:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    "sync_location_coordinates", batch_size=1, stdout=io.StringIO()
+                )
+
+        self.assertEqual(len(logs.records), 3)
+        located = ServiceLocation.objects.filter(latitude__isnull=False)
+        self.assertEqual(
+            list(located.values_list("location_id", "latitude", "longitude")),
+            [(ok.id, 40, -74)],
+        )
+
+        answers[later.location_id] = answers[ok.location_id]
+        out = io.StringIO()
+        with self.assertLogs("tenant", "WARNING"):
+            call_command("sync_location_coordinates", stdout=out)
+
+        self.assertIn("Updated coordinates of 1 locations (3 skipped)", out.getvalue())
+        later.refresh_from_db()
+        self.assertEqual((later.latitude, later.longitude), (40, -74))
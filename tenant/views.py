@@ -6,6 +6,12 @@ from .serializers import *
 from .models import *
 from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import ValidationError
+from django.conf import settings
+from django.db import transaction
+from common.conditional import ConditionalListMixin
+from common.pagination import KeysetCursorPagination
+from common.routers import ReplicaReadMixin
+from .quota import get_plan, lock_owner
 
 
 class TenantViewSet(viewsets.ModelViewSet):
@@ -15,6 +21,7 @@ class TenantViewSet(viewsets.ModelViewSet):
 
     serializer_class = TenantSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
 
     def get_queryset(self):
         """
@@ -25,20 +32,25 @@ class TenantViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """
         Restrict tenant creation based on the user's plan.
+
+        The owner's tenants are counted under a per-owner advisory lock, so
+        concurrent creates cannot both pass the limit check.
         """
-        user = self.request.user
-        tenants = Tenant.objects.all()
+        owner_id = self.request.user.user_id
+        user_plan = get_plan(settings.DEFAULT_TENANT_PLAN)
 
-        user_plan = TenantPlan.objects.get(name="Free")
+        with transaction.atomic():
+            lock_owner(owner_id)
+            tenant_count = Tenant.objects.filter(owner_id=owner_id).count()
 
-        if tenants.count() >= user_plan.max_tenants:
-            raise ValidationError(
-                {
-                    "error": f"Tenant creation limit reached for your current plan ({tenants.count()}/{user_plan.max_tenants})."
-                }
-            )
+            if tenant_count >= user_plan.max_tenants:
+                raise ValidationError(
+                    {
+                        "error": f"Tenant creation limit reached for your current plan ({tenant_count}/{user_plan.max_tenants})."
+                    }
+                )
 
-        serializer.save(owner_id=user, plan=user_plan)
+            serializer.save(owner_id=owner_id, plan=user_plan)
 
 
 class TenantLocationView(viewsets.ModelViewSet):
@@ -59,7 +71,7 @@ class TenantLocationView(viewsets.ModelViewSet):
         serializer.save(provider=provider)
 
 
-class TenantPlanViewSet(viewsets.ModelViewSet):
+class TenantPlanViewSet(ReplicaReadMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing Tenant Plans.
     """
@@ -67,8 +79,17 @@ class TenantPlanViewSet(viewsets.ModelViewSet):
     serializer_class = TenantPlanSerializer
     queryset = TenantPlan.objects.all()
     permission_classes = [permissions.AllowAny]
+    response_cache_scope = "plans"
 
     def list(self, request, *args, **kwargs):
-        tenants = self.get_queryset()
-        serializer = self.get_serializer(tenants, many=True)
-        return Response(serializer.data)
+        """
+        List every plan; unchanged lists are answered with a 304 or a cached
+        body.
+        """
+        plans = self.get_queryset()
+
+        def build_response():
+            serializer = self.get_serializer(plans, many=True)
+            return Response(serializer.data)
+
+        return self.conditional_response(request, plans, build_response)